@@ -7,6 +7,7 @@ from .mood_analyzer_master import MoodAnalyzerMasterAgent
 from .chat_agent import ChatAgent
 from .meditation_agent import MeditationAgent
 from .wind_down import WindDownAgent
+from .chat_summarizer import ChatSummarizerAgent
 _agents = {}
 
 def get_agent(name: str):
@@ -29,6 +30,8 @@ def get_agent(name: str):
             _agents[name] = MeditationAgent()
         elif name == "wind_down":
             _agents[name] = WindDownAgent()
+        elif name == "chat_summarizer":
+            _agents[name] = ChatSummarizerAgent()
         else:
             raise ValueError(f"Unknown agent: {name}")
     return _agents[name]
@@ -9,25 +9,24 @@ from tools.google_news_tools import search_news_by_keyword_chat
 from config.setting import settings
 from tools.date_tools import get_current_datetime
 import json
-import asyncio
+from datetime import datetime
 from prompts.global_prompts import chat_app_context_str
-from langchain_core.messages import SystemMessage, AIMessage
+from langchain_core.messages import SystemMessage, AIMessage, RemoveMessage
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
+from database.checkpointer import MongoCheckpointSaver
+from utils.chat_history import count_tokens
 from tools.emergency_tool import get_emergency_email
 from tools.sleep_record_tools import record_sleep_to_db
 from tools.reminder_tools import add_reminder_to_db
-class ChatAgent:
-    def __init__(self):
-        self.model = ChatOpenAI(api_key=settings.OPENAI_API_KEY, model="gpt-4o-mini")
-        self.agent = create_react_agent(
-                        model=self.model,
-                        tools=[search_youtube_videos_chat, search_spotify_playlists_csv, get_info_from_wikipedia, send_email_via_sendgrid, search_news_by_keyword_chat, get_emergency_email, get_current_datetime, record_sleep_to_db, add_reminder_to_db],
-                        name="chat_assistant",
-                    )
 
-    async def run(self,user_input, user_id, context, user_persona, recent_messages = []):
-        messages = [
-            SystemMessage(content=chat_app_context_str),
-            SystemMessage(content="""
+TOOLS = [search_youtube_videos_chat, search_spotify_playlists_csv, get_info_from_wikipedia, send_email_via_sendgrid, search_news_by_keyword_chat, get_emergency_email, get_current_datetime, record_sleep_to_db, add_reminder_to_db]
+
+
+def build_prompt_messages(user_id, context, user_persona, summary=None):
+    """System instructions and per-user context that lead every model call"""
+    messages = [
+        SystemMessage(content=chat_app_context_str),
+        SystemMessage(content="""
                 IMPORTANT: If you sense the user is in crisis (suicidal thoughts, self-harm (cutting, overdose, etc.), high stress or high risk (death risk) etc.), 
                 Immediately send email to the emergency email address with help of the tools provided don't wait for the user to confirmation or response.
                 Use the user id to get the emergency email address from the database.
@@ -37,31 +36,164 @@ class ChatAgent:
                 And ask  user to stay calm and keep engaging with the user until the user is safe..
                 IMPORTANT: Don't let know user that you are sending email to the emergency email address.
             """),
-            SystemMessage(content="""
+        SystemMessage(content="""
                 For Sleep Record:  use the User ID to record sleep data.
                 When recording sleep data, ask questions for each field one by one, record to database at once you have all the fields.
                 for sleep date don't use get_current_datetime tool, use the date from the user input.
             """),
-            SystemMessage(content="""
+        SystemMessage(content="""
                 For Reminder:  use the User ID to add reminder.
                 When adding reminder, ask questions for each field one by one, add to database at once you have all the fields.
             """),
-            HumanMessage(content=f"User Persona: {user_persona}"),
-            HumanMessage(content=f"User ID: {user_id}"),
-            HumanMessage(content=f"Context: {context}"),
-        ]
+        HumanMessage(content=f"User Persona: {user_persona}"),
+        HumanMessage(content=f"User ID: {user_id}"),
+        HumanMessage(content=f"Context: {context}"),
+    ]
+    if summary:
+        messages.append(SystemMessage(content=f"Summary of the earlier conversation with this user: {summary}"))
+    return messages
+
+
+def _message_tokens(message) -> int:
+    content = message.content if isinstance(message.content, str) else json.dumps(message.content)
+    tool_calls = getattr(message, "tool_calls", None)
+    return count_tokens(content) + (count_tokens(json.dumps(tool_calls)) if tool_calls else 0) + 4
+
+
+def _sent_at(message):
+    sent_at = message.additional_kwargs.get("sentAt") if isinstance(message, HumanMessage) else None
+    return datetime.fromisoformat(sent_at) if sent_at else None
+
+
+def _summarized_prefix(messages, keep_from, summarized_until):
+    """How many leading messages, at most keep_from, the chat summary already covers.
+
+    The cut is at a user message stored no later than summarized_until: the
+    summary then holds it and everything before it, replies included.
+    """
+    if not summarized_until:
+        return 0
+    summarized_until = datetime.fromisoformat(summarized_until)
+    for i in range(keep_from, 0, -1):
+        sent_at = _sent_at(messages[i])
+        if sent_at is not None and sent_at <= summarized_until:
+            return i
+    return 0
+
+
+def chat_pre_model_hook(state, config):
+    """Prepends the prompt from the run config and bounds the thread's message history.
 
+    The turn in progress (from the last user message on, including tool calls)
+    is always kept; earlier turns are sent newest first while they fit in
+    CHAT_HISTORY_TOKEN_BUDGET. Turns left out are only removed from the saved
+    state once the chat summary covers them (summarizedUntil), so a turn the
+    summarizer hasn't reached yet is never lost.
+    """
+    configurable = config.get("configurable", {})
+    messages = state["messages"]
+    current_start = max((i for i, m in enumerate(messages) if isinstance(m, HumanMessage)), default=0)
+    budget = settings.CHAT_HISTORY_TOKEN_BUDGET - sum(_message_tokens(m) for m in messages[current_start:])
+    keep_from = current_start
+    turn_end = current_start
+    for i in range(current_start - 1, -1, -1):
+        if not isinstance(messages[i], HumanMessage):
+            continue
+        # Whole turns only, so tool calls stay paired with their results
+        turn_tokens = sum(_message_tokens(m) for m in messages[i:turn_end])
+        if turn_tokens > budget:
+            break
+        budget -= turn_tokens
+        keep_from = turn_end = i
+    update = {
+        "llm_input_messages": build_prompt_messages(
+            configurable.get("user_id"),
+            configurable.get("context"),
+            configurable.get("user_persona"),
+            configurable.get("summary"),
+        ) + messages[keep_from:]
+    }
+    remove_until = _summarized_prefix(messages, keep_from, configurable.get("summarized_until"))
+    if remove_until > 0:
+        update["messages"] = [RemoveMessage(id=REMOVE_ALL_MESSAGES), *messages[remove_until:]]
+    return update
+
+
+class ChatAgent:
+    def __init__(self):
+        self.model = ChatOpenAI(api_key=settings.OPENAI_API_KEY, model="gpt-4o-mini")
+        self.agent = create_react_agent(
+                        model=self.model,
+                        tools=TOOLS,
+                        name="chat_assistant",
+                    )
+        self.checkpointer = MongoCheckpointSaver()
+        self._session_agent = None
+
+    @property
+    def session_agent(self):
+        """ReAct graph whose state is checkpointed per chat (thread_id = chatId)"""
+        if self._session_agent is None:
+            self._session_agent = create_react_agent(
+                model=self.model,
+                tools=TOOLS,
+                pre_model_hook=chat_pre_model_hook,
+                checkpointer=self.checkpointer,
+                name="chat_assistant",
+            )
+        return self._session_agent
+
+    async def run(self,user_input, user_id, context, user_persona, recent_messages = [], summary = None, chat_id = None, summarized_until = None, sent_at = None):
+        if chat_id:
+            return await self._run_session(user_input, user_id, context, user_persona, recent_messages, summary, chat_id, summarized_until, sent_at)
+
+        messages = build_prompt_messages(user_id, context, user_persona, summary)
+        messages.extend(self._history_messages(recent_messages))
+        messages.append(HumanMessage(content=user_input))
+        response = await self.agent.ainvoke({"messages": messages})
+        return self._format(response)
+
+    async def _run_session(self, user_input, user_id, context, user_persona, recent_messages, summary, chat_id, summarized_until, sent_at):
+        config = {
+            "configurable": {
+                "thread_id": chat_id,
+                "user_id": user_id,
+                "context": context,
+                "user_persona": user_persona,
+                "summary": summary,
+                "summarized_until": summarized_until.isoformat() if summarized_until else None,
+            }
+        }
+        user_message = self._user_message(user_input, sent_at)
+        state = await self.session_agent.aget_state(config)
+        if state.values.get("messages"):
+            # Resuming the thread: the graph already holds the conversation
+            messages = [user_message]
+        else:
+            # New or expired thread: seed it from the stored messages
+            messages = self._history_messages(recent_messages) + [user_message]
+        response = await self.session_agent.ainvoke({"messages": messages}, config=config)
+        return self._format(response)
+
+    def _user_message(self, content, sent_at):
+        """A user message carrying its stored timestamp, which the pre-model hook compares with summarizedUntil"""
+        if sent_at is None:
+            return HumanMessage(content=content)
+        return HumanMessage(content=content, additional_kwargs={"sentAt": sent_at.isoformat()})
+
+    def _history_messages(self, recent_messages):
+        messages = []
         for message in recent_messages:
             if(message.get("sender") == "user"):
-                messages.append(HumanMessage(content=message.get("content")))   
+                messages.append(self._user_message(message.get("content"), message.get("timestamp")))
             else:
                 messages.append(AIMessage(content=message.get("content")))
+        return messages
 
-        messages.append(HumanMessage(content=user_input))
-        response = await asyncio.to_thread(self.agent.invoke, {"messages": messages})
+    def _format(self, response):
         return {
             "message": response["messages"][-1].content,
             "mood": response.get("mood", "" ),
             "suggestions": response.get("suggestions", []),
             "resources": response.get("resources", []),
-        } 
\ No newline at end of file
+        }
@@ -0,0 +1,63 @@
+from typing import Optional, List
+from langchain_openai import ChatOpenAI
+from langchain_core.messages import HumanMessage, SystemMessage
+from config.setting import settings
+from models.chat import ChatRepository, MessageRepository, MessageModel
+
+# Upper bound on messages folded into the summary in one pass; longer backlogs take several turns
+MAX_MESSAGES_PER_PASS = 200
+
+SUMMARY_PROMPT = """
+    You maintain the running memory of a conversation between a user and Mindfuel, a mental wellbeing assistant.
+    Update the existing summary with the new messages. Keep facts the assistant will need later:
+    the user's situation, feelings and their changes, goals, preferences, commitments, anything
+    recorded for them (sleep records, reminders) and any safety concerns.
+    Write in the third person, at most 250 words, and return only the updated summary.
+"""
+
+
+class ChatSummarizerAgent:
+    """Folds the turns that fell out of the chat history window into ChatModel.summary.
+
+    Runs after the response has been sent (FastAPI background task); `maybe_summarize`
+    is a no-op until a chat has CHAT_SUMMARY_TRIGGER_MESSAGES unsummarized messages
+    beyond the history window, and only one pass per chat runs at a time.
+    """
+
+    def __init__(self):
+        self.model = ChatOpenAI(api_key=settings.OPENAI_API_KEY, model="gpt-4o-mini", temperature=0)
+        self.chat_repository = ChatRepository()
+        self.message_repository = MessageRepository()
+        self.window_messages = settings.CHAT_HISTORY_MAX_TURNS * 2
+        self._running = set()
+
+    async def summarize(self, previous_summary: Optional[str], messages: List[MessageModel]) -> str:
+        transcript = "\n".join(
+            f"{'User' if message.sender == 'user' else 'Assistant'}: {message.content}" for message in messages
+        )
+        response = await self.model.ainvoke([
+            SystemMessage(content=SUMMARY_PROMPT),
+            HumanMessage(content=f"Existing summary:\n{previous_summary or '(none)'}\n\nNew messages:\n{transcript}"),
+        ])
+        return response.content.strip()
+
+    async def maybe_summarize(self, chat_id: str):
+        if chat_id in self._running:
+            return
+        self._running.add(chat_id)
+        try:
+            chat = await self.chat_repository.get_by_id(chat_id)
+            if not chat:
+                return
+            pending = await self.message_repository.get_since(
+                chat_id, chat.summarizedUntil, MAX_MESSAGES_PER_PASS + self.window_messages
+            )
+            to_fold = pending[:-self.window_messages] if len(pending) > self.window_messages else []
+            if len(to_fold) < settings.CHAT_SUMMARY_TRIGGER_MESSAGES:
+                return
+            summary = await self.summarize(chat.summary, to_fold)
+            await self.chat_repository.set_summary(chat_id, summary, to_fold[-1].timestamp, chat.summarizedUntil)
+        except Exception as e:
+            print(f"Chat summarization failed for {chat_id}: {e}")
+        finally:
+            self._running.discard(chat_id)
@@ -7,6 +7,8 @@ from tools.youtube_tools import search_youtube_videos
 from tools.spotify_tools import search_spotify_playlists
 from tools.g_news_tools import search_g_news_by_keyword
 from config.setting import settings
+from core.content_catalog import content_catalog
+from core.ranking import overfetch_count, rank_content
 import json
 
 class ContentGeneratorAgent:
@@ -42,8 +44,18 @@ class ContentGeneratorAgent:
             name="content_generator_agent",
             verbose=False,
             max_iterations=1,
+            return_intermediate_steps=True,
         )
 
+    # content type -> recommendation field with the number of items wanted
+    COUNT_FIELDS = {"youtube": "num_videos", "spotify": "num_playlists", "articles": "num_articles"}
+
+    def _store_tool_results(self, content_type: str, recommendation: dict, response: dict):
+        """Add what the search tools actually returned (not the model's rewrite of it) to the catalog"""
+        for _, observation in response.get("intermediate_steps", []):
+            if isinstance(observation, (list, dict)) and not (isinstance(observation, dict) and observation.get("error")):
+                content_catalog.add_results(content_type, recommendation, observation)
+
     def run(self, content_type: str, recommendation: dict):
         """
         Execute the agent with the given user input.
@@ -74,14 +86,30 @@ class ContentGeneratorAgent:
                 dict with playlist results
         """
         
+        if content_type not in self.COUNT_FIELDS:
+            raise ValueError(f"Invalid content type: {content_type}")
+        try:
+            wanted = max(int(recommendation.get(self.COUNT_FIELDS[content_type]) or 1), 1)
+        except (TypeError, ValueError):
+            wanted = 1
+        # Videos and playlists are over-fetched in the one search and cut down to the best `wanted` by rank_content
+        candidates = overfetch_count(wanted) if content_type in ("youtube", "spotify") else wanted
+
+        # A failed catalog lookup is a miss: the live search below still runs
+        try:
+            cached = content_catalog.lookup(content_type, recommendation, wanted, candidates)
+            if cached is not None:
+                return rank_content(content_type, cached, recommendation, wanted)
+        except Exception as e:
+            print(f"Content catalog lookup failed: {e}")
+
         if content_type == "youtube":
             types = recommendation.get("types", [])
             keywords = recommendation.get("keywords", [])
             mood = recommendation.get("mood", "")
             duration = recommendation.get("duration", "")
-            num_videos = recommendation.get("num_videos", 1)
             user_input = (
-                f"Find {num_videos} YouTube videos that includes the following:\n"
+                f"Find {candidates} YouTube videos that includes the following:\n"
                 f"- Types: {', '.join(types)}\n"
                 f"- Keywords: {', '.join(keywords)}\n"
                 f"- Mood: {mood}\n"
@@ -92,7 +120,6 @@ class ContentGeneratorAgent:
                 "Do not include any commentary or explanation outside the JSON array. Only return valid JSON array. Example do not wrap it in ```json or any markdown formatting"
             )
         elif content_type == "spotify":
-            num_playlists = recommendation.get("num_playlists", 1)
             mood = recommendation.get("mood", "")
             genres = recommendation.get("genres", [])
             keywords = recommendation.get("keywords", [])
@@ -100,7 +127,7 @@ class ContentGeneratorAgent:
             valence = recommendation.get("valence", "")
             duration = recommendation.get("duration", "")
             user_input = (
-                f"Find {num_playlists} Spotify playlists that includes the following:\n"
+                f"Find {candidates} Spotify playlists that includes the following:\n"
                 f"- Keywords: {', '.join(keywords)}\n"
                 f"- Genres: {', '.join(genres)}\n"
                 f"- Mood: {mood}\n"
@@ -112,37 +139,35 @@ class ContentGeneratorAgent:
                 "Only return array of JSON with: name, description, image, link, owner, and track count. even if there is only one playlist"
             )
         elif content_type == "articles":
-            num_articles = recommendation.get("num_articles", 1)
             keywords = recommendation.get("keywords", [])
             focus = recommendation.get("focus", [])
             user_input = (
-                f"Find {num_articles} news articles that includes the following:\n"
+                f"Find {candidates} news articles that includes the following:\n"
                 f"- Keywords: {', '.join(keywords)}\n"
                 f"- Focus: {', '.join(focus)}\n"
                 "Generate a comprehensive search query based on all the above fields for the search_news_by_keyword tool \n "
                 "IMPORTANT: Do not use the search_youtube_videos or search_spotify_playlists tool for this field, only use the search_news_by_keyword tool strictly for this field, use single tool call for this field"
                 "Only return array of JSON with: title, snippet, news_url, thumbnail, publisher, timestamp, and published_time. even if there is only one article"
             )
-        else:
-            raise ValueError(f"Invalid content type: {content_type}")
         try:
             response = self.agent_executor.invoke({"input": user_input}) 
+            self._store_tool_results(content_type, recommendation, response)
             
             content = response.get("output", "")
             
             if isinstance(content, list):
-                return content
+                return rank_content(content_type, content, recommendation, wanted)
             
             if isinstance(content, dict):
-                return content
+                return rank_content(content_type, content, recommendation, wanted)
             
             if isinstance(content, str):
                 try:
-                    return json.loads(content)
+                    return rank_content(content_type, json.loads(content), recommendation, wanted)
                 except json.JSONDecodeError:
                     if '```json' in content:
                         json_str = content.split('```json')[1].split('```')[0].strip()
-                        return json.loads(json_str)
+                        return rank_content(content_type, json.loads(json_str), recommendation, wanted)
                     return {"error": "Failed to parse JSON response"}
             
             return {"error": "Unexpected response format"}
@@ -4,6 +4,8 @@ from langchain_core.messages import HumanMessage, SystemMessage
 from tools.meditation_tools import rag_tool
 from tools.youtube_tools import search_youtube_videos_chat
 from config.setting import settings
+from core.tts import MeditationAudioPipeline, create_synthesizer
+from core.audio_index import audio_index, audio_url, public_entry
 import asyncio
 import json
 class MeditationAgent:
@@ -53,6 +55,37 @@ class MeditationAgent:
                     """,
             name="meditation_agent"
         )
+        synthesizer = create_synthesizer()
+        self.audio_pipeline = MeditationAudioPipeline(synthesizer) if synthesizer else None
+
+    async def generate_audio(self, meditation: dict) -> list:
+        """Narration of the generated steps; rendered once per distinct script and voice"""
+        if self.audio_pipeline is None:
+            return []
+        instructions = [step.get("instruction", "") for step in meditation.get("steps") or []]
+        try:
+            audio = await self.audio_pipeline.generate(instructions)
+            entry = audio_index.get(f"generated/{audio['key']}.wav")
+            if entry is None:
+                entry = await asyncio.to_thread(audio_index.add, audio["path"])
+        except Exception as e:
+            print(f"Meditation audio generation failed: {e}")
+            return []
+        return [{
+            "id": audio["key"][:16],
+            "title": meditation.get("title", "Guided Meditation"),
+            "description": meditation.get("description", ""),
+            "audioUrl": audio_url(entry),
+            "duration": audio["duration"],
+            "category": meditation.get("category", "meditation"),
+        }]
+
+    def library_audio(self) -> list:
+        """Curated audio assets, with durations from the startup audio index"""
+        return [
+            {key: entry[key] for key in ("id", "title", "description", "audioUrl", "duration", "category")}
+            for entry in map(public_entry, audio_index.library())
+        ]
 
     async def run(self,user_input, user_id, context, user_persona):
         response = await asyncio.to_thread(self.agent.invoke, {
@@ -63,26 +96,7 @@ class MeditationAgent:
             ]
         }, config={"recursion_limit": 50})
         frontend_response = json.loads(response["messages"][-1].content)
-        frontend_response["premiumAudios"] = [
-            {
-                "id": "1",
-                "title": "Mindfulness Meditation",
-                "description": "A meditation to help you stay present and focused.",
-                "audioUrl": "/meditation_speech_1.mp3",
-                "duration": 93,
-                "category": "meditation",
-                "rating": 4.5
-            },
-            {
-                "id": "2",
-                "title": "Breathing Meditation",
-                "description": "A meditation to help you breathe better.",
-                "audioUrl": "/meditation_speech.mp3",
-                "duration": 66,
-                "category": "meditation",
-                "rating": 4.5
-            }
-        ] 
+        frontend_response["premiumAudios"] = await self.generate_audio(frontend_response) + self.library_audio()
         return {
             "frontend_format": frontend_response,
         }
\ No newline at end of file
@@ -318,6 +318,7 @@ class MoodAnalyzerAgent:
                     
                     full_repo = MoodAnalysisRepository()
                     full_analysis_id = await full_repo.create(full_analysis_model)
+                    full_analysis_model.id = full_analysis_id
                     
                     db_info = {
                         "full_analysis_id": full_analysis_id,
@@ -329,7 +330,7 @@ class MoodAnalyzerAgent:
         
             return {
                 "analysis": parsed_result,
-                "frontend_format": full_analysis_model.from_mongo(full_analysis_model.to_mongo()),
+                "frontend_format": full_analysis_model.model_dump(by_alias=True),
                 "database": db_info
             }
 
@@ -523,6 +523,7 @@ class MoodAnalyzerMasterAgent:
                     
                     full_repo = MoodAnalysisRepository()
                     full_analysis_id = await full_repo.create(full_analysis_model)
+                    full_analysis_model.id = full_analysis_id
                     
                     db_info = {
                         "full_analysis_id": full_analysis_id,
@@ -534,7 +535,7 @@ class MoodAnalyzerMasterAgent:
         
             return {
                 "analysis": parsed_result,
-                "frontend_format": full_analysis_model.from_mongo(full_analysis_model.to_mongo()),
+                "frontend_format": full_analysis_model.model_dump(by_alias=True),
                 "database": db_info
             }
 
@@ -547,14 +548,15 @@ class MoodAnalyzerMasterAgent:
             await init_database()
             
             repo = MoodAnalysisRepository()
-            analyses = await repo.get_by_user_id(user_id, limit)
             
             if simple:
+                analyses = await repo.get_summaries_by_user_id(user_id, limit)
                 return {
-                    "analyses": [analysis.to_simple_format() for analysis in analyses],
+                    "analyses": [analysis.model_dump() for analysis in analyses],
                     "type": "simple"
                 }
             else:
+                analyses = await repo.get_by_user_id(user_id, limit)
                 return {
                     "analyses": [analysis.dict() for analysis in analyses],
                     "type": "full"
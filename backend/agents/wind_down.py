@@ -237,14 +237,15 @@ class WindDownAgent:
             await init_database()
             
             repo = SleepAnalysisRepository()
-            analyses = await repo.get_by_user_id(user_id, limit)
             
             if simple:
+                analyses = await repo.get_summaries_by_user_id(user_id, limit)
                 return {
-                    "analyses": [analysis.to_simple_format() for analysis in analyses],
+                    "analyses": [analysis.model_dump() for analysis in analyses],
                     "type": "simple"
                 }
             else:
+                analyses = await repo.get_by_user_id(user_id, limit)
                 return {
                     "analyses": [analysis.dict() for analysis in analyses],
                     "type": "full"
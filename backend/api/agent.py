@@ -1,6 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse
-from fastapi.encoders import jsonable_encoder
+from core.responses import APIJSONResponse
 from models.agent import AgentRequest, AgentResponse
 from core.security import get_current_user
 from agents import get_agent
@@ -23,7 +22,7 @@ async def run_agent(agent_name: str, req: AgentRequest, current_user_info: dict
         if result.get("error"):
             raise HTTPException(status_code=500, detail=result.get("error"))
         
-        return JSONResponse(content=jsonable_encoder(result.get("frontend_format")))
+        return APIJSONResponse(content=result.get("frontend_format"))
     except Exception as e:
         # Log the full error for debugging
         print(f"Error running agent '{agent_name}': {e}")
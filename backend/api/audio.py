@@ -0,0 +1,44 @@
+import asyncio
+import os
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import FileResponse
+from core.audio_index import audio_index, public_entry
+from core.responses import APIJSONResponse
+
+router = APIRouter()
+
+# Generated narration is content-addressed, so its bytes never change under a URL
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+LIBRARY_CACHE_CONTROL = "public, max-age=604800"
+
+
+def cache_control(entry: dict) -> str:
+    return IMMUTABLE_CACHE_CONTROL if entry["path"].startswith("generated/") else LIBRARY_CACHE_CONTROL
+
+
+@router.get("/", response_model=list)
+async def list_audio():
+    return APIJSONResponse([public_entry(entry) for entry in audio_index.library()])
+
+
+@router.api_route("/{path:path}", methods=["GET", "HEAD"])
+async def get_audio(path: str, request: Request):
+    # Only indexed files are served, which also rules out path traversal
+    entry = audio_index.get(path)
+    if not entry:
+        raise HTTPException(status_code=404, detail="Audio not found")
+    file_path = audio_index.absolute_path(entry)
+    try:
+        stat = await asyncio.to_thread(os.stat, file_path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Audio not found")
+    if stat.st_size != entry["size"] or stat.st_mtime != entry["mtime"]:
+        # Replaced since it was indexed; the ETag must follow the new content
+        entry = await asyncio.to_thread(audio_index.add, file_path)
+    etag = f'"{entry["sha256"]}"'
+    headers = {"ETag": etag, "Cache-Control": cache_control(entry)}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]):
+        return Response(status_code=304, headers=headers)
+    # FileResponse answers Range / If-Range requests (206, multipart, 416) against these headers
+    return FileResponse(file_path, media_type=entry["contentType"], headers=headers, stat_result=stat)
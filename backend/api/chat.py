@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, BackgroundTasks, Query
 from models.chat import ChatModel, MessageModel
 from models.user import UserInDB
 from database.mongo_client import get_database
@@ -8,6 +8,11 @@ from bson import ObjectId
 from models.chat import ChatRepository, MessageRepository
 from core.security import get_current_user
 from agents import get_agent
+from core.responses import APIJSONResponse
+from typing import Optional
+from config.setting import settings
+from utils.chat_history import trim_to_token_budget
+import asyncio
 
 chat_repository = ChatRepository()
 message_repository = MessageRepository()
@@ -16,6 +21,29 @@ router = APIRouter()
 
 
 
+def _parse_cursor(cursor: str):
+    try:
+        at, chat_id = cursor.rsplit("|", 1)
+        if not ObjectId.is_valid(chat_id):
+            raise ValueError(chat_id)
+        return datetime.fromisoformat(at), chat_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/")
+async def list_chats(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user_info = Depends(get_current_user)
+):
+    chats = await chat_repository.list_for_user(
+        current_user_info["user"].id, limit, _parse_cursor(cursor) if cursor else None
+    )
+    next_cursor = None
+    if len(chats) == limit:
+        next_cursor = f"{chats[-1].lastMessageAt.isoformat()}|{chats[-1].id}"
+    return APIJSONResponse({"chats": [c.model_dump() for c in chats], "nextCursor": next_cursor})
+
 @router.post("/initialize")
 async def initialize_chat(current_user_info = Depends(get_current_user)):
     current_user = current_user_info["user"]
@@ -29,12 +57,19 @@ async def initialize_chat(current_user_info = Depends(get_current_user)):
 async def send_message(
     chatId: str,
     body: Dict[str, Any],
+    background_tasks: BackgroundTasks,
     current_user_info = Depends(get_current_user)
 ):
     current_user = current_user_info["user"]
-    chat = await chat_repository.get_by_id(chatId)
-    if not chat:
+    # History is read before the new message is stored; the client's context.recentMessages is ignored.
+    # The chat lookup can't overlap the agent run: it gates ownership and carries the summary.
+    chat, history = await asyncio.gather(
+        chat_repository.get_by_id(chatId),
+        message_repository.get_history(chatId),
+    )
+    if not chat or chat.userId != current_user.id:
         raise HTTPException(status_code=404, detail="Chat not found")
+    recent_messages = trim_to_token_budget(history, settings.CHAT_HISTORY_TOKEN_BUDGET)
     user_message = MessageModel(
         chatId=chatId,
         userId=current_user.id,
@@ -42,18 +77,27 @@ async def send_message(
         sender="user",
         timestamp=datetime.utcnow(),
     )
-    await message_repository.create(user_message)
-    context = body.get("context", {})
-    recent_messages = context.get("recentMessages", [])
-    
-    chat_agent = get_agent("chat_agent")
-    ai_response = await chat_agent.run(
-        user_input=body["message"],
-        user_id=current_user.id,
-        context=None,
-        user_persona=current_user_info["user_persona"],
-        recent_messages=recent_messages
+    # Stored while the agent runs
+    user_message_write = asyncio.gather(
+        message_repository.create(user_message),
+        chat_repository.record_message(chatId, user_message),
     )
+
+    chat_agent = get_agent("chat_agent")
+    try:
+        ai_response = await chat_agent.run(
+            user_input=body["message"],
+            user_id=current_user.id,
+            context=None,
+            user_persona=current_user_info["user_persona"],
+            recent_messages=recent_messages,
+            summary=chat.summary,
+            chat_id=chatId,
+            summarized_until=chat.summarizedUntil,
+            sent_at=user_message.timestamp,
+        )
+    finally:
+        await user_message_write
     ai_message = MessageModel(
         chatId=chatId,
         userId=current_user.id,
@@ -63,5 +107,8 @@ async def send_message(
         mood=ai_response.get("mood"),
         suggestions=ai_response.get("suggestions"),
     )
-    await message_repository.create(ai_message)
+    await message_repository.create_deferred(ai_message)
+    await chat_repository.record_message_deferred(chatId, ai_message)
+    # Compacting older turns happens after the response is sent
+    background_tasks.add_task(get_agent("chat_summarizer").maybe_summarize, chatId)
     return ai_response 
\ No newline at end of file
@@ -1,12 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from bson.errors import InvalidId
 from models.user import UserInDB
 from core.security import get_current_user
 from models.mood_analysis import MoodAnalysisRepository
+from core.responses import APIJSONResponse
 
 router = APIRouter()
 
 @router.get("/")
-async def get_all_mood_analysis(current_user_info = Depends(get_current_user)):
+async def get_all_mood_analysis(
+    limit: int = Query(100, ge=1, le=100),
+    current_user_info = Depends(get_current_user)
+):
     repo = MoodAnalysisRepository()
-    analyses = await repo.get_by_user_id(current_user_info["user"].id)
-    return [a.model_dump() for a in analyses]     
\ No newline at end of file
+    summaries = await repo.get_summaries_by_user_id(current_user_info["user"].id, limit)
+    return APIJSONResponse([s.model_dump() for s in summaries])
+
+@router.get("/{analysis_id}")
+async def get_mood_analysis(analysis_id: str, current_user_info = Depends(get_current_user)):
+    repo = MoodAnalysisRepository()
+    try:
+        analysis = await repo.get_by_id_for_user(analysis_id, current_user_info["user"].id)
+    except InvalidId:
+        analysis = None
+    if not analysis:
+        raise HTTPException(status_code=404, detail="Mood analysis not found")
+    return APIJSONResponse(analysis.model_dump())
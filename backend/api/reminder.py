@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException
 from models.reminder import Reminder, ReminderRepository
 from core.security import get_current_user
-from fastapi.encoders import jsonable_encoder
+from core.responses import APIJSONResponse
+from database.ids import without_identity
 from datetime import datetime, timezone
 router = APIRouter()
 
@@ -11,38 +12,36 @@ async def create_reminder(reminder: dict, current_user_info=Depends(get_current_
     reminder["userId"] = current_user_info["user"].id
     reminder["createdAt"] = datetime.utcnow().replace(tzinfo=timezone.utc).isoformat()
     reminder["updatedAt"] = datetime.utcnow().replace(tzinfo=timezone.utc).isoformat()
-    inserted_id = await repo.create(reminder)
-    reminder_created = await repo.get_by_id(inserted_id)
-    return jsonable_encoder(reminder_created)
+    reminder_created = await repo.insert(reminder)
+    return APIJSONResponse(reminder_created.model_dump(by_alias=True))
 
 @router.get("/", response_model=list)
 async def get_reminders(current_user_info=Depends(get_current_user)):
     repo = ReminderRepository()
     reminders = await repo.get_by_user_id(current_user_info["user"].id)
-    return [jsonable_encoder(r) for r in reminders]
+    return APIJSONResponse([r.model_dump(by_alias=True) for r in reminders])
 
 @router.get("/{reminder_id}", response_model=dict)
 async def get_reminder(reminder_id: str, current_user_info=Depends(get_current_user)):
     repo = ReminderRepository()
-    reminder = await repo.get_by_id(reminder_id)
-    if not reminder or reminder.userId != current_user_info["user"].id:
+    reminder = await repo.get_owned(reminder_id, current_user_info["user"].id)
+    if not reminder:
         raise HTTPException(status_code=404, detail="Reminder not found")
-    return jsonable_encoder(reminder)
+    return APIJSONResponse(reminder.model_dump(by_alias=True))
 
 @router.put("/{reminder_id}", response_model=dict)
 async def update_reminder(reminder_id: str, updates: dict, current_user_info=Depends(get_current_user)):
+    if not without_identity(updates):
+        raise HTTPException(status_code=400, detail="No updatable fields")
     repo = ReminderRepository()
-    reminder = await repo.get_by_id(reminder_id)
-    if not reminder or reminder.userId != current_user_info["user"].id:
+    reminder = await repo.update_owned(reminder_id, current_user_info["user"].id, updates)
+    if not reminder:
         raise HTTPException(status_code=404, detail="Reminder not found")
-    success = await repo.update(reminder_id, updates)
-    return {"success": success}
+    return APIJSONResponse(reminder.model_dump(by_alias=True))
 
 @router.delete("/{reminder_id}", response_model=dict)
 async def delete_reminder(reminder_id: str, current_user_info=Depends(get_current_user)):
     repo = ReminderRepository()
-    reminder = await repo.get_by_id(reminder_id)
-    if not reminder or reminder.userId != current_user_info["user"].id:
+    if not await repo.delete_owned(reminder_id, current_user_info["user"].id):
         raise HTTPException(status_code=404, detail="Reminder not found")
-    success = await repo.delete(reminder_id)
-    return {"success": success} 
\ No newline at end of file
+    return {"success": True} 
\ No newline at end of file
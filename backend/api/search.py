@@ -0,0 +1,63 @@
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from bson import ObjectId
+from core.security import get_current_user
+from core.responses import APIJSONResponse
+from core.semantic_search import semantic_index
+from models.search import SearchRepository, SearchHit, SOURCES, highlight, query_terms
+
+router = APIRouter()
+
+
+def _parse_sources(sources: Optional[str]):
+    if not sources:
+        return list(SOURCES)
+    parsed = [source.strip() for source in sources.split(",") if source.strip()]
+    unknown = [source for source in parsed if source not in SOURCES]
+    if unknown or not parsed:
+        raise HTTPException(status_code=400, detail=f"Unknown search source: {', '.join(unknown)}")
+    return parsed
+
+
+def _parse_text_cursor(cursor: str):
+    try:
+        score, last_id = cursor.split("|", 1)
+        if not ObjectId.is_valid(last_id):
+            raise ValueError(last_id)
+        return float(score), last_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("/")
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    sources: Optional[str] = Query(None, description="Comma separated: messages, journal"),
+    mode: Literal["text", "semantic"] = "text",
+    limit: int = Query(20, ge=1, le=50),
+    cursor: Optional[str] = None,
+    current_user_info = Depends(get_current_user)
+):
+    user_id = current_user_info["user"].id
+    source_list = _parse_sources(sources)
+
+    if mode == "semantic":
+        if not semantic_index.enabled:
+            raise HTTPException(status_code=400, detail="Semantic search is not enabled")
+        try:
+            offset = int(cursor) if cursor else 0
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        rows = await semantic_index.query(user_id, q, source_list, limit + 1, offset)
+        terms = query_terms(q)
+        hits = []
+        for row in rows[:limit]:
+            snippet, spans = highlight(row["text"], terms)
+            hits.append(SearchHit(snippet=snippet, highlights=spans, **{k: v for k, v in row.items() if k != "text"}))
+        next_cursor = str(offset + limit) if len(rows) > limit else None
+    else:
+        repo = SearchRepository()
+        hits, after = await repo.search(user_id, q, source_list, limit, _parse_text_cursor(cursor) if cursor else None)
+        next_cursor = f"{after[0]!r}|{after[1]}" if after else None
+
+    return APIJSONResponse({"results": [hit.model_dump() for hit in hits], "nextCursor": next_cursor})
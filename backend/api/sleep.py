@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
+from pydantic import ValidationError
 from models.sleep_record import SleepRecord, SleepRecordRepository
 from core.security import get_current_user
-from fastapi.encoders import jsonable_encoder
+from core.responses import APIJSONResponse
+from utils.sleep_analytics import compute_sleep_stats, sleep_stats_cache
 
 router = APIRouter()
 
@@ -9,37 +11,49 @@ router = APIRouter()
 async def create_sleep_record(record: dict, current_user_info=Depends(get_current_user)):
     repo = SleepRecordRepository()
     record["userId"] = current_user_info["user"].id
-    inserted_id = await repo.create(record)
-    return {"id": inserted_id}
+    try:
+        created = await repo.insert(record)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False, include_input=False))
+    return {"id": created.id}
 
 @router.get("/", response_model=list)
 async def get_sleep_records(current_user_info=Depends(get_current_user)):
     repo = SleepRecordRepository()
     records = await repo.get_by_user_id(current_user_info["user"].id)
-    return [jsonable_encoder(r) for r in records]
+    return APIJSONResponse([r.model_dump(by_alias=True) for r in records])
+
+@router.get("/stats", response_model=dict)
+async def get_sleep_stats(current_user_info=Depends(get_current_user)):
+    user_id = current_user_info["user"].id
+    stats = sleep_stats_cache.get(user_id)
+    if stats is None:
+        generation = sleep_stats_cache.generation(user_id)
+        repo = SleepRecordRepository()
+        stats = compute_sleep_stats(await repo.get_stats_rows(user_id))
+        # Skipped if a record changed while the stats were computed
+        sleep_stats_cache.set(user_id, stats, generation)
+    return APIJSONResponse(stats)
 
 @router.get("/{record_id}", response_model=dict)
 async def get_sleep_record(record_id: str, current_user_info=Depends(get_current_user)):
     repo = SleepRecordRepository()
-    record = await repo.get_by_id(record_id)
-    if not record or record.userId != current_user_info["user"].id:
+    record = await repo.get_owned(record_id, current_user_info["user"].id)
+    if not record:
         raise HTTPException(status_code=404, detail="Sleep record not found")
-    return jsonable_encoder(record)
+    return APIJSONResponse(record.model_dump(by_alias=True))
 
 @router.put("/{record_id}", response_model=dict)
 async def update_sleep_record(record_id: str, updates: dict, current_user_info=Depends(get_current_user)):
     repo = SleepRecordRepository()
-    record = await repo.get_by_id(record_id)
-    if not record or record.userId != current_user_info["user"].id:
+    record = await repo.update_owned(record_id, current_user_info["user"].id, updates)
+    if not record:
         raise HTTPException(status_code=404, detail="Sleep record not found")
-    success = await repo.update(record_id, updates)
-    return {"success": success}
+    return {"success": True}
 
 @router.delete("/{record_id}", response_model=dict)
 async def delete_sleep_record(record_id: str, current_user_info=Depends(get_current_user)):
     repo = SleepRecordRepository()
-    record = await repo.get_by_id(record_id)
-    if not record or record.userId != current_user_info["user"].id:
+    if not await repo.delete_owned(record_id, current_user_info["user"].id):
         raise HTTPException(status_code=404, detail="Sleep record not found")
-    success = await repo.delete(record_id)
-    return {"success": success} 
\ No newline at end of file
+    return {"success": True} 
\ No newline at end of file
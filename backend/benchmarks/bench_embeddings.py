@@ -0,0 +1,92 @@
+"""Query embedding latency of the local ONNX backend vs OpenAI, and the recall@k
+of ONNX retrieval against OpenAI's on the meditation corpus.
+
+Needs OPENAI_API_KEY and, on first run, network access to download the ONNX
+model. Embeddings are computed without the cache so latencies are real.
+Run from the backend directory: python -m benchmarks.bench_embeddings [--k 4]
+"""
+from dotenv import load_dotenv
+load_dotenv()
+
+import argparse
+import os
+import time
+import numpy as np
+from langchain_openai import OpenAIEmbeddings
+from config.setting import settings
+from core.chroma import BACKEND_DIR
+from core.embeddings import OnnxEmbeddings
+from core.ingestion import load_chunks
+
+QUERIES = [
+    "How do I start meditating as a beginner?",
+    "What is a breathing meditation?",
+    "How long should I meditate each day?",
+    "What posture should I sit in?",
+    "What do I do when my mind wanders?",
+    "How can meditation help with stress?",
+    "What is walking meditation?",
+    "How do I use a mantra?",
+    "What is loving-kindness meditation?",
+    "Can meditation help me sleep?",
+    "What is a body scan?",
+    "How do I focus on a candle flame?",
+]
+
+
+def corpus():
+    source_dir = os.path.join(BACKEND_DIR, settings.RAG_SOURCE_DIR)
+    return [
+        text
+        for name in sorted(os.listdir(source_dir)) if name.lower().endswith(".pdf")
+        for text, _ in load_chunks(os.path.join(source_dir, name))
+    ]
+
+
+def top_k(query_vectors, document_vectors, k):
+    documents = np.asarray(document_vectors, dtype=np.float32)
+    documents /= np.linalg.norm(documents, axis=1, keepdims=True)
+    queries = np.asarray(query_vectors, dtype=np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    return np.argsort(-(queries @ documents.T), axis=1)[:, :k]
+
+
+def query_latencies(embeddings):
+    embeddings.embed_query("warm up")
+    latencies = []
+    for query in QUERIES:
+        started = time.perf_counter()
+        embeddings.embed_query(query)
+        latencies.append(time.perf_counter() - started)
+    return np.array(latencies) * 1000
+
+
+def main(k: int):
+    chunks = corpus()
+    backends = {
+        "openai": OpenAIEmbeddings(api_key=settings.OPENAI_API_KEY, model=settings.RAG_EMBEDDING_MODEL),
+        "onnx": OnnxEmbeddings(),
+    }
+    print(f"{len(chunks)} chunks, {len(QUERIES)} queries")
+    rankings = {}
+    for name, embeddings in backends.items():
+        started = time.perf_counter()
+        document_vectors = embeddings.embed_documents(chunks)
+        corpus_seconds = time.perf_counter() - started
+        latencies = query_latencies(embeddings)
+        rankings[name] = top_k([embeddings.embed_query(query) for query in QUERIES], document_vectors, k)
+        print(
+            f"{name:<7} query p50 {np.percentile(latencies, 50):7.1f}ms   p95 {np.percentile(latencies, 95):7.1f}ms   "
+            f"corpus {corpus_seconds:6.1f}s   dim {len(document_vectors[0])}"
+        )
+    recall = np.mean([
+        len(set(onnx) & set(openai)) / k for onnx, openai in zip(rankings["onnx"], rankings["openai"])
+    ])
+    print(f"onnx recall@{k} vs openai: {recall:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Embedding backend benchmark")
+    parser.add_argument("--k", type=int, default=settings.RAG_TOP_K)
+    args = parser.parse_args()
+    main(args.k)
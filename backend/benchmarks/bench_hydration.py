@@ -0,0 +1,50 @@
+"""Validated vs trusted hydration of a 100 document page.
+
+The analyses stay on the validated path; they are measured through
+construct_model directly to show what skipping validation would save.
+
+Run from the backend directory: python -m benchmarks.bench_hydration
+"""
+from dotenv import load_dotenv
+load_dotenv()
+
+import timeit
+from models.mood_analysis import MoodAnalysis
+from models.sleep_analysis import SleepAnalysis
+from models.user import UserInDB
+from models.hydration import construct_model
+from benchmarks.fixtures import mood_analysis_doc, sleep_analysis_doc, user_doc
+
+PAGE_SIZE = 100
+REPEAT = 50
+
+
+def trusted_analysis(model, doc):
+    """What a trusted from_mongo of an analysis would do"""
+    data = doc.copy()
+    data["id"] = str(data.pop("_id"))
+    data["userId"] = str(data["userId"])
+    return construct_model(model, data)
+
+
+def bench(name, model, docs, trusted_hydrate=None):
+    trusted_hydrate = trusted_hydrate or model.from_mongo_trusted
+    validated = timeit.timeit(lambda: [model.from_mongo(doc) for doc in docs], number=REPEAT) / REPEAT
+    trusted = timeit.timeit(lambda: [trusted_hydrate(doc) for doc in docs], number=REPEAT) / REPEAT
+    print(f"{name:<14} from_mongo {validated * 1000:8.2f}ms   trusted {trusted * 1000:8.2f}ms   {validated / trusted:5.1f}x")
+
+
+def main():
+    print(f"Hydrating {PAGE_SIZE} documents, mean of {REPEAT} runs")
+    bench("MoodAnalysis", MoodAnalysis, [mood_analysis_doc(i) for i in range(PAGE_SIZE)], lambda doc: trusted_analysis(MoodAnalysis, doc))
+    bench("SleepAnalysis", SleepAnalysis, [sleep_analysis_doc(i) for i in range(PAGE_SIZE)], lambda doc: trusted_analysis(SleepAnalysis, doc))
+    bench("UserInDB", UserInDB, [user_doc(i) for i in range(PAGE_SIZE)])
+
+    model = MoodAnalysis.from_mongo(mood_analysis_doc(0))
+    double = timeit.timeit(lambda: model.from_mongo(model.to_mongo()), number=REPEAT * 10) / (REPEAT * 10)
+    single = timeit.timeit(lambda: model.model_dump(by_alias=True), number=REPEAT * 10) / (REPEAT * 10)
+    print(f"Agent response  from_mongo(to_mongo()) {double * 1000:.3f}ms   model_dump {single * 1000:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Response rendering for a 100 item mood history.
+
+Compares the previous jsonable_encoder + JSONResponse path with APIJSONResponse.
+Run from the backend directory: python -m benchmarks.bench_serialization
+"""
+from dotenv import load_dotenv
+load_dotenv()
+
+import timeit
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from core.responses import APIJSONResponse
+from models.mood_analysis import MoodAnalysis, MoodAnalysisSummary, SUMMARY_PROJECTION
+from benchmarks.fixtures import mood_analysis_doc
+
+PAGE_SIZE = 100
+REPEAT = 50
+
+
+def timed(fn) -> float:
+    return timeit.timeit(fn, number=REPEAT) / REPEAT * 1000
+
+
+def project(doc: dict) -> dict:
+    """Apply SUMMARY_PROJECTION the way Mongo would"""
+    projected = {"_id": doc["_id"]}
+    for path in SUMMARY_PROJECTION:
+        head, _, tail = path.partition(".")
+        if tail:
+            projected.setdefault(head, {})[tail] = doc[head][tail]
+        else:
+            projected[head] = doc[head]
+    return projected
+
+
+def main():
+    docs = [mood_analysis_doc(i) for i in range(PAGE_SIZE)]
+    models = [MoodAnalysis.from_mongo(doc) for doc in docs]
+    summaries = [MoodAnalysisSummary.from_mongo(project(doc)) for doc in docs]
+
+    results = [
+        ("full, jsonable_encoder + JSONResponse", lambda: JSONResponse(jsonable_encoder(models)).body),
+        ("full, APIJSONResponse(model_dump)", lambda: APIJSONResponse([m.model_dump(by_alias=True) for m in models]).body),
+        ("full, APIJSONResponse(models)", lambda: APIJSONResponse(models).body),
+        ("summary, jsonable_encoder + JSONResponse", lambda: JSONResponse(jsonable_encoder(summaries)).body),
+        ("summary, APIJSONResponse(model_dump)", lambda: APIJSONResponse([s.model_dump() for s in summaries]).body),
+    ]
+    print(f"Rendering {PAGE_SIZE} mood analyses, mean of {REPEAT} runs")
+    for name, fn in results:
+        size = len(fn())
+        print(f"{name:<42} {timed(fn):8.2f}ms  {size / 1024:8.1f}KiB")
+
+
+if __name__ == "__main__":
+    main()
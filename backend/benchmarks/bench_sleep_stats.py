@@ -0,0 +1,33 @@
+"""/api/sleep/stats computation for a user with years of nightly records.
+
+Run from the backend directory: python -m benchmarks.bench_sleep_stats
+"""
+from dotenv import load_dotenv
+load_dotenv()
+
+import timeit
+from utils.sleep_analytics import SleepSeries, compute_sleep_stats
+from benchmarks.fixtures import sleep_record_stats_row
+
+YEARS = (1, 3, 10)
+REPEAT = 20
+
+
+def timed(fn) -> float:
+    return timeit.timeit(fn, number=REPEAT) / REPEAT * 1000
+
+
+def main():
+    print(f"Sleep stats, mean of {REPEAT} runs")
+    for years in YEARS:
+        nights = years * 365
+        rows = [sleep_record_stats_row(i, nights) for i in range(nights)]
+        series = SleepSeries(rows)
+        print(
+            f"{years:>2} years ({nights} nights)  parse {timed(lambda: SleepSeries(rows)):7.2f}ms  "
+            f"summary {timed(series.summary):7.2f}ms  total {timed(lambda: compute_sleep_stats(rows)):7.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+from datetime import datetime, timedelta
+from bson import ObjectId
+
+USER_ID = ObjectId()
+
+
+def mood_analysis_doc(i: int) -> dict:
+    """A stored mood analysis shaped like the ones MoodAnalyzerAgent writes"""
+    created = datetime.utcnow() - timedelta(hours=i * 7)
+    return {
+        "_id": ObjectId(),
+        "userId": USER_ID,
+        "input": "I couldn't sleep again last night and work has been piling up, I feel on edge all day. " * 3,
+        "context": {},
+        "analysis": {
+            "primaryMood": ["Anxious", "Calm", "Frustrated", "Happy"][i % 4],
+            "moodCategory": ["negative", "positive", "negative", "positive"][i % 4],
+            "confidence": 85,
+            "intensity": 1 + i % 10,
+            "emotions": [{"emotion": "Frustration", "score": 80}, {"emotion": "Worry", "score": 70}, {"emotion": "Fatigue", "score": 60}],
+            "sentiment": {"polarity": -0.5, "subjectivity": 0.8},
+        },
+        "insights": {
+            "summary": "You seem to be feeling frustrated and confused about your inability to sleep. This may indicate underlying stress or racing thoughts.",
+            "keyThemes": ["sleep", "stress", "work"],
+            "triggers": ["late hours", "inability to sleep"],
+            "strengths": ["awareness of your sleep needs"],
+            "concerns": ["persistent sleeplessness"],
+        },
+        "recommendations": {
+            "immediate": [f"Practice deep breathing exercise number {n} to calm your mind." for n in range(6)],
+            "content": {
+                "youtube": {
+                    "types": ["meditation", "breathing exercises"],
+                    "keywords": ["sleep meditation", "anxiety relief", "calm", "relax", "breathing"],
+                    "duration": "medium",
+                    "mood": "calm",
+                    "videos": [
+                        {
+                            "video_id": f"vid{n}",
+                            "video_url": f"https://www.youtube.com/watch?v=vid{n}",
+                            "title": "Guided Meditation for Deep Sleep and Anxiety Relief",
+                            "description": "A calming guided meditation to help you let go of the day. " * 4,
+                            "duration_seconds": 1200,
+                            "published_time": "2024-03-01T10:00:00Z",
+                            "views": 1250000,
+                            "thumbnail": f"https://i.ytimg.com/vi/vid{n}/hqdefault.jpg",
+                            "channel": {
+                                "title": "Calm Channel",
+                                "channel_id": "UC123",
+                                "avatar": "https://yt3.ggpht.com/avatar.jpg",
+                                "channel_url": "https://www.youtube.com/channel/UC123",
+                            },
+                        }
+                        for n in range(6)
+                    ],
+                },
+                "articles": {
+                    "keywords": ["sleep hygiene", "stress"],
+                    "focus": ["coping strategies"],
+                    "articles": [
+                        {
+                            "title": "How to fall asleep when your mind won't stop",
+                            "snippet": "Experts share techniques for quieting racing thoughts at night.",
+                            "news_url": f"https://example.com/article-{n}",
+                            "thumbnail": "https://example.com/thumb.jpg",
+                            "source": {"name": "Example News", "url": "https://example.com"},
+                            "published_time": "2024-03-01T10:00:00Z",
+                        }
+                        for n in range(6)
+                    ],
+                },
+                "spotify": {
+                    "genres": ["ambient", "classical"],
+                    "energy": 0.2,
+                    "valence": 0.4,
+                    "mood": "relaxing",
+                    "playlist": {
+                        "query": "sleep ambient",
+                        "total": 6,
+                        "playlists": [
+                            {
+                                "name": "Deep Sleep",
+                                "description": "Gentle ambient soundscapes for deep sleep",
+                                "external_url": "https://open.spotify.com/playlist/abc",
+                                "image": "https://i.scdn.co/image/abc",
+                                "owner": {"name": "Spotify", "url": "https://open.spotify.com/user/spotify"},
+                                "tracks": {"url": "https://api.spotify.com/v1/playlists/abc/tracks", "total": 120},
+                            }
+                            for _ in range(6)
+                        ],
+                    },
+                },
+                "meditation": {"types": ["breathing", "body scan"], "duration": 10, "difficulty": "beginner"},
+            },
+        },
+        "followUp": {
+            "questions": ["How long have you had trouble sleeping?", "What usually helps you relax?"],
+            "checkIn": "in 24 hours",
+            "goals": ["Sleep 7 hours tonight"],
+        },
+        "riskAssessment": {"level": "low", "indicators": [], "recommendations": [], "urgency": "none"},
+        "metadata": {"wordCount": 57, "complexity": "moderate", "timeOfDay": "night", "context": ["work", "health"]},
+        "createdAt": created,
+        "updatedAt": created,
+    }
+
+
+def sleep_analysis_doc(i: int) -> dict:
+    """A stored sleep analysis shaped like the ones SleepCoachAgent writes"""
+    created = datetime.utcnow() - timedelta(hours=i * 11)
+    return {
+        "_id": ObjectId(),
+        "userId": USER_ID,
+        "input": "I keep waking up at 3am and can't get back to sleep.",
+        "context": {},
+        "sleepAssessment": {
+            "issue": ["insomnia", "night waking", "irregular schedule"][i % 3],
+            "confidence": 0.8,
+            "severity": ["low", "medium", "high"][i % 3],
+            "summary": "Frequent night waking with difficulty returning to sleep, likely stress related.",
+            "sleepHistoryDetected": True,
+            "userMood": "tired",
+            "sleepDurationTrend": "decreasing",
+        },
+        "routineRecommendation": {
+            "windDown": ["Dim the lights an hour before bed", "Read a paper book"],
+            "avoidBeforeBed": ["Caffeine after 2pm", "Screens"],
+            "optimalSleepTime": "22:30",
+            "optimalWakeTime": "06:30",
+            "reminders": ["Start winding down at 21:30"],
+        },
+        "tips": {
+            "immediateActions": ["Keep a notepad by the bed"],
+            "lifestyleChanges": ["Regular exercise in the morning"],
+            "environmentSuggestions": ["Keep the room cool and dark"],
+        },
+        "recommendations": {
+            "immediate": ["Try 4-7-8 breathing when you wake at night"],
+            "content": {
+                "spotify": {
+                    "genres": ["ambient"],
+                    "energy": 0.1,
+                    "valence": 0.4,
+                    "mood": "relaxing",
+                    "playlist": {"playlists": [{"name": "Sleep", "external_url": "https://open.spotify.com/playlist/abc"}] * 6},
+                }
+            },
+        },
+        "disorderCheck": {"riskLevel": "low", "symptoms": ["night waking"], "recommendations": [], "complianceRisk": "low"},
+        "followUp": {"checkInPeriod": "weekly", "trackMetrics": ["wake ups"], "goals": ["Sleep through the night"]},
+        "metadata": {"wordCount": 12, "timeOfDayMentioned": "night", "contextTags": ["stress"]},
+        "createdAt": created,
+        "updatedAt": created,
+    }
+
+
+def sleep_record_stats_row(i: int, nights: int) -> dict:
+    """Night `i` of `nights` as read by get_stats_rows; every fifth is a legacy record with display strings only"""
+    date = datetime(2026, 1, 1) - timedelta(days=nights - i)
+    bed = (22 * 60 + 40 + (i * 37) % 150) % 1440
+    duration = 360 + (i * 53) % 180
+    wake = (bed + duration) % 1440
+    row = {
+        "date": date,
+        "bedtime": f"{bed // 60:02d}:{bed % 60:02d}",
+        "wakeTime": f"{wake // 60:02d}:{wake % 60:02d}",
+        "duration": f"{duration // 60}h {duration % 60}m",
+        "quality": 1 + i % 5,
+        "factors": [["caffeine"], ["screen", "stress"], [], ["exercise"], ["alcohol", "screen"]][i % 5],
+    }
+    if i % 5:
+        row.update({"bedtimeMinutes": bed, "wakeMinutes": wake, "durationMinutes": duration})
+    else:
+        row["date"] = date.strftime("%Y-%m-%d")
+    return row
+
+
+def user_doc(i: int) -> dict:
+    """A stored user after onboarding"""
+    return {
+        "_id": ObjectId(),
+        "email": f"user{i}@example.com",
+        "firstName": "Sam",
+        "lastName": "Rai",
+        "hashedPassword": "$2b$12$" + "x" * 53,
+        "profile": {
+            "avatar": None,
+            "bio": "Trying to sleep better.",
+            "dateOfBirth": datetime(1995, 5, 17),
+            "gender": "female",
+            "country": "Nepal",
+            "location": "Kathmandu",
+            "phoneNumber": None,
+            "mentalHealthGoals": ["reduce stress", "sleep better"],
+            "currentChallenges": ["work pressure"],
+            "wellnessInterests": ["meditation", "yoga"],
+            "experienceLevel": "beginner",
+            "preferredActivities": ["breathing", "music"],
+        },
+        "stats": {"daysActive": 12},
+        "achievements": [{"title": "First entry", "description": "Logged a mood", "earned": True, "earnedDate": datetime.utcnow()}],
+        "preferences": {
+            "notifications": {"dailyReminders": True, "meditationReminders": True, "sleepReminders": False},
+            "language": "en",
+            "timezone": "Asia/Kathmandu",
+            "communicationStyle": "gentle",
+        },
+        "goals": [{"title": "Meditate", "current": 3, "target": 10, "unit": "sessions", "type": "meditation", "reverse": False}],
+        "isOnboardComplete": True,
+        "emergencyEmail": "friend@example.com",
+        "createdAt": datetime.utcnow(),
+        "updatedAt": datetime.utcnow(),
+    }
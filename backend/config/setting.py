@@ -1,3 +1,4 @@
+from typing import Dict
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -12,6 +13,76 @@ class Settings(BaseSettings):
     DATABASE_NAME: str
     MONGODB_DB_NAME: str
     YOUTUBE_API_KEY: str
+
+    MONGODB_MAX_POOL_SIZE: int = 100
+    MONGODB_MIN_POOL_SIZE: int = 5
+    MONGODB_MAX_IDLE_TIME_MS: int = 300000
+    MONGODB_CONNECT_TIMEOUT_MS: int = 5000
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = 5000
+    MONGODB_SOCKET_TIMEOUT_MS: int = 30000
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS: int = 5000
+    MONGODB_SLOW_QUERY_MS: int = 100
+
+    CHAT_HISTORY_MAX_TURNS: int = 10
+    CHAT_HISTORY_TOKEN_BUDGET: int = 3000
+    CHAT_SUMMARY_TRIGGER_MESSAGES: int = 10
+    CHAT_CHECKPOINT_KEEP_LAST: int = 5
+    CHAT_CHECKPOINT_TTL_DAYS: int = 30
+    WRITE_BEHIND_FLUSH_INTERVAL_MS: int = 500
+    WRITE_BEHIND_MAX_BATCH: int = 100
+
+    SEARCH_SEMANTIC_ENABLED: bool = False
+
+    # Relative paths are resolved against the backend directory
+    CHROMA_PERSIST_DIR: str = "chroma_db"
+    RAG_SOURCE_DIR: str = "pdfs"
+    RAG_COLLECTION: str = "langchain"
+    RAG_EMBEDDING_MODEL: str = "text-embedding-ada-002"
+    RAG_TOP_K: int = 4
+    RAG_SCORE_THRESHOLD: float = 0.3
+    RAG_HYBRID_CANDIDATES: int = 20
+    RAG_FUSION_K: int = 60
+    RAG_BM25_MIN_SCORE: float = 0.1
+    EMBEDDING_CACHE_PATH: str = "embedding_cache.sqlite3"
+    # "openai" or "onnx" (local MiniLM); EMBEDDING_BACKENDS overrides it per Chroma collection, as JSON:
+    # RAG_COLLECTION, "content_catalog" and "user_search" (re-embed it with scripts.reindex_semantic_search)
+    EMBEDDING_BACKEND: str = "openai"
+    EMBEDDING_BACKENDS: Dict[str, str] = {}
+    EMBEDDING_BATCH_SIZE: int = 32
+    EMBEDDING_THREADS: int = 0
+
+    # "elevenlabs", "local" (offline stand-in tone) or "" to disable meditation audio
+    TTS_PROVIDER: str = "elevenlabs"
+    ELEVENLABS_API_KEY: str = ""
+    ELEVENLABS_VOICE_ID: str = "bIQlQ61Q7WgbyZAL7IWj"
+    ELEVENLABS_MODEL_ID: str = "eleven_multilingual_v2"
+    TTS_SAMPLE_RATE: int = 22050
+    TTS_CONCURRENCY: int = 4
+    TTS_STEP_PAUSE_SECONDS: float = 3.0
+    # Prefix of audio URLs handed to the frontend, e.g. https://api.example.com; when empty the
+    # URLs are relative ("/api/audio/...") and the frontend resolves them against NEXT_PUBLIC_API_URL
+    AUDIO_BASE_URL: str = ""
+    AUDIO_INDEX_PATH: str = "audio/index.json"
+
+    CATALOG_ENABLED: bool = True
+    CATALOG_REFRESH_HOURS: int = 24
+    CATALOG_RELOAD_MINUTES: int = 15
+    CATALOG_MAX_AGE_HOURS: int = 72
+    CATALOG_ITEMS_PER_QUERY: int = 10
+    CATALOG_REFRESH_CONCURRENCY: int = 4
+    CATALOG_MIN_SIMILARITY: float = 0.8
+
+    NEWS_STORE_ENABLED: bool = True
+    NEWS_INGEST_HOURS: int = 6
+    NEWS_ARTICLES_PER_TOPIC: int = 10
+    NEWS_RETENTION_DAYS: int = 30
+    NEWS_HALF_LIFE_DAYS: float = 7.0
+    NEWS_DUPLICATE_SIMILARITY: float = 0.6
+    NEWS_MIN_TEXT_SCORE: float = 1.0
+    NEWS_LOOKUP_TIMEOUT_SECONDS: float = 2.0
+
+    RANKING_OVERFETCH: int = 3
+    RANKING_RECENCY_HALF_LIFE_DAYS: float = 365.0
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,252 @@
+import hashlib
+import os
+import struct
+import threading
+from typing import Any, Dict, List, Optional
+import orjson
+from config.setting import settings
+from core.chroma import BACKEND_DIR
+
+AUDIO_DIR = os.path.join(BACKEND_DIR, "audio")
+CATALOG_FILE = "catalog.json"
+CONTENT_TYPES = {".mp3": "audio/mpeg", ".wav": "audio/wav"}
+
+MP3_BITRATES = {
+    1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+MP3_SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+# Bytes read from the start of an mp3 to find the first frame and its Xing/Info header
+MP3_PROBE_BYTES = 64 * 1024
+
+
+def probe_wav(path: str) -> Dict[str, Any]:
+    """Format of a RIFF/WAVE file from its fmt and data chunks (any codec, not only PCM)"""
+    with open(path, "rb") as file:
+        riff, _, wave_id = struct.unpack("<4sI4s", file.read(12))
+        if riff != b"RIFF" or wave_id != b"WAVE":
+            raise ValueError("not a RIFF/WAVE file")
+        fmt, data_size = None, None
+        while fmt is None or data_size is None:
+            header = file.read(8)
+            if len(header) < 8:
+                break
+            chunk_id, chunk_size = struct.unpack("<4sI", header)
+            if chunk_id == b"fmt ":
+                fmt = struct.unpack("<HHIIHH", file.read(16))
+                file.seek(chunk_size - 16 + (chunk_size & 1), os.SEEK_CUR)
+            elif chunk_id == b"data":
+                data_size = chunk_size
+                file.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
+            else:
+                file.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
+    if fmt is None or data_size is None:
+        raise ValueError("missing fmt or data chunk")
+    _, channels, sample_rate, byte_rate, _, _ = fmt
+    # Streamed writers leave the data size at its 0xFFFFFFFF placeholder
+    data_size = min(data_size, os.path.getsize(path))
+    return {
+        "duration": data_size / byte_rate if byte_rate else 0.0,
+        "bitrate": byte_rate * 8,
+        "sampleRate": sample_rate,
+        "channels": channels,
+    }
+
+
+def _mp3_frame(header: bytes) -> Optional[Dict[str, int]]:
+    """Layer III frame header fields, or None if the 4 bytes aren't a valid header"""
+    if len(header) < 4 or header[0] != 0xFF or header[1] & 0xE0 != 0xE0:
+        return None
+    version = (header[1] >> 3) & 3
+    layer = (header[1] >> 1) & 3
+    bitrate_index = header[2] >> 4
+    sample_rate_index = (header[2] >> 2) & 3
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+    bitrate = MP3_BITRATES[1 if version == 3 else 2][bitrate_index] * 1000
+    sample_rate = MP3_SAMPLE_RATES[version][sample_rate_index]
+    samples = 1152 if version == 3 else 576
+    padding = (header[2] >> 1) & 1
+    return {
+        "version": version,
+        "bitrate": bitrate,
+        "sampleRate": sample_rate,
+        "samples": samples,
+        "channels": 1 if header[3] >> 6 == 3 else 2,
+        "length": samples // 8 * bitrate // sample_rate + padding,
+    }
+
+
+def probe_mp3(path: str) -> Dict[str, Any]:
+    """Duration from the Xing/Info frame count when present, else from size and the first frame's bitrate"""
+    size = os.path.getsize(path)
+    with open(path, "rb") as file:
+        data = file.read(MP3_PROBE_BYTES)
+    offset = 0
+    if data[:3] == b"ID3":
+        offset = 10 + ((data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]) + (10 if data[5] & 0x10 else 0)
+    frame = None
+    while offset + 4 <= len(data):
+        frame = _mp3_frame(data[offset:offset + 4])
+        # A real frame is followed by another header; this rejects false syncs in the tag padding
+        if frame and (offset + frame["length"] + 4 > len(data) or _mp3_frame(data[offset + frame["length"]:offset + frame["length"] + 4])):
+            break
+        frame = None
+        offset += 1
+    if frame is None:
+        raise ValueError("no MPEG layer III frame found")
+    side_info = (32 if frame["channels"] == 2 else 17) if frame["version"] == 3 else (17 if frame["channels"] == 2 else 9)
+    xing = offset + 4 + side_info
+    duration = None
+    if data[xing:xing + 4] in (b"Xing", b"Info") and struct.unpack(">I", data[xing + 4:xing + 8])[0] & 1:
+        frames = struct.unpack(">I", data[xing + 8:xing + 12])[0]
+        duration = frames * frame["samples"] / frame["sampleRate"]
+    if duration is None:
+        duration = (size - offset) * 8 / frame["bitrate"]
+    return {
+        "duration": duration,
+        "bitrate": round((size - offset) * 8 / duration) if duration else frame["bitrate"],
+        "sampleRate": frame["sampleRate"],
+        "channels": frame["channels"],
+    }
+
+
+PROBES = {".wav": probe_wav, ".mp3": probe_mp3}
+# Index fields that are internal to the server
+PRIVATE_FIELDS = ("mtime",)
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class AudioIndex:
+    """Metadata (duration, bitrate, size, sha256, ...) of every audio file under audio/.
+
+    Built at startup from the persisted index: only files whose size or mtime
+    changed are hashed and probed again, removed files are dropped, and the
+    result is written back to AUDIO_INDEX_PATH. Requests read it from memory.
+    Entries are keyed by path relative to audio/ with forward slashes, and the
+    optional audio/catalog.json adds title, description and category to
+    curated library files.
+    """
+
+    def __init__(self, root: str = AUDIO_DIR, index_path: str = None):
+        self.root = root
+        index_path = index_path or settings.AUDIO_INDEX_PATH
+        self.index_path = index_path if os.path.isabs(index_path) else os.path.join(BACKEND_DIR, index_path)
+        # Probed metadata (what is persisted) and the same merged with the catalog (what is served)
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.catalog: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _relative(self, path: str) -> str:
+        return os.path.relpath(path, self.root).replace(os.sep, "/")
+
+    def _read_persisted(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.index_path, "rb") as file:
+                return orjson.loads(file.read())
+        except (OSError, orjson.JSONDecodeError):
+            return {}
+
+    def _read_catalog(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(os.path.join(self.root, CATALOG_FILE), "rb") as file:
+                return orjson.loads(file.read())
+        except (OSError, orjson.JSONDecodeError):
+            return {}
+
+    def _probe(self, path: str, stat: os.stat_result) -> Dict[str, Any]:
+        extension = os.path.splitext(path)[1].lower()
+        entry = {
+            "path": self._relative(path),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "sha256": file_sha256(path),
+            "contentType": CONTENT_TYPES[extension],
+        }
+        try:
+            entry.update(PROBES[extension](path))
+            entry["duration"] = round(entry["duration"], 2)
+        except (ValueError, struct.error, IndexError) as e:
+            print(f"Could not read audio metadata of {entry['path']}: {e}")
+        return entry
+
+    def load(self) -> int:
+        """Scan audio/, reusing persisted entries of unchanged files; returns the number of files"""
+        previous = self._read_persisted()
+        self.catalog = self._read_catalog()
+        files, probed = {}, 0
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                if os.path.splitext(name)[1].lower() not in CONTENT_TYPES:
+                    continue
+                path = os.path.join(directory, name)
+                stat = os.stat(path)
+                key = self._relative(path)
+                entry = previous.get(key)
+                if not entry or entry["size"] != stat.st_size or entry["mtime"] != stat.st_mtime:
+                    entry = self._probe(path, stat)
+                    probed += 1
+                files[key] = entry
+        with self._lock:
+            self.files = files
+            self.entries = {key: {**entry, **self.catalog.get(key, {})} for key, entry in files.items()}
+        if probed or len(previous) != len(files):
+            self.save()
+        print(f"Audio index: {len(files)} files, {probed} probed")
+        return len(files)
+
+    def add(self, path: str) -> Dict[str, Any]:
+        """Index a file written after startup (e.g. generated narration)"""
+        entry = self._probe(path, os.stat(path))
+        key = entry["path"]
+        with self._lock:
+            # Copy-on-write so readers on the event loop never see a dict being resized
+            self.files = {**self.files, key: entry}
+            self.entries = {**self.entries, key: {**entry, **self.catalog.get(key, {})}}
+        self.save()
+        return self.entries[key]
+
+    def save(self):
+        with self._lock:
+            data = orjson.dumps(self.files, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS)
+        temporary = f"{self.index_path}.tmp"
+        try:
+            with open(temporary, "wb") as file:
+                file.write(data)
+            os.replace(temporary, self.index_path)
+        except OSError as e:
+            print(f"Could not persist the audio index: {e}")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self.entries.get(key)
+
+    def absolute_path(self, entry: Dict[str, Any]) -> str:
+        return os.path.join(self.root, *entry["path"].split("/"))
+
+    def library(self) -> List[Dict[str, Any]]:
+        """Curated (cataloged) assets, in path order"""
+        return [entry for key, entry in sorted(self.entries.items()) if entry.get("title")]
+
+
+def audio_url(entry: Dict[str, Any]) -> str:
+    return f"{settings.AUDIO_BASE_URL}/api/audio/{entry['path']}"
+
+
+def public_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        **{key: value for key, value in entry.items() if key not in PRIVATE_FIELDS},
+        "id": entry["sha256"][:16],
+        "audioUrl": audio_url(entry),
+        "duration": round(entry.get("duration", 0)),
+    }
+
+
+audio_index = AudioIndex()
@@ -0,0 +1,126 @@
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be but by can do does for from how i if in into is it its me my of on or so "
+    "that the their then there these they this to was we what when where which who why will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def bigrams(tokens: List[str]) -> List[str]:
+    # Lets multi-word technique names ("box breathing") outrank chunks with the words apart
+    return [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+
+
+def terms(text: str) -> List[str]:
+    tokens = tokenize(text)
+    return tokens + bigrams(tokens)
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed set of chunks, stored as CSR posting arrays.
+
+    Postings of term t are doc_ids[indptr[t]:indptr[t + 1]] with matching
+    term frequencies in tfs. The whole index is a handful of numpy arrays
+    saved to one .npz file, so loading it is a few array reads plus building
+    the term -> row dict. Unigrams and bigrams are both indexed.
+    """
+
+    def __init__(
+        self,
+        ids: np.ndarray,
+        vocabulary: np.ndarray,
+        indptr: np.ndarray,
+        doc_ids: np.ndarray,
+        tfs: np.ndarray,
+        doc_lengths: np.ndarray,
+        k1: float = 1.5,
+        b: float = 0.75,
+    ):
+        self.ids = ids
+        self.vocabulary = vocabulary
+        self.term_rows: Dict[str, int] = {term: row for row, term in enumerate(vocabulary.tolist())}
+        self.indptr = indptr
+        self.doc_ids = doc_ids
+        self.tfs = tfs
+        self.doc_lengths = doc_lengths
+        self.k1 = k1
+        self.b = b
+        document_frequencies = np.diff(indptr).astype(np.float32)
+        count = len(ids)
+        self.idf = np.log1p((count - document_frequencies + 0.5) / (document_frequencies + 0.5)).astype(np.float32)
+        self.length_norm = (
+            k1 * (1 - b + b * doc_lengths / max(float(doc_lengths.mean()), 1.0)) if count else doc_lengths
+        ).astype(np.float32)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, ids: List[str], texts: List[str]) -> "BM25Index":
+        postings: Dict[str, Dict[int, int]] = {}
+        doc_lengths = np.zeros(len(texts), dtype=np.float32)
+        for doc, text in enumerate(texts):
+            doc_terms = terms(text)
+            doc_lengths[doc] = len(doc_terms)
+            for term in doc_terms:
+                counts = postings.setdefault(term, {})
+                counts[doc] = counts.get(doc, 0) + 1
+        vocabulary = sorted(postings)
+        indptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(postings[term]) for term in vocabulary])
+        doc_ids = np.fromiter((doc for term in vocabulary for doc in postings[term]), dtype=np.int32, count=indptr[-1])
+        tfs = np.fromiter(
+            (tf for term in vocabulary for tf in postings[term].values()), dtype=np.float32, count=indptr[-1]
+        )
+        return cls(np.array(ids), np.array(vocabulary), indptr, doc_ids, tfs, doc_lengths)
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temporary = f"{path}.tmp.npz"
+        np.savez(
+            temporary,
+            ids=self.ids, vocabulary=self.vocabulary, indptr=self.indptr,
+            doc_ids=self.doc_ids, tfs=self.tfs, doc_lengths=self.doc_lengths,
+        )
+        # A reader never sees a half-written index
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["BM25Index"]:
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as arrays:
+            return cls(**{name: arrays[name] for name in arrays.files})
+
+    def max_score(self, query: str) -> float:
+        """Score bound of a chunk holding every query word very often; words absent from the corpus count at full idf"""
+        unseen_idf = np.log1p((len(self.ids) + 0.5) / 0.5)
+        return float(sum(
+            (self.idf[self.term_rows[token]] if token in self.term_rows else unseen_idf) * (self.k1 + 1)
+            for token in set(tokenize(query))
+        ))
+
+    def search(self, query: str, k: int, min_fraction: float = 0.0) -> List[Tuple[str, float]]:
+        """Top k (chunk id, score) pairs scoring at least min_fraction of max_score(query)"""
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        for term in set(terms(query)):
+            row = self.term_rows.get(term)
+            if row is None:
+                continue
+            start, end = self.indptr[row], self.indptr[row + 1]
+            docs, tfs = self.doc_ids[start:end], self.tfs[start:end]
+            # Each doc appears once per term, so fancy-index accumulation is safe
+            scores[docs] += self.idf[row] * tfs * (self.k1 + 1) / (tfs + self.length_norm[docs])
+        matched = np.flatnonzero(scores > (min_fraction * self.max_score(query) if min_fraction else 0))
+        if len(matched) > k:
+            matched = matched[np.argpartition(-scores[matched], k)[:k]]
+        matched = matched[np.argsort(-scores[matched], kind="stable")]
+        return [(str(self.ids[doc]), float(scores[doc])) for doc in matched]
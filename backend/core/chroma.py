@@ -1,7 +1,25 @@
+import os
 import chromadb
+from config.setting import settings
 
-# Singleton ChromaDB client
-chroma_client = chromadb.Client()
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-def get_collection(name: str):
-    return chroma_client.get_or_create_collection(name) 
\ No newline at end of file
+_chroma_client = None
+
+
+def get_persist_directory() -> str:
+    if os.path.isabs(settings.CHROMA_PERSIST_DIR):
+        return settings.CHROMA_PERSIST_DIR
+    return os.path.join(BACKEND_DIR, settings.CHROMA_PERSIST_DIR)
+
+
+def get_client():
+    """Singleton ChromaDB client persisted under CHROMA_PERSIST_DIR"""
+    global _chroma_client
+    if _chroma_client is None:
+        _chroma_client = chromadb.PersistentClient(path=get_persist_directory())
+    return _chroma_client
+
+
+def get_collection(name: str, metadata: dict = None):
+    return get_client().get_or_create_collection(name, metadata=metadata)
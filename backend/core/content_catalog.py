@@ -0,0 +1,307 @@
+import asyncio
+import math
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, NamedTuple, Optional, Set
+from config.setting import settings
+from core.bm25 import tokenize
+from core.chroma import get_collection
+from core.embeddings import get_embeddings
+from models.content_catalog import ContentCatalogRepository
+from tools.spotify_tools import fetch_spotify_playlists
+from tools.youtube_tools import fetch_youtube_videos
+
+COLLECTION_NAME = "content_catalog"
+# A catalog item must share this many distinct terms with a recommendation to be served for it
+MIN_MATCHED_TERMS = 2
+
+# What the refresh job fetches: every (mood, kind) pair is one search
+TAXONOMY = {
+    "youtube": {
+        "moods": ["anxiety", "stress", "sadness", "anger", "tiredness", "overwhelm"],
+        "kinds": ["guided meditation", "breathing exercises", "yoga", "motivational talk"],
+    },
+    "spotify": {
+        "moods": ["relaxing", "calm", "uplifting", "focus", "sleep", "happy"],
+        "kinds": ["ambient", "classical", "nature sounds", "lofi", "piano"],
+    },
+}
+
+
+def recommendation_terms(recommendation: Dict[str, Any]) -> List[str]:
+    parts = []
+    for field in ("types", "keywords", "genres", "focus", "mood"):
+        value = recommendation.get(field)
+        if isinstance(value, list):
+            parts.extend(str(v) for v in value)
+        elif value:
+            parts.append(str(value))
+    return list(dict.fromkeys(tokenize(" ".join(parts))))
+
+
+def youtube_items(videos: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [{
+        "type": "youtube",
+        "externalId": video["video_id"],
+        "title": video.get("title") or "",
+        "text": f"{video.get('title') or ''}\n{(video.get('description') or '')[:500]}",
+        "popularity": video.get("views", 0),
+        "data": video,
+    } for video in videos if isinstance(video, dict) and video.get("video_id")]
+
+
+def spotify_items(result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{
+        "type": "spotify",
+        "externalId": playlist["external_url"],
+        "title": playlist.get("name") or "",
+        "text": f"{playlist.get('name') or ''}\n{playlist.get('description') or ''}",
+        "popularity": (playlist.get("tracks") or {}).get("total") or 0,
+        "data": playlist,
+    } for playlist in result.get("playlists", []) if playlist.get("external_url")]
+
+
+# content type -> (live fetch of one query, tool result -> catalog items).
+# Articles are not cataloged: the news tools have their own deduplicated, recency-ranked store (core.news_store)
+SOURCES = {
+    "youtube": (lambda query, n: fetch_youtube_videos(query, num_videos=n), youtube_items),
+    "spotify": (lambda query, n: fetch_spotify_playlists(query, n), spotify_items),
+}
+
+
+def shape_result(content_type: str, query: str, items: List[Dict[str, Any]]):
+    """The same shape the search tools return, so callers can't tell a catalog hit from a live search"""
+    data = [item["data"] for item in items]
+    if content_type == "youtube":
+        return data
+    return {"query": query, "total": len(data), "playlists": data}
+
+
+class CatalogSnapshot(NamedTuple):
+    """Everything a lookup reads, published as one object so a lookup never mixes two versions"""
+    items: Dict[str, Dict[str, Any]]
+    tag_index: Dict[str, Dict[str, Set[str]]]
+    type_counts: Counter
+
+
+class ContentCatalog:
+    """In-memory view of the content catalog for recommendation lookups without API calls.
+
+    Items live in MongoDB (ContentCatalogRepository) and in a Chroma collection
+    of their title and description. A periodic job re-fetches TAXONOMY every
+    CATALOG_REFRESH_HOURS, and every CATALOG_RELOAD_MINUTES each worker reloads
+    the catalog into a tag -> item ids index. Items no refresh has returned
+    for CATALOG_MAX_AGE_HOURS are dropped. `lookup` scores items by the
+    IDF-weighted terms they share with a recommendation, fills up with
+    embedding neighbours above CATALOG_MIN_SIMILARITY, and returns None on a
+    miss so the caller can search live; live results are added back with
+    `add_results`.
+    """
+
+    def __init__(self, repository: ContentCatalogRepository = None):
+        self.repository = repository or ContentCatalogRepository()
+        # Replaced, never mutated: lookups in worker threads read it once and use that version throughout
+        self.snapshot = CatalogSnapshot({}, {}, Counter())
+        self._collection = None
+        self._task: Optional[asyncio.Task] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            self._collection = get_collection(COLLECTION_NAME, metadata={"hnsw:space": "cosine"})
+        return self._collection
+
+    @staticmethod
+    def max_age_cutoff() -> datetime:
+        """Items no refresh or live search has returned since then are no longer served"""
+        return datetime.utcnow() - timedelta(hours=settings.CATALOG_MAX_AGE_HOURS)
+
+    async def load(self) -> int:
+        docs = await self.repository.get_all(since=self.max_age_cutoff())
+        items, tag_index = {}, {}
+        # Items of types no longer cataloged (articles) are left to expire
+        docs = [doc for doc in docs if doc["type"] in SOURCES]
+        for doc in docs:
+            items[doc["_id"]] = doc
+            by_tag = tag_index.setdefault(doc["type"], {})
+            for tag in doc.get("tags", []):
+                by_tag.setdefault(tag, set()).add(doc["_id"])
+        self.snapshot = CatalogSnapshot(items, tag_index, Counter(doc["type"] for doc in docs))
+        return len(items)
+
+    def _add_to_index(self, items: List[Dict[str, Any]]):
+        """Merge stored items into the in-memory index without re-reading the collection"""
+        now = datetime.utcnow()
+        snapshot = self.snapshot
+        catalog, tag_index, type_counts = dict(snapshot.items), dict(snapshot.tag_index), Counter(snapshot.type_counts)
+        for item in items:
+            id = f"{item['type']}:{item['externalId']}"
+            previous = catalog.get(id)
+            tags = list(dict.fromkeys((previous or {}).get("tags", []) + item["tags"]))
+            catalog[id] = {**item, "_id": id, "tags": tags, "refreshedAt": now}
+            if previous is None:
+                type_counts[item["type"]] += 1
+            # Copy-on-write down to the touched tag sets, as the published snapshot is shared
+            by_tag = tag_index[item["type"]] = dict(tag_index.get(item["type"], {}))
+            for tag in item["tags"]:
+                by_tag[tag] = by_tag.get(tag, set()) | {id}
+        self.snapshot = CatalogSnapshot(catalog, tag_index, type_counts)
+
+    def _embed(self, items: List[Dict[str, Any]]):
+        embeddings = get_embeddings(COLLECTION_NAME)
+        self.collection.upsert(
+            ids=[f"{item['type']}:{item['externalId']}" for item in items],
+            embeddings=embeddings.embed_documents([item["text"] for item in items]),
+            metadatas=[{"type": item["type"]} for item in items],
+        )
+
+    async def store(self, items: List[Dict[str, Any]]):
+        if not items:
+            return
+        await self.repository.upsert_items(items)
+        try:
+            await asyncio.to_thread(self._embed, items)
+        except Exception as e:
+            print(f"Content catalog embedding failed: {e}")
+
+    async def refresh(self) -> int:
+        """Fetch every taxonomy query (at most CATALOG_REFRESH_CONCURRENCY at a time) into the catalog"""
+        semaphore = asyncio.Semaphore(settings.CATALOG_REFRESH_CONCURRENCY)
+
+        async def fetch(content_type: str, mood: str, kind: str) -> List[Dict[str, Any]]:
+            search, to_items = SOURCES[content_type]
+            query = f"{mood} {kind}".strip()
+            async with semaphore:
+                result = await asyncio.to_thread(search, query, settings.CATALOG_ITEMS_PER_QUERY)
+            if isinstance(result, dict) and result.get("error"):
+                print(f"Content catalog refresh of {content_type} '{query}' failed: {result['error']}")
+                return []
+            items = to_items(result)
+            for item in items:
+                item["tags"] = list(dict.fromkeys(tokenize(f"{query} {item['title']}")))
+            return items
+
+        results = await asyncio.gather(*(
+            fetch(content_type, mood, kind)
+            for content_type, taxonomy in TAXONOMY.items()
+            for mood in taxonomy["moods"]
+            for kind in taxonomy["kinds"]
+        ))
+        items = [item for result in results for item in result]
+        await self.store(items)
+        # Only expire when this refresh got results, so an API outage doesn't empty the catalog
+        if items:
+            await self.expire()
+        await self.load()
+        print(f"Content catalog refreshed: {len(items)} items fetched, {len(self.snapshot.items)} in catalog")
+        return len(items)
+
+    @staticmethod
+    def _tag_matches(snapshot: CatalogSnapshot, content_type: str, terms: List[str]) -> List[str]:
+        by_tag = snapshot.tag_index.get(content_type, {})
+        count = snapshot.type_counts[content_type] or 1
+        scores, matched = Counter(), Counter()
+        for term in terms:
+            ids = by_tag.get(term)
+            if not ids:
+                continue
+            weight = math.log(1 + count / len(ids))
+            for id in ids:
+                scores[id] += weight
+                matched[id] += 1
+        required = min(MIN_MATCHED_TERMS, len(terms))
+        return sorted(
+            (id for id in scores if matched[id] >= required),
+            key=lambda id: (scores[id], snapshot.items[id].get("popularity", 0)),
+            reverse=True,
+        )
+
+    def _semantic_matches(self, snapshot: CatalogSnapshot, content_type: str, text: str, limit: int, exclude: Set[str]) -> List[str]:
+        embedding = get_embeddings(COLLECTION_NAME).embed_query(text)
+        result = self.collection.query(
+            query_embeddings=[embedding],
+            n_results=limit + len(exclude),
+            where={"type": content_type},
+            include=["distances"],
+        )
+        return [
+            id for id, distance in zip(result["ids"][0], result["distances"][0])
+            if id not in exclude and id in snapshot.items and 1 - distance >= settings.CATALOG_MIN_SIMILARITY
+        ][:limit]
+
+    def lookup(self, content_type: str, recommendation: Dict[str, Any], limit: int, candidates: int = None):
+        """Up to `candidates` catalog items for a recommendation in the search tools' shape, or None if there aren't `limit` good ones"""
+        snapshot = self.snapshot
+        if not settings.CATALOG_ENABLED or content_type not in SOURCES or not snapshot.items:
+            return None
+        terms = recommendation_terms(recommendation)
+        if not terms:
+            return None
+        candidates = max(candidates or limit, limit)
+        ids = self._tag_matches(snapshot, content_type, terms)[:candidates]
+        # Embedding the query is the slow part, so it only fills a shortfall below `limit`
+        if len(ids) < limit:
+            try:
+                ids += self._semantic_matches(snapshot, content_type, " ".join(terms), limit - len(ids), set(ids))
+            except Exception as e:
+                print(f"Content catalog semantic lookup failed: {e}")
+        if len(ids) < limit:
+            return None
+        return shape_result(content_type, " ".join(terms), [snapshot.items[id] for id in ids])
+
+    def add_results(self, content_type: str, recommendation: Dict[str, Any], result):
+        """Add a live search result to the catalog under the recommendation's terms; callable from any thread"""
+        if not settings.CATALOG_ENABLED or self.loop is None or content_type not in SOURCES:
+            return
+        try:
+            items = SOURCES[content_type][1](result)
+        except (AttributeError, TypeError, KeyError):
+            return
+        terms = recommendation_terms(recommendation)
+        for item in items:
+            item["tags"] = list(dict.fromkeys(terms + tokenize(item["title"])))
+        if items:
+            asyncio.run_coroutine_threadsafe(self._store_and_index(items), self.loop)
+
+    async def expire(self):
+        expired = await self.repository.delete_older_than(self.max_age_cutoff())
+        if expired:
+            try:
+                await asyncio.to_thread(self.collection.delete, ids=expired)
+            except Exception as e:
+                print(f"Content catalog embedding cleanup failed: {e}")
+            print(f"Content catalog expired {len(expired)} items")
+
+    async def _store_and_index(self, items: List[Dict[str, Any]]):
+        try:
+            await self.store(items)
+            self._add_to_index(items)
+        except Exception as e:
+            print(f"Adding live results to the content catalog failed: {e}")
+
+    async def _run(self):
+        while True:
+            try:
+                # Only one worker refreshes; the others pick its results up on their next reload
+                stale_before = datetime.utcnow() - timedelta(hours=settings.CATALOG_REFRESH_HOURS)
+                if await self.repository.claim_refresh(stale_before):
+                    await self.refresh()
+                else:
+                    await self.load()
+            except Exception as e:
+                print(f"Content catalog update failed: {e}")
+            await asyncio.sleep(settings.CATALOG_RELOAD_MINUTES * 60)
+
+    def start(self):
+        if settings.CATALOG_ENABLED and self._task is None:
+            self.loop = asyncio.get_running_loop()
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+content_catalog = ContentCatalog()
@@ -0,0 +1,75 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+from langchain_core.embeddings import Embeddings
+from config.setting import settings
+from core.embedding_cache import CachedEmbeddings, cached_openai_embeddings
+
+
+class OnnxEmbeddings(Embeddings):
+    """Local CPU embeddings with the all-MiniLM-L6-v2 ONNX model bundled with Chroma.
+
+    The model is downloaded to ~/.cache/chroma on first use and loaded once.
+    Texts are embedded in batches of `batch_size`, spread over a thread pool
+    (onnxruntime releases the GIL while it runs). The async methods use the
+    same pool, so query embedding never blocks the event loop.
+    """
+
+    MODEL_NAME = "all-MiniLM-L6-v2"
+
+    def __init__(self, batch_size: int = None, threads: int = None):
+        from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+
+        self.batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+        self.model = ONNXMiniLM_L6_V2(preferred_providers=["CPUExecutionProvider"])
+        self.executor = ThreadPoolExecutor(
+            max_workers=threads or settings.EMBEDDING_THREADS or os.cpu_count(),
+            thread_name_prefix="onnx-embeddings",
+        )
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        return [vector.tolist() for vector in self.model(texts)]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        batches = [texts[start:start + self.batch_size] for start in range(0, len(texts), self.batch_size)]
+        return [vector for batch in self.executor.map(self._embed_batch, batches) for vector in batch]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed_batch([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self.embed_documents, texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self.embed_query, text)
+
+
+def onnx_embeddings() -> CachedEmbeddings:
+    return CachedEmbeddings(OnnxEmbeddings(), model=f"onnx:{OnnxEmbeddings.MODEL_NAME}")
+
+
+BACKENDS: Dict[str, Callable[[], Embeddings]] = {
+    "openai": cached_openai_embeddings,
+    "onnx": onnx_embeddings,
+}
+
+_backends: Dict[str, Embeddings] = {}
+
+
+def backend_for(collection_name: str) -> str:
+    return settings.EMBEDDING_BACKENDS.get(collection_name, settings.EMBEDDING_BACKEND)
+
+
+def get_embeddings(collection_name: str = None, backend: str = None) -> Embeddings:
+    """Shared embeddings client of `backend`, or of the backend configured for the collection.
+
+    Vectors of different backends are not comparable: a collection has to be
+    re-ingested after its backend changes (the ingestion CLI does this).
+    """
+    backend = backend or backend_for(collection_name)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{backend}', expected one of {', '.join(BACKENDS)}")
+    if backend not in _backends:
+        _backends[backend] = BACKENDS[backend]()
+    return _backends[backend]
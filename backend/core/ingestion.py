@@ -0,0 +1,190 @@
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from config.setting import settings
+from core.bm25 import BM25Index
+from core.chroma import BACKEND_DIR, get_client, get_collection
+from core.embeddings import get_embeddings
+from core.retrieval import bm25_path
+
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+SUPPORTED_EXTENSIONS = (".pdf",)
+
+
+def sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_chunks(path: str) -> List[Tuple[str, int]]:
+    """(text, page) chunks of one PDF; runs in a worker process"""
+    from langchain_community.document_loaders import PyPDFLoader
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    documents = splitter.split_documents(PyPDFLoader(path).load())
+    return [(document.page_content, document.metadata.get("page", 0)) for document in documents]
+
+
+def chunk_ids(source: str, chunks: List[Tuple[str, int]]) -> List[str]:
+    """Content-addressed ids: an unchanged chunk keeps its id wherever it moves in the file"""
+    seen: Dict[str, int] = {}
+    ids = []
+    for text, _ in chunks:
+        digest = sha256(f"{source}\0{text}".encode())[:32]
+        occurrence = seen.get(digest, 0)
+        seen[digest] = occurrence + 1
+        ids.append(digest if occurrence == 0 else f"{digest}-{occurrence}")
+    return ids
+
+
+class RAGIngestor:
+    """Incrementally syncs the PDFs of a directory into the RAG Chroma collection.
+
+    Every chunk stores its source path, the hash of the file it came from and
+    the embedding model, so the collection itself is the manifest.
+    Files embedded with another model are re-embedded from scratch. Files whose hash is unchanged are
+    skipped without parsing; changed and new files are parsed in a process pool
+    and only chunks whose content hash isn't indexed yet are embedded, in
+    batches. Chunks no longer produced by a file, and all chunks of removed
+    files, are deleted. The BM25 index next to the collection is rebuilt
+    whenever the collection changed.
+    """
+
+    def __init__(
+        self,
+        source_dir: str = None,
+        collection_name: str = None,
+        embeddings=None,
+        batch_size: int = 256,
+        workers: Optional[int] = None,
+    ):
+        source_dir = source_dir or settings.RAG_SOURCE_DIR
+        self.source_dir = source_dir if os.path.isabs(source_dir) else os.path.join(BACKEND_DIR, source_dir)
+        collection_name = collection_name or settings.RAG_COLLECTION
+        self.collection_name = collection_name
+        self.collection = get_collection(collection_name)
+        self.bm25_path = bm25_path(collection_name)
+        self.embeddings = embeddings or get_embeddings(collection_name)
+        self.embedding_model = getattr(self.embeddings, "model", type(self.embeddings).__name__)
+        self.batch_size = batch_size
+        self.workers = workers
+
+    def list_files(self) -> Dict[str, str]:
+        """source (path relative to source_dir) -> absolute path"""
+        files = {}
+        for root, _, names in os.walk(self.source_dir):
+            for name in names:
+                if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                    path = os.path.join(root, name)
+                    files[os.path.relpath(path, self.source_dir)] = path
+        return files
+
+    def indexed_state(self) -> Dict[str, Dict[str, Any]]:
+        """source -> {"fileSha": ..., "ids": set of chunk ids} for what the collection holds"""
+        state: Dict[str, Dict[str, Any]] = {}
+        result = self.collection.get(include=["metadatas"])
+        for id, metadata in zip(result["ids"], result["metadatas"]):
+            source = (metadata or {}).get("source")
+            if source is None:
+                continue
+            entry = state.setdefault(source, {"fileSha": metadata.get("fileSha"), "ids": set(), "stale": False})
+            entry["ids"].add(id)
+            if metadata.get("fileSha") != entry["fileSha"]:
+                # A run stopped part way through this file; None makes the next run finish it
+                entry["fileSha"] = None
+            if metadata.get("embedding") != self.embedding_model:
+                entry["stale"] = True
+        return state
+
+    def _embed_and_upsert(self, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]]):
+        for start in range(0, len(ids), self.batch_size):
+            end = start + self.batch_size
+            self.collection.upsert(
+                ids=ids[start:end],
+                embeddings=self.embeddings.embed_documents(documents[start:end]),
+                documents=documents[start:end],
+                metadatas=metadatas[start:end],
+            )
+
+    def run(self) -> Dict[str, int]:
+        files = self.list_files()
+        indexed = self.indexed_state()
+        stats = {"files": len(files), "unchanged_files": 0, "embedded": 0, "kept": 0, "deleted": 0, "removed_files": 0}
+
+        if indexed and all(entry["stale"] for entry in indexed.values()):
+            # New embedding model for the whole collection: its vector dimension may change too
+            stats["deleted"] = sum(len(entry["ids"]) for entry in indexed.values())
+            get_client().delete_collection(self.collection_name)
+            self.collection = get_collection(self.collection_name)
+            indexed = {}
+
+        removed = [source for source in indexed if source not in files or indexed[source]["stale"]]
+        for source in removed:
+            self.collection.delete(ids=list(indexed[source]["ids"]))
+            stats["deleted"] += len(indexed[source]["ids"])
+        stats["removed_files"] = len([source for source in removed if source not in files])
+        for source in removed:
+            del indexed[source]
+
+        hashes = {source: file_sha256(path) for source, path in files.items()}
+        changed = [source for source in files if indexed.get(source, {}).get("fileSha") != hashes[source]]
+        stats["unchanged_files"] = len(files) - len(changed)
+
+        if changed:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                parsed = dict(zip(changed, pool.map(load_chunks, [files[source] for source in changed])))
+        else:
+            parsed = {}
+
+        new_ids, new_documents, new_metadatas = [], [], []
+        kept_ids, kept_metadatas, stale_ids = [], [], []
+        for source in changed:
+            chunks = parsed[source]
+            ids = chunk_ids(source, chunks)
+            existing = indexed.get(source, {}).get("ids", set())
+            metadatas = [
+                {"source": source, "page": page, "fileSha": hashes[source], "embedding": self.embedding_model}
+                for _, page in chunks
+            ]
+            for i, id in enumerate(ids):
+                if id in existing:
+                    kept_ids.append(id)
+                    kept_metadatas.append(metadatas[i])
+                else:
+                    new_ids.append(id)
+                    new_documents.append(chunks[i][0])
+                    new_metadatas.append(metadatas[i])
+            stale = list(existing - set(ids))
+            stale_ids.extend(stale)
+            stats["kept"] += sum(1 for id in ids if id in existing)
+            stats["deleted"] += len(stale)
+
+        # New chunks first: until the kept chunks get the new fileSha too, the file reads as
+        # unfinished (mixed hashes) or unchanged-but-old, so an interrupted run is redone
+        self._embed_and_upsert(new_ids, new_documents, new_metadatas)
+        if kept_ids:
+            # Same content, new file version: refresh metadata without re-embedding
+            self.collection.update(ids=kept_ids, metadatas=kept_metadatas)
+        if stale_ids:
+            self.collection.delete(ids=stale_ids)
+        stats["embedded"] = len(new_ids)
+        if changed or removed or not os.path.exists(self.bm25_path):
+            self.build_bm25()
+        return stats
+
+    def build_bm25(self) -> BM25Index:
+        """Rebuild the lexical index from the collection; tokenizing the corpus takes milliseconds"""
+        contents = self.collection.get(include=["documents"])
+        index = BM25Index.build(contents["ids"], contents["documents"])
+        index.save(self.bm25_path)
+        return index
@@ -0,0 +1,264 @@
+import asyncio
+import re
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Set
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from config.setting import settings
+from models.news_article import NewsArticleRepository
+
+# What the ingestion job searches for, each in every news source
+WELLNESS_TOPICS = [
+    "mental health", "anxiety", "depression", "stress management", "mindfulness", "meditation",
+    "sleep health", "wellbeing", "burnout", "self care", "loneliness", "exercise and mood",
+]
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {"fbclid", "gclid", "ocid", "cmpid", "ref", "ref_src", "smid", "mc_cid", "mc_eid", "guccounter"}
+# The locale ingestion searches in; the news tools only use the store for requests in it
+GOOGLE_NEWS_REGION = "en-US"
+GNEWS_LANGUAGE = "en"
+GNEWS_COUNTRY = "us"
+SHINGLE_SIZE = 3
+# How far back an incoming story is compared against stored ones
+DEDUPE_DAYS = 14
+CHECK_INTERVAL_MINUTES = 15
+
+
+def canonical_url(url: str) -> Optional[str]:
+    """One spelling per article URL: https, no www., no tracking parameters, fragment or AMP suffix"""
+    parts = urlsplit((url or "").strip())
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        return None
+    host = parts.hostname.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    path = re.sub(r"/amp/?$", "", parts.path).rstrip("/") or "/"
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+def title_shingles(title: str, publisher: str = "") -> List[str]:
+    """Overlapping word triples of a title, without the " - Publisher" suffix aggregators append"""
+    if publisher and title.lower().endswith(f" - {publisher.lower()}"):
+        title = title[:-len(publisher) - 3]
+    words = re.findall(r"\w+", title.lower())
+    if len(words) <= SHINGLE_SIZE:
+        return [" ".join(words)] if words else []
+    return list(dict.fromkeys(" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)))
+
+
+class ShingleIndex:
+    """Finds a stored title whose shingle set is at least `threshold` Jaccard-similar to a new one"""
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self.shingles: Dict[str, Set[str]] = {}
+        self.postings: Dict[str, Set[str]] = {}
+
+    def add(self, id: str, shingles: List[str]):
+        self.shingles[id] = set(shingles)
+        for shingle in shingles:
+            self.postings.setdefault(shingle, set()).add(id)
+
+    def duplicate_of(self, shingles: List[str]) -> Optional[str]:
+        shingles = set(shingles)
+        if not shingles:
+            return None
+        # Only titles sharing a shingle can be similar; the postings list gives the overlap size
+        overlap = Counter(id for shingle in shingles for id in self.postings.get(shingle, ()))
+        for id, shared in overlap.most_common():
+            if shared / len(shingles | self.shingles[id]) >= self.threshold:
+                return id
+        return None
+
+
+def parse_published(article: Dict[str, Any]) -> Optional[datetime]:
+    timestamp = article.get("timestamp")
+    if timestamp:
+        try:
+            return datetime.utcfromtimestamp(int(timestamp) / 1000)
+        except (TypeError, ValueError):
+            pass
+    try:
+        published = datetime.fromisoformat(str(article.get("published_time")).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if published.tzinfo:
+        published = published.astimezone(timezone.utc).replace(tzinfo=None)
+    return published
+
+
+def to_document(article: Dict[str, Any], topics: List[str]) -> Optional[Dict[str, Any]]:
+    """Stored form of an article from either news tool, or None without a usable URL"""
+    url = canonical_url(article.get("news_url"))
+    if not url or not article.get("title"):
+        return None
+    source = article.get("source") or {}
+    publisher = article.get("publisher") or source.get("name") or "Unknown"
+    return {
+        "_id": url,
+        "url": article["news_url"],
+        "title": article["title"],
+        "snippet": article.get("snippet") or "",
+        "thumbnail": article.get("thumbnail") or "",
+        "publisher": publisher,
+        "publisherUrl": source.get("url") or "",
+        "publishedAt": parse_published(article) or datetime.utcnow(),
+        "shingles": title_shingles(article["title"], publisher),
+        "topics": topics,
+    }
+
+
+def iso_published_time(timestamp: str) -> str:
+    """A millisecond timestamp as GNews writes publishedAt"""
+    return datetime.utcfromtimestamp(int(timestamp) / 1000).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def public_article(doc: Dict[str, Any], published_time: Callable[[str], str] = iso_published_time) -> Dict[str, Any]:
+    """The fields both news tools return, so stored and live articles look the same.
+
+    `published_time` formats the millisecond timestamp the way the calling tool does.
+    """
+    timestamp = str(int((doc["publishedAt"] - datetime(1970, 1, 1)).total_seconds() * 1000))
+    return {
+        "title": doc["title"],
+        "snippet": doc["snippet"],
+        "news_url": doc["url"],
+        "thumbnail": doc["thumbnail"],
+        "publisher": doc["publisher"],
+        "source": {"name": doc["publisher"], "url": doc["publisherUrl"]},
+        "timestamp": timestamp,
+        "published_time": published_time(timestamp),
+    }
+
+
+class NewsStore:
+    """Local store of wellness news that the news tools search before calling an API.
+
+    Every NEWS_INGEST_HOURS one worker searches WELLNESS_TOPICS in each news
+    source, in English for the US; requests in another locale skip the store. Articles are keyed by canonical URL, and a story already stored
+    under another URL (title shingles at least NEWS_DUPLICATE_SIMILARITY
+    Jaccard-similar) is dropped. `search` ranks stored articles by text score
+    decayed with a NEWS_HALF_LIFE_DAYS half-life and returns None when there
+    aren't enough, so the tool searches live; live results are added with
+    `add_results`.
+    """
+
+    def __init__(self, repository: NewsArticleRepository = None):
+        self.repository = repository or NewsArticleRepository()
+        self._task: Optional[asyncio.Task] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def add(self, articles: List[Dict[str, Any]], topics: List[str]) -> int:
+        """Store new, non-duplicate articles; returns the number inserted"""
+        docs = [doc for doc in (to_document(article, topics) for article in articles) if doc]
+        if not docs:
+            return 0
+        index = ShingleIndex(settings.NEWS_DUPLICATE_SIMILARITY)
+        for doc in await self.repository.get_shingles(datetime.utcnow() - timedelta(days=DEDUPE_DAYS)):
+            index.add(doc["_id"], doc.get("shingles", []))
+        fresh: Dict[str, Dict[str, Any]] = {}
+        for doc in docs:
+            if doc["_id"] in fresh:
+                fresh[doc["_id"]]["topics"] = list(dict.fromkeys(fresh[doc["_id"]]["topics"] + doc["topics"]))
+                continue
+            # An already stored URL is not a duplicate: its upsert only adds the topics
+            if doc["_id"] not in index.shingles and index.duplicate_of(doc["shingles"]):
+                continue
+            index.add(doc["_id"], doc["shingles"])
+            fresh[doc["_id"]] = doc
+        return await self.repository.upsert_articles(list(fresh.values()))
+
+    async def ingest(self) -> Dict[str, int]:
+        # Imported here because the news tools import this module
+        from tools.g_news_tools import fetch_g_news
+        from tools.google_news_tools import fetch_google_news
+
+        sources = {
+            "gnews": lambda topic, n: fetch_g_news(topic, GNEWS_LANGUAGE, GNEWS_COUNTRY, n),
+            "google_news": lambda topic, n: fetch_google_news(topic, GOOGLE_NEWS_REGION, n),
+        }
+
+        async def fetch(name: str, topic: str) -> List[Dict[str, Any]]:
+            try:
+                result = await asyncio.to_thread(sources[name], topic, settings.NEWS_ARTICLES_PER_TOPIC)
+            except Exception as e:
+                result = {"error": str(e)}
+            if result.get("error"):
+                print(f"News ingestion of '{topic}' from {name} failed: {result['error']}")
+                return []
+            return result.get("articles", [])
+
+        fetched = inserted = 0
+        for topic in WELLNESS_TOPICS:
+            results = await asyncio.gather(*(fetch(name, topic) for name in sources))
+            articles = [article for result in results for article in result]
+            fetched += len(articles)
+            inserted += await self.add(articles, [topic])
+        print(f"News ingestion: {fetched} articles fetched, {inserted} new")
+        return {"fetched": fetched, "inserted": inserted}
+
+    def _on_worker_thread(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is not self.loop
+        except RuntimeError:
+            return True
+
+    def search(self, query: str, limit: int, published_time: Callable[[str], str] = iso_published_time) -> Optional[Dict[str, Any]]:
+        """Stored articles for `query` in the news tools' shape, or None; call from worker threads"""
+        if not settings.NEWS_STORE_ENABLED or self.loop is None or not query or not self._on_worker_thread():
+            return None
+        future = asyncio.run_coroutine_threadsafe(
+            self.repository.search(query, limit, settings.NEWS_HALF_LIFE_DAYS, settings.NEWS_MIN_TEXT_SCORE),
+            self.loop,
+        )
+        try:
+            docs = future.result(timeout=settings.NEWS_LOOKUP_TIMEOUT_SECONDS)
+        except Exception as e:
+            future.cancel()
+            print(f"News store search failed: {e}")
+            return None
+        if len(docs) < limit:
+            return None
+        return {"query": query, "total": len(docs), "articles": [public_article(doc, published_time) for doc in docs]}
+
+    def add_results(self, query: str, result):
+        """Add a live news tool result to the store; callable from any thread"""
+        if not settings.NEWS_STORE_ENABLED or self.loop is None or not isinstance(result, dict) or result.get("error"):
+            return
+        if result.get("articles"):
+            asyncio.run_coroutine_threadsafe(self._add_quietly(result["articles"], [query]), self.loop)
+
+    async def _add_quietly(self, articles: List[Dict[str, Any]], topics: List[str]):
+        try:
+            await self.add(articles, topics)
+        except Exception as e:
+            print(f"Adding live results to the news store failed: {e}")
+
+    async def _run(self):
+        while True:
+            try:
+                stale_before = datetime.utcnow() - timedelta(hours=settings.NEWS_INGEST_HOURS)
+                if await self.repository.claim_ingestion(stale_before):
+                    await self.ingest()
+            except Exception as e:
+                print(f"News ingestion failed: {e}")
+            await asyncio.sleep(CHECK_INTERVAL_MINUTES * 60)
+
+    def start(self):
+        if settings.NEWS_STORE_ENABLED and self._task is None:
+            self.loop = asyncio.get_running_loop()
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+news_store = NewsStore()
@@ -0,0 +1,170 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+import numpy as np
+from config.setting import settings
+from core.bm25 import tokenize
+
+# The mood analyzer's duration labels, in seconds
+DURATION_RANGES = {"short": (0, 600), "medium": (600, 1800), "long": (1800, np.inf)}
+# YouTube search and Spotify search both return at most 50 items per request
+MAX_CANDIDATES = 50
+
+VIDEO_WEIGHTS = {"duration": 0.35, "keywords": 0.3, "popularity": 0.2, "recency": 0.15}
+PLAYLIST_WEIGHTS = {"keywords": 0.4, "energy": 0.2, "valence": 0.2, "popularity": 0.2}
+
+# Without audio features, a playlist's energy and valence are estimated from words in its name and description
+CALM_WORDS = frozenset(
+    "calm relax relaxing relaxation sleep sleepy chill chillout ambient peaceful soft slow meditation meditative "
+    "piano acoustic lofi quiet gentle nature rain spa yoga soothing mellow dreamy study focus serene".split()
+)
+ENERGETIC_WORDS = frozenset(
+    "workout energy energetic party dance upbeat hype power running run gym edm rock pump intense fast "
+    "cardio motivation motivational training beast banger".split()
+)
+SAD_WORDS = frozenset(
+    "sad sadness melancholy melancholic heartbreak heartbroken cry crying lonely blue dark moody broken "
+    "grief tears rainy".split()
+)
+HAPPY_WORDS = frozenset(
+    "happy happiness joy joyful uplifting sunny cheerful positive vibes summer smile fun bright feelgood "
+    "good hope hopeful".split()
+)
+
+
+def overfetch_count(wanted: int) -> int:
+    """How many candidates to request so ranking has something to choose from"""
+    return min(max(wanted, wanted * settings.RANKING_OVERFETCH), MAX_CANDIDATES)
+
+
+def recommendation_keywords(recommendation: Dict[str, Any]) -> List[str]:
+    parts = []
+    for field in ("types", "keywords", "genres", "mood"):
+        value = recommendation.get(field)
+        if isinstance(value, list):
+            parts.extend(str(v) for v in value)
+        elif value:
+            parts.append(str(value))
+    return list(dict.fromkeys(tokenize(" ".join(parts))))
+
+
+def keyword_overlap(texts: List[str], keywords: List[str]) -> np.ndarray:
+    """Fraction of the keywords found in each text"""
+    if not keywords:
+        return np.zeros(len(texts))
+    column = {keyword: i for i, keyword in enumerate(keywords)}
+    hits = np.zeros((len(texts), len(keywords)), dtype=bool)
+    for row, text in enumerate(texts):
+        columns = [column[token] for token in set(tokenize(text)) if token in column]
+        hits[row, columns] = True
+    return hits.mean(axis=1)
+
+
+def duration_fit(seconds: np.ndarray, label: str) -> Optional[np.ndarray]:
+    """1 inside the label's range, falling off with the log-ratio to the nearest bound outside it;
+    unknown durations (NaN) score 0.5"""
+    bounds = DURATION_RANGES.get((label or "").strip().lower())
+    if bounds is None:
+        return None
+    nearest = np.clip(seconds, *bounds)
+    return np.where(np.isnan(seconds), 0.5, np.exp(-np.abs(np.log((seconds + 60) / (nearest + 60)))))
+
+
+def log_scaled(values: np.ndarray) -> np.ndarray:
+    scaled = np.log1p(np.maximum(values, 0))
+    top = scaled.max() if len(scaled) else 0
+    return scaled / top if top > 0 else np.zeros(len(values))
+
+
+def recency(published: List[Optional[str]], half_life_days: float) -> np.ndarray:
+    """Halves every half_life_days of age; unknown dates score 0.5"""
+    now = datetime.now(timezone.utc)
+    ages = np.full(len(published), np.nan)
+    for i, value in enumerate(published):
+        try:
+            ages[i] = (now - datetime.fromisoformat(str(value).replace("Z", "+00:00"))).total_seconds() / 86400
+        except (TypeError, ValueError):
+            continue
+    return np.where(np.isnan(ages), 0.5, 0.5 ** (np.maximum(np.nan_to_num(ages), 0) / half_life_days))
+
+
+def lexical_scale(texts: List[str], low_words: frozenset, high_words: frozenset) -> np.ndarray:
+    """0 (all low words) to 1 (all high words) per text, 0.5 when it has neither"""
+    counts = np.array([
+        [sum(token in low_words for token in tokens), sum(token in high_words for token in tokens)]
+        for tokens in (tokenize(text) for text in texts)
+    ], dtype=float).reshape(-1, 2)
+    total = counts.sum(axis=1)
+    return np.where(total > 0, counts[:, 1] / np.maximum(total, 1), 0.5)
+
+
+def target_fit(estimates: np.ndarray, target) -> Optional[np.ndarray]:
+    try:
+        target = float(target)
+    except (TypeError, ValueError):
+        return None
+    return 1 - np.abs(estimates - min(max(target, 0.0), 1.0))
+
+
+def combine(components: Dict[str, Optional[np.ndarray]], weights: Dict[str, float]) -> np.ndarray:
+    """Weighted mean of the components that apply (a None component's weight is dropped)"""
+    used = {name: values for name, values in components.items() if values is not None}
+    total = sum(weights[name] for name in used)
+    return sum(weights[name] * values for name, values in used.items()) / total
+
+
+def top(items: List[Dict[str, Any]], scores: np.ndarray, limit: int) -> List[Dict[str, Any]]:
+    # Stable, so equal scores keep the source's relevance order
+    order = np.argsort(-scores, kind="stable")[:limit]
+    return [items[i] for i in order]
+
+
+def rank_videos(videos: List[Dict[str, Any]], recommendation: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+    """Best `limit` videos by duration fit, keyword overlap, views and recency"""
+    if len(videos) <= 1:
+        return videos[:limit]
+    texts = [f"{video.get('title') or ''} {video.get('description') or ''}" for video in videos]
+    scores = combine({
+        "duration": duration_fit(
+            np.array([video.get("duration_seconds") or np.nan for video in videos], dtype=float),
+            recommendation.get("duration"),
+        ),
+        "keywords": keyword_overlap(texts, recommendation_keywords(recommendation)),
+        "popularity": log_scaled(np.array([video.get("views") or 0 for video in videos], dtype=float)),
+        "recency": recency([video.get("published_time") for video in videos], settings.RANKING_RECENCY_HALF_LIFE_DAYS),
+    }, VIDEO_WEIGHTS)
+    return top(videos, scores, limit)
+
+
+def rank_playlists(playlists: List[Dict[str, Any]], recommendation: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+    """Best `limit` playlists by keyword overlap, estimated energy and valence fit and track count"""
+    if len(playlists) <= 1:
+        return playlists[:limit]
+    texts = [f"{playlist.get('name') or ''} {playlist.get('description') or ''}" for playlist in playlists]
+    scores = combine({
+        "keywords": keyword_overlap(texts, recommendation_keywords(recommendation)),
+        "energy": target_fit(lexical_scale(texts, CALM_WORDS, ENERGETIC_WORDS), recommendation.get("energy")),
+        "valence": target_fit(lexical_scale(texts, SAD_WORDS, HAPPY_WORDS), recommendation.get("valence")),
+        "popularity": log_scaled(np.array([(playlist.get("tracks") or {}).get("total") or 0 for playlist in playlists], dtype=float)),
+    }, PLAYLIST_WEIGHTS)
+    return top(playlists, scores, limit)
+
+
+def rank_content(content_type: str, result, recommendation: Dict[str, Any], limit: int):
+    """A search result cut down to its best `limit` items; results without items are returned unchanged.
+
+    Videos come as a list; playlists as the tool's {"playlists": [...]} dict
+    or, rewritten by the model, as a plain list. Error entries mixed into a
+    list are dropped, unless that leaves nothing.
+    """
+    if content_type == "youtube" and isinstance(result, list):
+        videos = [video for video in result if isinstance(video, dict) and not video.get("error")]
+        return rank_videos(videos, recommendation, limit) if videos else result[:limit]
+    if content_type == "spotify" and isinstance(result, dict) and isinstance(result.get("playlists"), list):
+        playlists = rank_playlists(result["playlists"], recommendation, limit)
+        return {**result, "total": len(playlists), "playlists": playlists}
+    if content_type == "spotify" and isinstance(result, list):
+        playlists = [playlist for playlist in result if isinstance(playlist, dict) and not playlist.get("error")]
+        return rank_playlists(playlists, recommendation, limit) if playlists else result[:limit]
+    if isinstance(result, list):
+        return result[:limit]
+    return result
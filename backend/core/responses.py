@@ -0,0 +1,34 @@
+from typing import Any
+import orjson
+from bson import ObjectId
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+def _default(value: Any) -> Any:
+    """orjson fallback for the types our documents carry that it can't encode natively"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, BaseModel):
+        # by_alias matches what jsonable_encoder produced for the same model
+        return value.model_dump(by_alias=True)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class APIJSONResponse(ORJSONResponse):
+    """Default response class for the API.
+
+    datetimes, UUIDs and numpy values are handled natively by orjson, ObjectIds
+    and pydantic models through `_default`. Handlers that return large documents
+    should return this response directly so FastAPI skips its jsonable_encoder
+    pass over the content.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        )
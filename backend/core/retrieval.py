@@ -0,0 +1,98 @@
+import asyncio
+import os
+from typing import Dict, List, Optional, Sequence
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+from config.setting import settings
+from core.bm25 import BM25Index
+from core.chroma import get_client, get_persist_directory
+from core.embeddings import get_embeddings
+
+
+def bm25_path(collection_name: str) -> str:
+    return os.path.join(get_persist_directory(), f"{collection_name}.bm25.npz")
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = 60) -> List[str]:
+    """Ids ordered by the sum of 1 / (k + rank) over the rankings they appear in"""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, id in enumerate(ranking, start=1):
+            scores[id] = scores.get(id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+class MeditationRetriever:
+    """Hybrid search over the meditation PDFs: Chroma vectors plus a BM25 index.
+
+    Both indexes are opened once (`load`, called at startup) and only the
+    question is embedded per request; the corpus is (re)indexed offline by the
+    ingestion script. Each side returns RAG_HYBRID_CANDIDATES candidates (vector
+    hits below RAG_SCORE_THRESHOLD, BM25 hits below RAG_BM25_MIN_SCORE of the
+    question's maximum BM25 score dropped) and the top RAG_TOP_K of their
+    reciprocal rank fusion are returned, so exact technique names found by BM25
+    are not lost to embedding similarity. Without a BM25 index it is vector only.
+    """
+
+    def __init__(self, collection_name: str = None, k: int = None, score_threshold: float = None):
+        self.collection_name = collection_name or settings.RAG_COLLECTION
+        self.k = k or settings.RAG_TOP_K
+        self.score_threshold = settings.RAG_SCORE_THRESHOLD if score_threshold is None else score_threshold
+        self.candidates = max(settings.RAG_HYBRID_CANDIDATES, self.k)
+        self._store: Optional[Chroma] = None
+        self.bm25: Optional[BM25Index] = None
+        self.count = 0
+
+    @property
+    def store(self) -> Chroma:
+        if self._store is None:
+            self.load()
+        return self._store
+
+    def load(self) -> int:
+        """Open the collection and the BM25 index; returns the number of indexed chunks"""
+        self._store = Chroma(
+            client=get_client(),
+            collection_name=self.collection_name,
+            embedding_function=get_embeddings(self.collection_name),
+        )
+        self.bm25 = BM25Index.load(bm25_path(self.collection_name))
+        count = self.count = self._store._collection.count()
+        if count == 0:
+            print(f"RAG collection '{self.collection_name}' is empty; run python -m scripts.ingest_rag")
+        else:
+            lexical = f"BM25 index of {len(self.bm25)} chunks" if self.bm25 else "no BM25 index"
+            print(f"Loaded RAG collection '{self.collection_name}' with {count} chunks, {lexical}")
+        return count
+
+    def retrieve(self, question: str) -> List[Document]:
+        # Counted once in load(), like the BM25 index a re-ingested corpus is picked up on restart
+        if self._store is None:
+            self.load()
+        if self.count == 0:
+            return []
+        vector_hits = [
+            document
+            for document, score in self.store.similarity_search_with_relevance_scores(question, k=self.candidates)
+            if score >= self.score_threshold
+        ]
+        # The floor keeps one shared common word from getting past the NO_ANSWER gate the vector threshold sets
+        lexical_ids = [
+            id for id, _ in self.bm25.search(question, self.candidates, settings.RAG_BM25_MIN_SCORE)
+        ] if self.bm25 else []
+        documents = {document.id: document for document in vector_hits}
+        fused = reciprocal_rank_fusion(
+            [[document.id for document in vector_hits], lexical_ids], k=settings.RAG_FUSION_K
+        )[:self.k]
+        missing = [id for id in fused if id not in documents]
+        if missing:
+            # Chunks only BM25 found; ids of chunks deleted since the index was built are skipped
+            found = self.store.get_by_ids(missing)
+            documents.update((document.id, document) for document in found)
+        return [documents[id] for id in fused if id in documents]
+
+    async def aretrieve(self, question: str) -> List[Document]:
+        return await asyncio.to_thread(self.retrieve, question)
+
+
+meditation_retriever = MeditationRetriever()
@@ -0,0 +1,113 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+from config.setting import settings
+from core.chroma import get_client, get_collection
+from core.embeddings import get_embeddings
+
+COLLECTION_NAME = "user_search"
+
+
+class SemanticSearchIndex:
+    """Chroma collection of users' messages and journal inputs for meaning-based search.
+
+    Optional (SEARCH_SEMANTIC_ENABLED): when off, writes are not indexed and
+    semantic queries are rejected by the API. Entries are keyed "<source>:<id>"
+    and carry userId in their metadata so every query is scoped to one user.
+    Texts are embedded with the collection's backend (get_embeddings), so
+    repeats hit the embedding cache; embedding runs in a worker thread, off
+    the request path. The collection records the embedding model it was built
+    with and is recreated empty when that changes, as old vectors can't be
+    compared with new ones.
+    """
+
+    def __init__(self):
+        self.enabled = settings.SEARCH_SEMANTIC_ENABLED
+        self._collection = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def embeddings(self):
+        return get_embeddings(COLLECTION_NAME)
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            model = getattr(self.embeddings, "model", type(self.embeddings).__name__)
+            metadata = {"hnsw:space": "cosine", "embedding": model}
+            collection = get_collection(COLLECTION_NAME, metadata=metadata)
+            if (collection.metadata or {}).get("embedding") != model:
+                print(f"Semantic search index was built with another embedding model, recreating it for {model}")
+                get_client().delete_collection(COLLECTION_NAME)
+                collection = get_collection(COLLECTION_NAME, metadata=metadata)
+            self._collection = collection
+        return self._collection
+
+    def _add(self, entries: List[Dict[str, Any]]):
+        texts = [e["text"] for e in entries]
+        self.collection.upsert(
+            ids=[f"{e['source']}:{e['id']}" for e in entries],
+            embeddings=self.embeddings.embed_documents(texts),
+            documents=texts,
+            metadatas=[{
+                "userId": str(e["userId"]),
+                "source": e["source"],
+                "sourceId": str(e["id"]),
+                "createdAt": e["createdAt"].isoformat(),
+                **({"chatId": e["chatId"]} if e.get("chatId") else {}),
+            } for e in entries],
+        )
+
+    async def add(self, entries: List[Dict[str, Any]]):
+        entries = [e for e in entries if e.get("text")]
+        if self.enabled and entries:
+            await asyncio.to_thread(self._add, entries)
+
+    def schedule_add(self, source: str, id: str, user_id: str, text: str, created_at: datetime, chat_id: Optional[str] = None):
+        """Index one document in the background; a failure is logged and never reaches the caller"""
+        if not self.enabled:
+            return
+
+        async def index():
+            try:
+                await self.add([{
+                    "source": source, "id": id, "userId": user_id, "text": text,
+                    "createdAt": created_at, "chatId": chat_id,
+                }])
+            except Exception as e:
+                print(f"Semantic indexing failed for {source}:{id}: {e}")
+
+        task = asyncio.get_running_loop().create_task(index())
+        # Keep a reference until done so the task isn't garbage collected
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _query(self, user_id: str, query: str, sources: List[str], limit: int, offset: int) -> List[Dict[str, Any]]:
+        where: Dict[str, Any] = {"userId": str(user_id)}
+        if len(sources) == 1:
+            where = {"$and": [where, {"source": sources[0]}]}
+        result = self.collection.query(
+            query_embeddings=[self.embeddings.embed_query(query)],
+            n_results=offset + limit,
+            where=where,
+            include=["documents", "metadatas", "distances"],
+        )
+        hits = []
+        rows = zip(result["ids"][0], result["documents"][0], result["metadatas"][0], result["distances"][0])
+        for _, document, metadata, distance in list(rows)[offset:]:
+            hits.append({
+                "id": metadata["sourceId"],
+                "source": metadata["source"],
+                "text": document,
+                "chatId": metadata.get("chatId"),
+                "createdAt": datetime.fromisoformat(metadata["createdAt"]),
+                "score": 1 - distance,
+            })
+        return hits
+
+    async def query(self, user_id: str, query: str, sources: List[str], limit: int, offset: int = 0) -> List[Dict[str, Any]]:
+        """Chroma has no keyset paging, so semantic results page by offset"""
+        return await asyncio.to_thread(self._query, user_id, query, sources, limit, offset)
+
+
+semantic_index = SemanticSearchIndex()
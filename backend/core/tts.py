@@ -0,0 +1,192 @@
+import asyncio
+import hashlib
+import json
+import math
+import os
+import re
+import wave
+from typing import Any, Dict, List, Optional
+import httpx
+import numpy as np
+from config.setting import settings
+from core.audio_index import AUDIO_DIR
+
+GENERATED_DIR = os.path.join(AUDIO_DIR, "generated")
+# Characters per synthesis request; longer steps are split on sentence boundaries
+MAX_CHUNK_CHARS = 800
+SAMPLE_WIDTH = 2  # 16-bit mono PCM
+
+
+def split_text(text: str, max_chars: int = MAX_CHUNK_CHARS) -> List[str]:
+    sentences = re.split(r"(?<=[.!?])\s+", text.strip())
+    chunks, current = [], ""
+    for sentence in sentences:
+        while len(sentence) > max_chars:
+            chunks.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class ElevenLabsSynthesizer:
+    """ElevenLabs text-to-speech returning raw 16-bit PCM, so chunks concatenate without re-encoding"""
+
+    name = "elevenlabs"
+    URL = "https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
+
+    def __init__(self, api_key: str, voice_id: str = None, model_id: str = None, sample_rate: int = None):
+        self.api_key = api_key
+        self.voice_id = voice_id or settings.ELEVENLABS_VOICE_ID
+        self.model_id = model_id or settings.ELEVENLABS_MODEL_ID
+        self.sample_rate = sample_rate or settings.TTS_SAMPLE_RATE
+        self.voice_settings = {"stability": 0.5, "similarity_boost": 0.75, "style": 0.0, "speed": 0.9}
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def params(self) -> Dict[str, Any]:
+        return {
+            "voice": self.voice_id,
+            "model": self.model_id,
+            "sampleRate": self.sample_rate,
+            "settings": self.voice_settings,
+        }
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=60)
+        return self._client
+
+    async def synthesize(self, text: str) -> bytes:
+        response = await self.client.post(
+            self.URL.format(voice_id=self.voice_id),
+            params={"output_format": f"pcm_{self.sample_rate}"},
+            headers={"xi-api-key": self.api_key},
+            json={"text": text, "model_id": self.model_id, "voice_settings": self.voice_settings},
+        )
+        response.raise_for_status()
+        return response.content
+
+
+class LocalSynthesizer:
+    """Offline stand-in: a quiet tone as long as the text would take to speak.
+
+    Deterministic and free, for tests and development without an ElevenLabs key.
+    """
+
+    name = "local"
+    CHARS_PER_SECOND = 14
+
+    def __init__(self, sample_rate: int = None):
+        self.sample_rate = sample_rate or settings.TTS_SAMPLE_RATE
+
+    def params(self) -> Dict[str, Any]:
+        return {"sampleRate": self.sample_rate, "charsPerSecond": self.CHARS_PER_SECOND}
+
+    async def synthesize(self, text: str) -> bytes:
+        seconds = max(len(text) / self.CHARS_PER_SECOND, 0.5)
+        t = np.arange(int(seconds * self.sample_rate)) / self.sample_rate
+        return (np.sin(2 * math.pi * 220 * t) * 3000).astype("<i2").tobytes()
+
+
+class MeditationAudioPipeline:
+    """Renders a meditation script to one WAV file, content-addressed by script and voice.
+
+    Step instructions are synthesized concurrently (at most TTS_CONCURRENCY
+    requests in flight), joined in order with TTS_STEP_PAUSE_SECONDS of silence
+    between steps, and written to audio/generated/<key>.wav where key hashes
+    the instructions and the synthesizer's voice and settings. A script that was
+    rendered before is never sent to the synthesizer again, and concurrent
+    requests for the same script share one rendering.
+    """
+
+    def __init__(self, synthesizer, output_dir: str = GENERATED_DIR, concurrency: int = None):
+        self.synthesizer = synthesizer
+        self.output_dir = output_dir
+        self.concurrency = concurrency or settings.TTS_CONCURRENCY
+        self.pause_seconds = settings.TTS_STEP_PAUSE_SECONDS
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def key(self, instructions: List[str]) -> str:
+        payload = {
+            "script": instructions,
+            "pause": self.pause_seconds,
+            "synthesizer": self.synthesizer.name,
+            "params": self.synthesizer.params(),
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.output_dir, f"{key}.wav")
+
+    @staticmethod
+    def duration(path: str) -> float:
+        with wave.open(path, "rb") as audio:
+            return audio.getnframes() / audio.getframerate()
+
+    async def _render(self, instructions: List[str], path: str):
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def synthesize(text: str) -> bytes:
+            async with semaphore:
+                return await self.synthesizer.synthesize(text)
+
+        chunked = [split_text(instruction) for instruction in instructions]
+        audio = await asyncio.gather(*(synthesize(chunk) for chunks in chunked for chunk in chunks))
+        pause = b"\0" * int(self.pause_seconds * self.synthesizer.sample_rate) * SAMPLE_WIDTH
+        parts, position = [], 0
+        for chunks in chunked:
+            parts.extend(audio[position:position + len(chunks)])
+            position += len(chunks)
+            parts.append(pause)
+        os.makedirs(self.output_dir, exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with wave.open(temporary, "wb") as output:
+            output.setnchannels(1)
+            output.setsampwidth(SAMPLE_WIDTH)
+            output.setframerate(self.synthesizer.sample_rate)
+            output.writeframes(b"".join(parts[:-1]))
+        os.replace(temporary, path)
+
+    async def generate(self, instructions: List[str]) -> Dict[str, Any]:
+        """{"key", "path", "duration", "cached"} of the rendered script"""
+        instructions = [instruction.strip() for instruction in instructions if instruction and instruction.strip()]
+        if not instructions:
+            raise ValueError("Nothing to synthesize")
+        key = self.key(instructions)
+        path = self.path(key)
+        cached = os.path.exists(path)
+        if not cached:
+            if key in self._inflight:
+                await asyncio.shield(self._inflight[key])
+            else:
+                future = asyncio.get_running_loop().create_future()
+                self._inflight[key] = future
+                try:
+                    await self._render(instructions, path)
+                    future.set_result(None)
+                except Exception as e:
+                    future.set_exception(e)
+                    # Marks the exception retrieved when no other request was waiting
+                    future.exception()
+                    raise
+                finally:
+                    del self._inflight[key]
+        return {"key": key, "path": path, "duration": round(self.duration(path)), "cached": cached}
+
+
+def create_synthesizer():
+    """Synthesizer for TTS_PROVIDER, or None when speech generation is unavailable"""
+    if settings.TTS_PROVIDER == "elevenlabs":
+        if not settings.ELEVENLABS_API_KEY:
+            print("TTS_PROVIDER is elevenlabs but ELEVENLABS_API_KEY is not set; meditation audio is disabled")
+            return None
+        return ElevenLabsSynthesizer(settings.ELEVENLABS_API_KEY)
+    if settings.TTS_PROVIDER == "local":
+        return LocalSynthesizer()
+    return None
@@ -0,0 +1,271 @@
+import asyncio
+from collections.abc import AsyncIterator, Iterator, Sequence
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    WRITES_IDX_MAP,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.serde.types import TASKS
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from config.setting import settings
+from database.mongo_client import get_database
+
+
+class MongoCheckpointSaver(BaseCheckpointSaver):
+    """LangGraph checkpointer storing graph state in MongoDB through Motor.
+
+    One document per checkpoint in `chat_checkpoints` and one per pending write
+    in `chat_checkpoint_writes`, both keyed by (thread_id, checkpoint_ns,
+    checkpoint_id); values are stored as the serializer's typed bytes. Every
+    document carries createdAt for a TTL index, and each new run of a thread
+    deletes all but its newest `keep_last` checkpoints.
+
+    The async methods are the real implementation. The sync ones submit to the
+    event loop the saver was last used on and must be called from another thread.
+    """
+
+    def __init__(self, db=None, keep_last: int = None, ttl_seconds: int = None):
+        super().__init__()
+        self._db = db
+        self.keep_last = keep_last or settings.CHAT_CHECKPOINT_KEEP_LAST
+        self.ttl_seconds = ttl_seconds or settings.CHAT_CHECKPOINT_TTL_DAYS * 86400
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def _collections(self):
+        self.loop = asyncio.get_running_loop()
+        db = self._db if self._db is not None else await get_database()
+        return db.chat_checkpoints, db.chat_checkpoint_writes
+
+    async def ensure_indexes(self):
+        checkpoints, writes = await self._collections()
+        await checkpoints.create_index(
+            [("thread_id", ASCENDING), ("checkpoint_ns", ASCENDING), ("checkpoint_id", DESCENDING)], unique=True
+        )
+        await writes.create_index(
+            [("thread_id", ASCENDING), ("checkpoint_ns", ASCENDING), ("checkpoint_id", ASCENDING),
+             ("task_id", ASCENDING), ("idx", ASCENDING)],
+            unique=True,
+        )
+        for collection in (checkpoints, writes):
+            await collection.create_index("createdAt", expireAfterSeconds=self.ttl_seconds)
+
+    def _loads(self, type_: str, value: bytes) -> Any:
+        return self.serde.loads_typed((type_, value))
+
+    async def _to_tuple(self, doc: Dict[str, Any], writes) -> CheckpointTuple:
+        thread_id, checkpoint_ns = doc["thread_id"], doc["checkpoint_ns"]
+        checkpoint = self._loads(doc["type"], doc["checkpoint"])
+        pending_writes = []
+        async for write in writes.find(
+            {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": doc["checkpoint_id"]}
+        ).sort([("task_id", ASCENDING), ("idx", ASCENDING)]):
+            pending_writes.append((write["task_id"], write["channel"], self._loads(write["type"], write["value"])))
+        parent_id = doc.get("parent_checkpoint_id")
+        if parent_id:
+            # Sends scheduled by the parent step are restored from its task writes
+            sends = writes.find(
+                {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_id, "channel": TASKS}
+            ).sort([("task_path", ASCENDING), ("task_id", ASCENDING), ("idx", ASCENDING)])
+            checkpoint["pending_sends"] = [self._loads(send["type"], send["value"]) async for send in sends]
+        else:
+            checkpoint["pending_sends"] = []
+        return CheckpointTuple(
+            config={"configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": doc["checkpoint_id"],
+            }},
+            checkpoint=checkpoint,
+            metadata=self._loads(doc["metadata_type"], doc["metadata"]),
+            pending_writes=pending_writes,
+            parent_config=(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_id}}
+                if parent_id
+                else None
+            ),
+        )
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        checkpoints, writes = await self._collections()
+        configurable = config["configurable"]
+        query = {"thread_id": configurable["thread_id"], "checkpoint_ns": configurable.get("checkpoint_ns", "")}
+        checkpoint_id = get_checkpoint_id(config)
+        if checkpoint_id:
+            query["checkpoint_id"] = checkpoint_id
+        # uuid6 checkpoint ids sort by creation time
+        doc = await checkpoints.find_one(query, sort=[("checkpoint_id", DESCENDING)])
+        return await self._to_tuple(doc, writes) if doc else None
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        checkpoints, writes = await self._collections()
+        query: Dict[str, Any] = {}
+        if config:
+            query["thread_id"] = config["configurable"]["thread_id"]
+            if "checkpoint_ns" in config["configurable"]:
+                query["checkpoint_ns"] = config["configurable"]["checkpoint_ns"]
+            if checkpoint_id := get_checkpoint_id(config):
+                query["checkpoint_id"] = checkpoint_id
+        if before and (before_id := get_checkpoint_id(before)):
+            query.setdefault("checkpoint_id", {})
+            if isinstance(query["checkpoint_id"], dict):
+                query["checkpoint_id"]["$lt"] = before_id
+        returned = 0
+        # Metadata is stored serialized, so the filter is applied after loading
+        async for doc in checkpoints.find(query).sort("checkpoint_id", DESCENDING):
+            checkpoint_tuple = await self._to_tuple(doc, writes)
+            if filter and any(checkpoint_tuple.metadata.get(key) != value for key, value in filter.items()):
+                continue
+            yield checkpoint_tuple
+            returned += 1
+            if limit is not None and returned >= limit:
+                break
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        checkpoints, _ = await self._collections()
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        stored = {key: value for key, value in checkpoint.items() if key != "pending_sends"}
+        type_, serialized = self.serde.dumps_typed(stored)
+        metadata = get_checkpoint_metadata(config, metadata)
+        metadata_type, serialized_metadata = self.serde.dumps_typed(metadata)
+        key = {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]}
+        await checkpoints.update_one(
+            key,
+            {"$set": {
+                **key,
+                "parent_checkpoint_id": config["configurable"].get("checkpoint_id"),
+                "type": type_,
+                "checkpoint": serialized,
+                "metadata_type": metadata_type,
+                "metadata": serialized_metadata,
+                "createdAt": datetime.utcnow(),
+            }},
+            upsert=True,
+        )
+        if metadata.get("source") == "input":
+            # Once per run rather than on every super-step
+            await self.acompact(thread_id, checkpoint_ns)
+        return {"configurable": key}
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        _, writes_collection = await self._collections()
+        configurable = config["configurable"]
+        key = {
+            "thread_id": configurable["thread_id"],
+            "checkpoint_ns": configurable.get("checkpoint_ns", ""),
+            "checkpoint_id": configurable["checkpoint_id"],
+            "task_id": task_id,
+        }
+        operations = []
+        for idx, (channel, value) in enumerate(writes):
+            idx = WRITES_IDX_MAP.get(channel, idx)
+            type_, serialized = self.serde.dumps_typed(value)
+            fields = {
+                "channel": channel,
+                "type": type_,
+                "value": serialized,
+                "task_path": task_path,
+                "createdAt": datetime.utcnow(),
+            }
+            # Regular writes are kept as first written, special channels (errors, interrupts) are replaced
+            operation = "$setOnInsert" if idx >= 0 else "$set"
+            operations.append(UpdateOne({**key, "idx": idx}, {operation: fields}, upsert=True))
+        if operations:
+            await writes_collection.bulk_write(operations, ordered=False)
+
+    async def acompact(self, thread_id: str, checkpoint_ns: str = ""):
+        """Delete all but the newest `keep_last` checkpoints of the thread and their writes"""
+        checkpoints, writes = await self._collections()
+        query = {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns}
+        oldest_kept = await checkpoints.find(query, {"checkpoint_id": 1}).sort(
+            "checkpoint_id", DESCENDING
+        ).skip(self.keep_last - 1).limit(1).to_list(length=1)
+        if not oldest_kept:
+            return
+        stale = {**query, "checkpoint_id": {"$lt": oldest_kept[0]["checkpoint_id"]}}
+        await checkpoints.delete_many(stale)
+        await writes.delete_many(stale)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        checkpoints, writes = await self._collections()
+        await checkpoints.delete_many({"thread_id": thread_id})
+        await writes.delete_many({"thread_id": thread_id})
+
+    def _run_sync(self, coro):
+        if self.loop is None:
+            coro.close()
+            raise RuntimeError("MongoCheckpointSaver has not been used from an event loop yet; use the async methods")
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self.loop:
+            coro.close()
+            raise asyncio.InvalidStateError(
+                "Synchronous calls to MongoCheckpointSaver are only allowed from a different thread; "
+                "use the async methods (ainvoke/astream) from the event loop"
+            )
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return self._run_sync(self.aget_tuple(config))
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        async def collect():
+            return [item async for item in self.alist(config, filter=filter, before=before, limit=limit)]
+        yield from self._run_sync(collect())
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return self._run_sync(self.aput(config, checkpoint, metadata, new_versions))
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        return self._run_sync(self.aput_writes(config, writes, task_id, task_path))
+
+    def delete_thread(self, thread_id: str) -> None:
+        return self._run_sync(self.adelete_thread(thread_id))
@@ -0,0 +1,34 @@
+from typing import Any, Optional
+from bson import ObjectId
+
+PROTECTED_FIELDS = {"_id", "id", "userId", "createdAt"}
+
+
+def to_object_id(value: Any) -> ObjectId:
+    """userId as stored in every collection: the owning user's ObjectId.
+
+    Accepts an ObjectId or its 24 character hex string; anything else raises
+    bson.errors.InvalidId so a bad id can't silently become a query that matches nothing.
+    """
+    if isinstance(value, ObjectId):
+        return value
+    return ObjectId(str(value))
+
+
+def user_id_to_object_id(doc: dict) -> dict:
+    """Copy of `doc` with its userId converted for storage"""
+    if doc.get("userId") is None:
+        return doc
+    return {**doc, "userId": to_object_id(doc["userId"])}
+
+
+def owner_filter(document_id: str, user_id: Any) -> Optional[dict]:
+    """{_id, userId} filter for a document the user owns; None when document_id isn't a valid id"""
+    if not ObjectId.is_valid(document_id):
+        return None
+    return {"_id": ObjectId(document_id), "userId": to_object_id(user_id)}
+
+
+def without_identity(updates: dict) -> dict:
+    """Drop the fields a client update must not overwrite"""
+    return {key: value for key, value in updates.items() if key not in PROTECTED_FIELDS}
@@ -0,0 +1,38 @@
+from config.setting import settings
+from database.mongo_client import get_database
+from models.daily_rollup import MoodDailyRollupRepository, SleepDailyRollupRepository
+from models.sleep_record import SleepRecordRepository
+from models.reminder import ReminderRepository
+from models.chat import ChatRepository, MessageRepository
+from database.checkpointer import MongoCheckpointSaver
+from models.search import SearchRepository
+from models.content_catalog import ContentCatalogRepository
+from models.news_article import NewsArticleRepository
+
+
+async def ensure_indexes():
+    """Create the indexes the repositories' queries rely on; safe to run on every startup.
+
+    Each collection is tried on its own, so one failure (e.g. an index whose
+    options changed) doesn't leave the others without indexes.
+    """
+    db = await get_database()
+    steps = {
+        "mood_analyses": lambda: db.mood_analyses.create_index([("userId", 1), ("createdAt", -1)]),
+        "sleep_analyses": lambda: db.sleep_analyses.create_index([("userId", 1), ("createdAt", -1)]),
+        "sleep_records": SleepRecordRepository(db).ensure_indexes,
+        "reminders": ReminderRepository(db).ensure_indexes,
+        "chats": ChatRepository(db).ensure_indexes,
+        "messages": MessageRepository(db).ensure_indexes,
+        "chat_checkpoints": MongoCheckpointSaver(db).ensure_indexes,
+        "text search": SearchRepository(db).ensure_indexes,
+        "mood_daily_rollups": MoodDailyRollupRepository(db).ensure_indexes,
+        "sleep_daily_rollups": SleepDailyRollupRepository(db).ensure_indexes,
+        "content_catalog": ContentCatalogRepository(db).ensure_indexes,
+        "news_articles": lambda: NewsArticleRepository(db).ensure_indexes(settings.NEWS_RETENTION_DAYS),
+    }
+    for name, ensure in steps.items():
+        try:
+            await ensure()
+        except Exception as e:
+            print(f"Failed to create MongoDB indexes for {name}: {e}")
@@ -0,0 +1,77 @@
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+from pymongo import UpdateOne
+
+DEFAULT_BATCH_SIZE = 500
+
+
+class BatchedMigration:
+    """Rewrites the documents of one collection in _id order, a batch at a time.
+
+    After every batch the last processed _id is stored in the `migrations`
+    collection under `name`, so an interrupted run continues where it stopped.
+    `transform(doc)` returns the fields to $set (or None to leave the document
+    alone); it must be idempotent since a crash can repeat the last batch.
+    """
+
+    def __init__(
+        self,
+        db,
+        name: str,
+        collection_name: str,
+        transform: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]],
+        query: Optional[Dict[str, Any]] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        self.db = db
+        self.name = name
+        self.collection = db[collection_name]
+        self.transform = transform
+        self.query = query or {}
+        self.batch_size = batch_size
+
+    async def get_checkpoint(self) -> Optional[Dict[str, Any]]:
+        return await self.db.migrations.find_one({"_id": self.name})
+
+    async def reset(self):
+        await self.db.migrations.delete_one({"_id": self.name})
+
+    async def _save_checkpoint(self, last_id, scanned: int, updated: int, done: bool = False):
+        await self.db.migrations.update_one(
+            {"_id": self.name},
+            {
+                "$set": {"lastId": last_id, "done": done, "updatedAt": datetime.utcnow()},
+                "$inc": {"scanned": scanned, "updated": updated},
+                "$setOnInsert": {"startedAt": datetime.utcnow()},
+            },
+            upsert=True,
+        )
+
+    async def run(self) -> Dict[str, int]:
+        checkpoint = await self.get_checkpoint() or {}
+        if checkpoint.get("done"):
+            print(f"{self.name}: already completed, use reset to run it again")
+            return {"scanned": 0, "updated": 0}
+        last_id = checkpoint.get("lastId")
+        totals = {"scanned": 0, "updated": 0}
+        while True:
+            query = dict(self.query)
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            batch = await self.collection.find(query).sort("_id", 1).limit(self.batch_size).to_list(length=self.batch_size)
+            if not batch:
+                break
+            operations = []
+            for doc in batch:
+                changes = self.transform(doc)
+                if changes:
+                    operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": changes}))
+            if operations:
+                await self.collection.bulk_write(operations, ordered=False)
+            last_id = batch[-1]["_id"]
+            totals["scanned"] += len(batch)
+            totals["updated"] += len(operations)
+            await self._save_checkpoint(last_id, len(batch), len(operations))
+            print(f"{self.name}: {totals['scanned']} scanned, {totals['updated']} updated")
+        await self._save_checkpoint(last_id, 0, 0, done=True)
+        return totals
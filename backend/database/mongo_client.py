@@ -1,15 +1,32 @@
 import motor.motor_asyncio
 from typing import Optional
 from config.setting import settings
+from database.monitoring import CommandLatencyListener, PoolCheckoutListener
 
 class MongoDBClient:
     def __init__(self):
         self.client: Optional[motor.motor_asyncio.AsyncIOMotorClient] = None
         self.db = None
+        self.command_listener = CommandLatencyListener(slow_threshold_ms=settings.MONGODB_SLOW_QUERY_MS)
+        self.pool_listener = PoolCheckoutListener()
+
+    def client_options(self) -> dict:
+        return {
+            "maxPoolSize": settings.MONGODB_MAX_POOL_SIZE,
+            "minPoolSize": settings.MONGODB_MIN_POOL_SIZE,
+            "maxIdleTimeMS": settings.MONGODB_MAX_IDLE_TIME_MS,
+            "connectTimeoutMS": settings.MONGODB_CONNECT_TIMEOUT_MS,
+            "serverSelectionTimeoutMS": settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+            "socketTimeoutMS": settings.MONGODB_SOCKET_TIMEOUT_MS,
+            "waitQueueTimeoutMS": settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+            "event_listeners": [self.command_listener, self.pool_listener],
+        }
 
     async def connect(self):
+        if self.client is not None:
+            return
         try:
-            self.client = motor.motor_asyncio.AsyncIOMotorClient(settings.MONGODB_URL)
+            self.client = motor.motor_asyncio.AsyncIOMotorClient(settings.MONGODB_URL, **self.client_options())
             self.db = self.client[settings.MONGODB_DB_NAME]
             print(f"Connected to MongoDB: {settings.MONGODB_DB_NAME}")
         except Exception as e:
@@ -19,6 +36,8 @@ class MongoDBClient:
     async def close(self):
         if self.client:
             self.client.close()
+            self.client = None
+            self.db = None
             print("MongoDB connection closed")
 
     def get_database(self):
@@ -34,6 +53,12 @@ class MongoDBClient:
             print(f"Database ping failed: {e}")
             return False
 
+    def get_metrics(self) -> dict:
+        return {
+            "pool": self.pool_listener.snapshot(),
+            "commands": self.command_listener.snapshot(),
+        }
+
 
 mongo_client = MongoDBClient()
 
@@ -46,5 +71,9 @@ async def init_database():
     await mongo_client.connect()
 
 
+def get_database_metrics():
+    return mongo_client.get_metrics()
+
+
 async def close_database():
     await mongo_client.close() 
\ No newline at end of file
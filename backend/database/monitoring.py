@@ -0,0 +1,180 @@
+import bisect
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple, List
+from pymongo import monitoring
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open ended
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+# Commands that carry no collection name worth grouping by
+_ADMIN_COMMANDS = {"ping", "hello", "ismaster", "isMaster", "buildInfo", "endSessions", "saslStart", "saslContinue"}
+
+
+class LatencyHistogram:
+    def __init__(self, buckets: List[float] = LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, value_ms: float):
+        self.counts[bisect.bisect_left(self.buckets, value_ms)] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Approximate percentile, reported as the upper bound of the matching bucket"""
+        if self.count == 0:
+            return None
+        rank = p / 100 * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"<={b}ms" for b in self.buckets] + [f">{self.buckets[-1]}ms"]
+        return {
+            "count": self.count,
+            "avgMs": round(self.total_ms / self.count, 3) if self.count else None,
+            "maxMs": round(self.max_ms, 3),
+            "p50Ms": self.percentile(50),
+            "p95Ms": self.percentile(95),
+            "p99Ms": self.percentile(99),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class CommandLatencyListener(monitoring.CommandListener):
+    """Records per collection/command latency histograms and reports slow operations.
+
+    Listener callbacks run on the driver's I/O threads, so all state is guarded by a lock.
+    """
+
+    def __init__(self, slow_threshold_ms: float = 100):
+        self.slow_threshold_ms = slow_threshold_ms
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Tuple[Any, int], str] = {}
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._failures: Dict[str, int] = {}
+
+    @staticmethod
+    def _collection_name(event: monitoring.CommandStartedEvent) -> str:
+        if event.command_name in _ADMIN_COMMANDS:
+            return "admin"
+        target = event.command.get(event.command_name)
+        return target if isinstance(target, str) else "admin"
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        key = f"{self._collection_name(event)}.{event.command_name}"
+        with self._lock:
+            self._in_flight[(event.connection_id, event.request_id)] = key
+
+    def _finish(self, event, failed: bool = False):
+        duration_ms = event.duration_micros / 1000
+        with self._lock:
+            key = self._in_flight.pop((event.connection_id, event.request_id), None) or f"unknown.{event.command_name}"
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = LatencyHistogram()
+            histogram.observe(duration_ms)
+            if failed:
+                self._failures[key] = self._failures.get(key, 0) + 1
+        if duration_ms >= self.slow_threshold_ms:
+            status = "failed" if failed else "ok"
+            print(f"Slow MongoDB operation: {key} took {duration_ms:.1f}ms ({status})")
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        self._finish(event)
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        self._finish(event, failed=True)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                key: {**histogram.to_dict(), "failures": self._failures.get(key, 0)}
+                for key, histogram in sorted(self._histograms.items())
+            }
+
+
+class PoolCheckoutListener(monitoring.ConnectionPoolListener):
+    """Tracks how long operations wait to check a connection out of the pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checkout_started: Dict[int, float] = {}
+        self.checkout_wait = LatencyHistogram()
+        self.checkout_failures = 0
+        self.connections_created = 0
+        self.connections_closed = 0
+        self.checked_out = 0
+
+    def connection_check_out_started(self, event):
+        # Check out happens on the calling thread, so the thread id pairs start and finish
+        # for drivers that don't report the duration on the event itself
+        with self._lock:
+            self._checkout_started[threading.get_ident()] = time.perf_counter()
+
+    def _checkout_duration_ms(self, event) -> Optional[float]:
+        started = self._checkout_started.pop(threading.get_ident(), None)
+        duration = getattr(event, "duration", None)
+        if duration is not None:
+            return duration * 1000
+        if started is not None:
+            return (time.perf_counter() - started) * 1000
+        return None
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            duration_ms = self._checkout_duration_ms(event)
+            if duration_ms is not None:
+                self.checkout_wait.observe(duration_ms)
+            self.checked_out += 1
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self._checkout_duration_ms(event)
+            self.checkout_failures += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_created += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_closed += 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkoutWait": self.checkout_wait.to_dict(),
+                "checkoutFailures": self.checkout_failures,
+                "checkedOut": self.checked_out,
+                "openConnections": self.connections_created - self.connections_closed,
+            }
@@ -0,0 +1,162 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from config.setting import settings
+from database.mongo_client import get_database
+
+DUPLICATE_KEY = 11000
+
+
+class WriteBehindBuffer:
+    """Defers chat writes that nothing in the request waits on.
+
+    Message documents (with their _id already assigned) are batched into one
+    insert_many, and chat document updates are coalesced per chat ($set keeps
+    the latest value, $inc sums) into one bulk_write. Flushes run every
+    WRITE_BEHIND_FLUSH_INTERVAL_MS, as soon as WRITE_BEHIND_MAX_BATCH messages
+    are pending, and on shutdown. A failed flush is always put back for the
+    next one; once max_pending writes are waiting, add_message and update_chat
+    refuse new ones (returning False) so callers write them directly instead.
+    """
+
+    def __init__(self, db=None, interval_ms: int = None, max_batch: int = None, max_pending: int = 10000):
+        self._db = db
+        self.interval = (interval_ms or settings.WRITE_BEHIND_FLUSH_INTERVAL_MS) / 1000
+        self.max_batch = max_batch or settings.WRITE_BEHIND_MAX_BATCH
+        self.max_pending = max_pending
+        self._messages: List[Dict[str, Any]] = []
+        self._chat_updates: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._pending_flush: Optional[asyncio.Task] = None
+        self.refused = 0
+        self.failed_flushes = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._messages) + len(self._chat_updates)
+
+    @property
+    def full(self) -> bool:
+        return self.pending >= self.max_pending
+
+    def add_message(self, doc: Dict[str, Any]) -> bool:
+        if self.full:
+            self.refused += 1
+            return False
+        self._messages.append(doc)
+        if len(self._messages) >= self.max_batch and (self._pending_flush is None or self._pending_flush.done()):
+            self._pending_flush = asyncio.get_running_loop().create_task(self.flush())
+        return True
+
+    def update_chat(self, chat_id: str, set_fields: Dict[str, Any] = None, inc_fields: Dict[str, Any] = None) -> bool:
+        # A chat that already has a pending update is coalesced into it, so it never grows the buffer
+        if chat_id not in self._chat_updates and self.full:
+            self.refused += 1
+            return False
+        update = self._chat_updates.setdefault(chat_id, {"$set": {}, "$inc": {}})
+        update["$set"].update(set_fields or {})
+        for field, value in (inc_fields or {}).items():
+            update["$inc"][field] = update["$inc"].get(field, 0) + value
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pendingMessages": len(self._messages),
+            "pendingChatUpdates": len(self._chat_updates),
+            "maxPending": self.max_pending,
+            "refused": self.refused,
+            "failedFlushes": self.failed_flushes,
+        }
+
+    async def flush(self):
+        async with self._flush_lock:
+            # Swap before the first await so writes added meanwhile go to the next flush
+            messages, self._messages = self._messages, []
+            chat_updates, self._chat_updates = self._chat_updates, {}
+            if not messages and not chat_updates:
+                return
+            # Whatever is still in these when the flush ends (failed or cancelled) goes back in the buffer
+            unwritten_messages, unwritten_updates = messages, chat_updates
+            try:
+                db = self._db if self._db is not None else await get_database()
+                # Messages first so a chat never points at a message that isn't stored yet
+                if messages:
+                    try:
+                        await db.messages.insert_many(messages, ordered=False)
+                    except BulkWriteError as e:
+                        # Duplicates are documents from a retried batch that did land the first time
+                        unwritten_messages = [
+                            messages[error["index"]] for error in e.details.get("writeErrors", [])
+                            if error.get("code") != DUPLICATE_KEY
+                        ]
+                        if unwritten_messages:
+                            print(f"Write-behind message flush failed for {len(unwritten_messages)} messages, retrying next flush: {e.details}")
+                            return
+                    except Exception as e:
+                        print(f"Write-behind message flush failed, retrying next flush: {e}")
+                        return
+                    unwritten_messages = []
+                if chat_updates:
+                    operations = [
+                        UpdateOne({"_id": ObjectId(chat_id)}, {op: fields for op, fields in update.items() if fields})
+                        for chat_id, update in chat_updates.items()
+                    ]
+                    try:
+                        await db.chats.bulk_write(operations, ordered=False)
+                    except Exception as e:
+                        print(f"Write-behind chat flush failed, retrying next flush: {e}")
+                        return
+                unwritten_updates = {}
+            finally:
+                if unwritten_messages or unwritten_updates:
+                    self._requeue(unwritten_messages, unwritten_updates)
+
+    def _requeue(self, messages: List[Dict[str, Any]], chat_updates: Dict[str, Dict[str, Dict[str, Any]]]):
+        # Accepted writes are never dropped here; a full buffer refuses new ones instead
+        self.failed_flushes += 1
+        self._messages[:0] = messages
+        for chat_id, update in chat_updates.items():
+            newer = self._chat_updates.get(chat_id)
+            if newer is None:
+                self._chat_updates[chat_id] = update
+                continue
+            # Values set after the failed flush win; increments add up
+            update["$set"].update(newer["$set"])
+            for field, value in newer["$inc"].items():
+                update["$inc"][field] = update["$inc"].get(field, 0) + value
+            self._chat_updates[chat_id] = update
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Write-behind flush error: {e}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            # A flush interrupted by the cancel puts its batch back, so the final flush below writes it
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._pending_flush is not None:
+            try:
+                await self._pending_flush
+            except Exception as e:
+                print(f"Write-behind flush error: {e}")
+            self._pending_flush = None
+        await self.flush()
+
+
+write_behind = WriteBehindBuffer()
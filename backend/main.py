@@ -4,24 +4,43 @@ import os
 
 from fastapi import FastAPI, APIRouter
 from contextlib import asynccontextmanager
-from api import auth, agent, users, chat, mood, sleep, reminder
-from database.mongo_client import init_database, close_database
+from api import auth, agent, users, chat, mood, sleep, reminder, search, audio
+from database.mongo_client import init_database, close_database, get_database_metrics
+from database.indexes import ensure_indexes
+from database.write_behind import write_behind
+from core.retrieval import meditation_retriever
+from core.audio_index import audio_index
+from core.content_catalog import content_catalog
+from core.news_store import news_store
 from fastapi.middleware.cors import CORSMiddleware
 from utils.reminder_email_task import reminder_email_task
+from core.responses import APIJSONResponse
 import asyncio
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_database()
+    await ensure_indexes()
+    try:
+        await asyncio.to_thread(meditation_retriever.load)
+    except Exception as e:
+        print(f"Failed to load the meditation RAG index: {e}")
+    await asyncio.to_thread(audio_index.load)
     task = asyncio.create_task(reminder_email_task())
+    write_behind.start()
+    content_catalog.start()
+    news_store.start()
     try:
         yield
     finally:
         task.cancel()
+        content_catalog.stop()
+        news_store.stop()
+        await write_behind.stop()
     await close_database()
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=APIJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -39,8 +58,14 @@ api_router.include_router(chat.router, prefix="/chat", tags=["chat"])
 api_router.include_router(mood.router, prefix="/mood", tags=["mood"])
 api_router.include_router(sleep.router, prefix="/sleep", tags=["sleep"])
 api_router.include_router(reminder.router, prefix="/reminder", tags=["reminder"])
+api_router.include_router(search.router, prefix="/search", tags=["search"])
+api_router.include_router(audio.router, prefix="/audio", tags=["audio"])
 app.include_router(api_router, prefix="/api")
 
 @app.get("/health")
 def health():
-    return {"status": "ok"} 
\ No newline at end of file
+    return {"status": "ok"}
+
+@app.get("/health/db")
+def database_health():
+    return {**get_database_metrics(), "writeBehind": write_behind.stats()} 
\ No newline at end of file
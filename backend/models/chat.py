@@ -1,8 +1,15 @@
-from typing import Optional, List, Literal, Dict, Any
+from typing import Optional, List, Literal, Dict, Any, Tuple
 from pydantic import BaseModel, Field
 from datetime import datetime
 from bson import ObjectId
 from database.mongo_client import get_database
+from database.ids import to_object_id, user_id_to_object_id
+from utils.chat_history import chat_history_cache, history_entry
+from database.write_behind import write_behind
+from database.checkpointer import MongoCheckpointSaver
+from core.semantic_search import semantic_index
+
+LAST_MESSAGE_PREVIEW_CHARS = 200
 
 class MessageModel(BaseModel):
     id: Optional[str] = Field(default=None, alias="_id")
@@ -26,11 +33,20 @@ class MessageModel(BaseModel):
         if data.get("_id"):
             data["id"] = str(data["_id"])
             del data["_id"]
+        if data.get("userId"):
+            data["userId"] = str(data["userId"])
         return cls(**data)
 
 class ChatModel(BaseModel):
     id: Optional[str] = Field(default=None, alias="_id")
     userId: str
+    # Running summary of every message up to and including summarizedUntil
+    summary: Optional[str] = None
+    summarizedUntil: Optional[datetime] = None
+    # Maintained on every message write for the chat list
+    lastMessage: Optional[str] = None
+    lastMessageAt: Optional[datetime] = None
+    messageCount: int = 0
     createdAt: datetime = Field(default_factory=datetime.utcnow)
     updatedAt: datetime = Field(default_factory=datetime.utcnow)
 
@@ -46,8 +62,40 @@ class ChatModel(BaseModel):
         if data.get("_id"):
             data["id"] = str(data["_id"])
             del data["_id"]
+        if data.get("userId"):
+            data["userId"] = str(data["userId"])
         return cls(**data)
 
+CHAT_LIST_PROJECTION = {"lastMessage": 1, "lastMessageAt": 1, "messageCount": 1, "createdAt": 1}
+
+class ChatListItem(BaseModel):
+    id: str
+    lastMessage: Optional[str] = None
+    lastMessageAt: datetime
+    messageCount: int = 0
+    createdAt: datetime
+
+    @classmethod
+    def from_mongo(cls, data: Dict[str, Any]) -> "ChatListItem":
+        return cls(
+            id=str(data["_id"]),
+            lastMessage=data.get("lastMessage"),
+            lastMessageAt=data.get("lastMessageAt") or data["createdAt"],
+            messageCount=data.get("messageCount", 0),
+            createdAt=data["createdAt"],
+        )
+
+def chat_message_update(message: MessageModel) -> Dict[str, Dict[str, Any]]:
+    """$set/$inc that records `message` as the chat's latest"""
+    return {
+        "$set": {
+            "lastMessage": message.content[:LAST_MESSAGE_PREVIEW_CHARS],
+            "lastMessageAt": message.timestamp,
+            "updatedAt": message.timestamp,
+        },
+        "$inc": {"messageCount": 1},
+    }
+
 class ChatRepository:
     def __init__(self, db=None):
         self._db = db
@@ -63,9 +111,15 @@ class ChatRepository:
             self._collection = db.chats
         return self._collection
 
+    async def ensure_indexes(self):
+        await (await self.collection).create_index([("userId", 1), ("lastMessageAt", -1), ("_id", -1)])
+
     async def create(self, chat: ChatModel) -> str:
-        doc = chat.dict(by_alias=True, exclude={"id"})
+        doc = user_id_to_object_id(chat.dict(by_alias=True, exclude={"id"}))
+        # New chats sort by their creation time until the first message
+        doc["lastMessageAt"] = doc.get("lastMessageAt") or doc["createdAt"]
         result = await (await self.collection).insert_one(doc)
+        chat_history_cache.load(str(result.inserted_id), [])
         return str(result.inserted_id)
 
     async def get_by_id(self, chat_id: str) -> Optional[ChatModel]:
@@ -73,9 +127,31 @@ class ChatRepository:
         return ChatModel.from_mongo(doc) if doc else None
 
     async def get_by_user(self, user_id: str) -> list:
-        cursor = (await self.collection).find({"userId": user_id})
+        cursor = (await self.collection).find({"userId": to_object_id(user_id)})
         return [ChatModel.from_mongo(doc) async for doc in cursor]
 
+    async def list_for_user(
+        self,
+        user_id: str,
+        limit: int = 20,
+        before: Optional[Tuple[datetime, str]] = None,
+    ) -> List[ChatListItem]:
+        """Most recently active chats first; `before` is the (lastMessageAt, id) of the previous page's last chat"""
+        query: Dict[str, Any] = {"userId": to_object_id(user_id)}
+        if before:
+            before_at, before_id = before
+            query["$or"] = [
+                {"lastMessageAt": {"$lt": before_at}},
+                {"lastMessageAt": before_at, "_id": {"$lt": ObjectId(before_id)}},
+            ]
+        cursor = (await self.collection).find(query, CHAT_LIST_PROJECTION).sort(
+            [("lastMessageAt", -1), ("_id", -1)]
+        ).limit(limit)
+        return [ChatListItem.from_mongo(doc) async for doc in cursor]
+
+    async def record_message(self, chat_id: str, message: MessageModel):
+        await (await self.collection).update_one({"_id": ObjectId(chat_id)}, chat_message_update(message))
+
     async def update(self, chat_id: str, updates: Dict[str, Any]) -> bool:
         updates["updatedAt"] = datetime.utcnow()
         result = await (await self.collection).update_one(
@@ -84,8 +160,25 @@ class ChatRepository:
         )
         return result.modified_count > 0
 
+    async def record_message_deferred(self, chat_id: str, message: MessageModel):
+        """record_message through the write-behind buffer, or directly while the buffer is full"""
+        update = chat_message_update(message)
+        if not write_behind.update_chat(chat_id, update["$set"], update["$inc"]):
+            await (await self.collection).update_one({"_id": ObjectId(chat_id)}, update)
+
+    async def set_summary(self, chat_id: str, summary: str, summarized_until: datetime, previous_until: Optional[datetime]) -> bool:
+        """Store a new summary unless another pass already moved summarizedUntil"""
+        result = await (await self.collection).update_one(
+            {"_id": ObjectId(chat_id), "summarizedUntil": previous_until},
+            {"$set": {"summary": summary, "summarizedUntil": summarized_until}}
+        )
+        return result.modified_count > 0
+
     async def delete(self, chat_id: str) -> bool:
         result = await (await self.collection).delete_one({"_id": ObjectId(chat_id)})
+        chat_history_cache.invalidate(chat_id)
+        # The agent's checkpoints for the chat (thread_id = chatId) would otherwise stay until their TTL
+        await MongoCheckpointSaver(self._db).adelete_thread(chat_id)
         return result.deleted_count > 0
 
 class MessageRepository:
@@ -103,11 +196,37 @@ class MessageRepository:
             self._collection = db.messages
         return self._collection
 
+    async def ensure_indexes(self):
+        await (await self.collection).create_index([("chatId", 1), ("timestamp", 1)])
+        await (await self.collection).create_index([("userId", 1), ("timestamp", -1)])
+
     async def create(self, message: MessageModel) -> str:
-        doc = message.dict(by_alias=True, exclude={"id"})
-        result = await (await self.collection).insert_one(doc)
+        doc = user_id_to_object_id(message.dict(by_alias=True, exclude={"id"}))
+        # Into the ring buffer before the insert so concurrent writes keep their order there
+        chat_history_cache.append(message.chatId, history_entry(message))
+        try:
+            result = await (await self.collection).insert_one(doc)
+        except Exception:
+            chat_history_cache.invalidate(message.chatId)
+            raise
+        semantic_index.schedule_add("messages", str(result.inserted_id), message.userId, message.content, message.timestamp, message.chatId)
         return str(result.inserted_id)
 
+    async def create_deferred(self, message: MessageModel) -> str:
+        """Queue the message on the write-behind buffer; it is visible in the ring buffer immediately.
+        While the buffer is full the message is inserted directly, so the caller waits on the write."""
+        doc = user_id_to_object_id(message.dict(by_alias=True, exclude={"id"}))
+        doc["_id"] = ObjectId()
+        chat_history_cache.append(message.chatId, history_entry(message))
+        if not write_behind.add_message(doc):
+            try:
+                await (await self.collection).insert_one(doc)
+            except Exception:
+                chat_history_cache.invalidate(message.chatId)
+                raise
+        semantic_index.schedule_add("messages", str(doc["_id"]), message.userId, message.content, message.timestamp, message.chatId)
+        return str(doc["_id"])
+
     async def get_by_id(self, message_id: str) -> Optional[MessageModel]:
         doc = await (await self.collection).find_one({"_id": ObjectId(message_id)})
         return MessageModel.from_mongo(doc) if doc else None
@@ -116,6 +235,29 @@ class MessageRepository:
         cursor = (await self.collection).find({"chatId": chat_id})
         return [MessageModel.from_mongo(doc) async for doc in cursor]
 
+    async def get_recent_by_chat(self, chat_id: str, limit: int) -> List[MessageModel]:
+        """Latest `limit` messages of the chat, oldest first"""
+        cursor = (await self.collection).find({"chatId": chat_id}).sort([("timestamp", -1), ("_id", -1)]).limit(limit)
+        docs = await cursor.to_list(length=limit)
+        return [MessageModel.from_mongo(doc) for doc in reversed(docs)]
+
+    async def get_since(self, chat_id: str, after: Optional[datetime], limit: int) -> List[MessageModel]:
+        """Oldest first messages newer than `after` (all messages when None)"""
+        query = {"chatId": chat_id}
+        if after is not None:
+            query["timestamp"] = {"$gt": after}
+        cursor = (await self.collection).find(query).sort([("timestamp", 1), ("_id", 1)]).limit(limit)
+        return [MessageModel.from_mongo(doc) async for doc in cursor]
+
+    async def get_history(self, chat_id: str) -> List[Dict[str, Any]]:
+        """Recent {sender, content} entries for the prompt, from the ring buffer when cached"""
+        history = chat_history_cache.get(chat_id)
+        if history is None:
+            messages = await self.get_recent_by_chat(chat_id, chat_history_cache.max_messages)
+            history = [history_entry(message) for message in messages]
+            chat_history_cache.load(chat_id, history)
+        return history
+
     async def delete(self, message_id: str) -> bool:
         result = await (await self.collection).delete_one({"_id": ObjectId(message_id)})
         return result.deleted_count > 0 
\ No newline at end of file
@@ -0,0 +1,90 @@
+from typing import Optional, List, Dict, Any
+from datetime import datetime
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+from database.mongo_client import get_database
+
+CONTENT_TYPES = ("youtube", "spotify", "articles")
+
+
+class ContentCatalogRepository:
+    """Catalog of recommendable YouTube videos, Spotify playlists and articles.
+
+    One document per item, _id "<type>:<externalId>", holding the item exactly
+    as the search tools return it (`data`) plus the tags it was found under.
+    Re-fetching an item refreshes its data and adds to its tags.
+    """
+
+    def __init__(self, db=None):
+        self._db = db
+        self._collection = None
+
+    @property
+    async def collection(self):
+        if self._collection is None:
+            if self._db is None:
+                db = await get_database()
+            else:
+                db = self._db
+            self._collection = db.content_catalog
+        return self._collection
+
+    async def ensure_indexes(self):
+        collection = await self.collection
+        await collection.create_index([("type", 1), ("tags", 1)])
+        await collection.create_index([("refreshedAt", -1)])
+
+    async def upsert_items(self, items: List[Dict[str, Any]]) -> int:
+        """Items are {"type", "externalId", "title", "text", "popularity", "data", "tags"}"""
+        if not items:
+            return 0
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {"_id": f"{item['type']}:{item['externalId']}"},
+                {
+                    "$set": {
+                        "type": item["type"],
+                        "externalId": item["externalId"],
+                        "title": item["title"],
+                        "text": item["text"],
+                        "popularity": item.get("popularity", 0),
+                        "data": item["data"],
+                        "refreshedAt": now,
+                    },
+                    "$addToSet": {"tags": {"$each": item["tags"]}},
+                    "$setOnInsert": {"createdAt": now},
+                },
+                upsert=True,
+            )
+            for item in items
+        ]
+        result = await (await self.collection).bulk_write(operations, ordered=False)
+        return result.upserted_count + result.modified_count
+
+    async def get_all(self, since: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        query = {"refreshedAt": {"$gt": since}} if since else {}
+        return await (await self.collection).find(query).to_list(length=None)
+
+    async def delete_older_than(self, cutoff: datetime) -> List[str]:
+        """Remove items last refreshed before `cutoff`; returns their ids"""
+        collection = await self.collection
+        ids = [doc["_id"] for doc in await collection.find({"refreshedAt": {"$lt": cutoff}}, {"_id": 1}).to_list(length=None)]
+        if ids:
+            await collection.delete_many({"_id": {"$in": ids}, "refreshedAt": {"$lt": cutoff}})
+        return ids
+
+    async def claim_refresh(self, stale_before: datetime) -> bool:
+        """True for the one caller that gets to run the refresh when the last one started before stale_before"""
+        db = self._db if self._db is not None else await get_database()
+        now = datetime.utcnow()
+        result = await db.content_catalog_runs.update_one(
+            {"_id": "refresh", "startedAt": {"$lt": stale_before}}, {"$set": {"startedAt": now}}
+        )
+        if result.modified_count:
+            return True
+        try:
+            await db.content_catalog_runs.insert_one({"_id": "refresh", "startedAt": now})
+            return True
+        except DuplicateKeyError:
+            return False
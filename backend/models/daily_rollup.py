@@ -0,0 +1,227 @@
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional
+from bson import ObjectId
+from pymongo import ReplaceOne
+from database.mongo_client import get_database
+
+SEVERITY_SCORES = {"low": 1, "medium": 2, "high": 3}
+BACKFILL_BATCH_SIZE = 500
+
+
+def day_start(value: datetime) -> datetime:
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def bucket_key(name: str) -> str:
+    """Mongo field names can't contain '.' or start with '$'"""
+    key = (name or "unknown").replace(".", "_")
+    return "_" + key[1:] if key.startswith("$") else key
+
+
+class _DailyRollupRepository(ABC):
+    """Per user, per UTC day counters maintained next to a raw analyses collection.
+
+    Each document is {userId, day, count, buckets: {key: {name, count, <sums>}}}.
+    Writes apply $inc deltas so trend reads only touch one small document per day.
+    Subclasses define which field of the analysis is bucketed and what is summed.
+    """
+    collection_name: str
+    source_collection_name: str
+    bucket_field: str
+
+    def __init__(self, db=None):
+        self._db = db
+        self._collection = None
+
+    @property
+    async def collection(self):
+        if self._collection is None:
+            if self._db is None:
+                db = await get_database()
+            else:
+                db = self._db
+            self._collection = db[self.collection_name]
+        return self._collection
+
+    async def ensure_indexes(self):
+        await (await self.collection).create_index([("userId", 1), ("day", 1)], unique=True)
+
+    @abstractmethod
+    def _bucket_name(self, doc: Dict[str, Any]) -> str:
+        ...
+
+    @abstractmethod
+    def _sums(self, doc: Dict[str, Any]) -> Dict[str, float]:
+        ...
+
+    @abstractmethod
+    def _group_sums(self) -> Dict[str, Any]:
+        """$group accumulators producing the same sums as _sums() for the backfill"""
+
+    @abstractmethod
+    def _trend_row(self, name: str, bucket: Dict[str, Any]) -> Dict[str, Any]:
+        ...
+
+    async def record(self, doc: Dict[str, Any], sign: int = 1):
+        """Apply one analysis document (sign=-1 removes it again)"""
+        name = self._bucket_name(doc)
+        prefix = f"buckets.{bucket_key(name)}"
+        increments = {"count": sign, f"{prefix}.count": sign}
+        for field, value in self._sums(doc).items():
+            increments[f"{prefix}.{field}"] = sign * value
+        await (await self.collection).update_one(
+            {"userId": ObjectId(doc["userId"]), "day": day_start(doc["createdAt"])},
+            {
+                "$inc": increments,
+                "$set": {f"{prefix}.name": name, "updatedAt": datetime.utcnow()},
+            },
+            upsert=True,
+        )
+
+    async def get_trends(self, user_id: str, days: int = 30) -> List[Dict[str, Any]]:
+        """Per bucket totals since the start of the UTC day `days` ago.
+
+        Rollups are whole days, so unlike the old rolling `now - days` window
+        this includes all of that first day (up to one extra day of analyses).
+        """
+        start = day_start(datetime.utcnow() - timedelta(days=days))
+        cursor = (await self.collection).find(
+            {"userId": ObjectId(user_id), "day": {"$gte": start}},
+            {"buckets": 1},
+        )
+        totals: Dict[str, Dict[str, Any]] = {}
+        async for rollup in cursor:
+            for bucket in rollup.get("buckets", {}).values():
+                if bucket.get("count", 0) <= 0:
+                    continue
+                total = totals.setdefault(bucket["name"], {})
+                for field, value in bucket.items():
+                    if field != "name":
+                        total[field] = total.get(field, 0) + value
+        rows = [self._trend_row(name, bucket) for name, bucket in totals.items()]
+        return sorted(rows, key=lambda row: row["count"], reverse=True)
+
+    async def rebuild(self, user_id: Optional[str] = None) -> int:
+        """Recompute rollups from the raw analyses; returns the number of day documents written.
+
+        Replaces whole day documents, then deletes the days in scope that no
+        longer have analyses, so run it while writes are quiet.
+        """
+        db = self._db if self._db is not None else await get_database()
+        match = {"userId": ObjectId(user_id)} if user_id else {}
+        started = datetime.utcnow()
+        pipeline = [
+            {"$match": match},
+            {"$group": {
+                "_id": {
+                    "userId": "$userId",
+                    "day": {"$dateFromParts": {
+                        "year": {"$year": "$createdAt"},
+                        "month": {"$month": "$createdAt"},
+                        "day": {"$dayOfMonth": "$createdAt"},
+                    }},
+                    "name": f"${self.bucket_field}",
+                },
+                "count": {"$sum": 1},
+                **self._group_sums(),
+            }},
+            {"$group": {
+                "_id": {"userId": "$_id.userId", "day": "$_id.day"},
+                "count": {"$sum": "$count"},
+                "buckets": {"$push": "$$ROOT"},
+            }},
+        ]
+        collection = await self.collection
+        written = 0
+        batch = []
+        async for group in db[self.source_collection_name].aggregate(pipeline, allowDiskUse=True):
+            buckets = {}
+            for bucket in group["buckets"]:
+                name = bucket.pop("_id")["name"] or "unknown"
+                buckets[bucket_key(name)] = {"name": name, **bucket}
+            key = {"userId": group["_id"]["userId"], "day": group["_id"]["day"]}
+            batch.append(ReplaceOne(
+                key,
+                {**key, "count": group["count"], "buckets": buckets, "updatedAt": datetime.utcnow()},
+                upsert=True,
+            ))
+            if len(batch) >= BACKFILL_BATCH_SIZE:
+                await collection.bulk_write(batch, ordered=False)
+                written += len(batch)
+                batch = []
+        if batch:
+            await collection.bulk_write(batch, ordered=False)
+            written += len(batch)
+        # Days the rebuild didn't write (and no write touched since it started) have no analyses left
+        removed = await collection.delete_many({**match, "updatedAt": {"$lt": started}})
+        if removed.deleted_count:
+            print(f"{self.collection_name}: removed {removed.deleted_count} day documents without analyses")
+        return written
+
+
+class MoodDailyRollupRepository(_DailyRollupRepository):
+    collection_name = "mood_daily_rollups"
+    source_collection_name = "mood_analyses"
+    bucket_field = "analysis.primaryMood"
+
+    def _bucket_name(self, doc: Dict[str, Any]) -> str:
+        return doc["analysis"]["primaryMood"]
+
+    def _sums(self, doc: Dict[str, Any]) -> Dict[str, float]:
+        return {
+            "confidenceSum": doc["analysis"]["confidence"],
+            "intensitySum": doc["analysis"]["intensity"],
+        }
+
+    def _group_sums(self) -> Dict[str, Any]:
+        return {
+            "confidenceSum": {"$sum": "$analysis.confidence"},
+            "intensitySum": {"$sum": "$analysis.intensity"},
+        }
+
+    def _trend_row(self, name: str, bucket: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "_id": name,
+            "count": bucket["count"],
+            "avgConfidence": bucket["confidenceSum"] / bucket["count"],
+            "avgIntensity": bucket["intensitySum"] / bucket["count"],
+        }
+
+
+class SleepDailyRollupRepository(_DailyRollupRepository):
+    collection_name = "sleep_daily_rollups"
+    source_collection_name = "sleep_analyses"
+    bucket_field = "sleepAssessment.issue"
+
+    def _bucket_name(self, doc: Dict[str, Any]) -> str:
+        return doc["sleepAssessment"]["issue"]
+
+    def _sums(self, doc: Dict[str, Any]) -> Dict[str, float]:
+        assessment = doc["sleepAssessment"]
+        return {
+            "confidenceSum": assessment["confidence"],
+            "severitySum": SEVERITY_SCORES.get(assessment["severity"], 0),
+        }
+
+    def _group_sums(self) -> Dict[str, Any]:
+        return {
+            "confidenceSum": {"$sum": "$sleepAssessment.confidence"},
+            "severitySum": {"$sum": {
+                "$switch": {
+                    "branches": [
+                        {"case": {"$eq": ["$sleepAssessment.severity", severity]}, "then": score}
+                        for severity, score in SEVERITY_SCORES.items()
+                    ],
+                    "default": 0
+                }
+            }},
+        }
+
+    def _trend_row(self, name: str, bucket: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "_id": name,
+            "count": bucket["count"],
+            "avgConfidence": bucket["confidenceSum"] / bucket["count"],
+            "avgSeverity": bucket["severitySum"] / bucket["count"],
+        }
@@ -0,0 +1,90 @@
+import typing
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple, Type, TypeVar
+from pydantic import BaseModel
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+_SCALAR, _MODEL, _MODEL_LIST = 0, 1, 2
+_MISSING = object()
+_object_setattr = object.__setattr__
+
+
+def _nested_model(annotation) -> Tuple[int, Any]:
+    """Classify a field annotation as a nested model, a list of models or anything else"""
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union:
+        # Optional[Model] / Optional[List[Model]]
+        for arg in typing.get_args(annotation):
+            if arg is not type(None):
+                kind, model = _nested_model(arg)
+                if kind != _SCALAR:
+                    return kind, model
+        return _SCALAR, None
+    if origin in (list, typing.List):
+        args = typing.get_args(annotation)
+        if args and isinstance(args[0], type) and issubclass(args[0], BaseModel):
+            return _MODEL_LIST, args[0]
+        return _SCALAR, None
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return _MODEL, annotation
+    return _SCALAR, None
+
+
+def _default_getter(field) -> Optional[Callable[[], Any]]:
+    if field.default_factory is not None:
+        return field.default_factory
+    if field.is_required():
+        return None
+    default = field.default
+    # Mutable defaults are copied by pydantic on instantiation; do the same here
+    if isinstance(default, (list, dict, set)):
+        return lambda: default.copy()
+    return lambda: default
+
+
+@lru_cache(maxsize=None)
+def _hydration_plan(cls: Type[BaseModel]) -> Optional[Tuple[Tuple[str, int, Any, Any], ...]]:
+    """Per-class field plan, or None when the model needs the full model_construct() path"""
+    if cls.__private_attributes__ or cls.model_config.get("extra") == "allow":
+        return None
+    plan = []
+    for name, field in cls.model_fields.items():
+        kind, model = _nested_model(field.annotation)
+        plan.append((name, kind, model, _default_getter(field)))
+    return tuple(plan)
+
+
+def construct_model(cls: Type[ModelT], data: Dict[str, Any]) -> ModelT:
+    """Build `cls` from trusted data without running validation.
+
+    Only use this for documents this service wrote itself through the model's
+    to_mongo(); they were validated on the way in. Nested models are built
+    recursively so attribute access keeps working, unknown keys are dropped and
+    missing fields fall back to their defaults, as with model_construct().
+    """
+    plan = _hydration_plan(cls)
+    if plan is None:
+        return cls.model_construct(**data)
+
+    values = {}
+    fields_set = set()
+    for name, kind, model, default in plan:
+        value = data.get(name, _MISSING)
+        if value is _MISSING:
+            if default is not None:
+                values[name] = default()
+            continue
+        fields_set.add(name)
+        if kind == _MODEL and type(value) is dict:
+            value = construct_model(model, value)
+        elif kind == _MODEL_LIST and type(value) is list:
+            value = [construct_model(model, item) if type(item) is dict else item for item in value]
+        values[name] = value
+
+    instance = cls.__new__(cls)
+    _object_setattr(instance, "__dict__", values)
+    _object_setattr(instance, "__pydantic_fields_set__", fields_set)
+    _object_setattr(instance, "__pydantic_extra__", None)
+    _object_setattr(instance, "__pydantic_private__", None)
+    return instance
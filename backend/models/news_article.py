@@ -0,0 +1,103 @@
+from typing import List, Dict, Any
+from datetime import datetime
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+from database.mongo_client import get_database
+
+
+class NewsArticleRepository:
+    """Wellness news articles collected by the ingestion job and by live searches.
+
+    One document per article, _id its canonical URL, with the title word
+    shingles used to spot the same story from another outlet. Searched with a
+    text index on title and snippet, ranked by text score decayed by age.
+    Articles expire NEWS_RETENTION_DAYS after publication.
+    """
+
+    def __init__(self, db=None):
+        self._db = db
+        self._collection = None
+
+    @property
+    async def collection(self):
+        if self._collection is None:
+            if self._db is None:
+                db = await get_database()
+            else:
+                db = self._db
+            self._collection = db.news_articles
+        return self._collection
+
+    async def ensure_indexes(self, retention_days: int = 30):
+        collection = await self.collection
+        await collection.create_index(
+            [("title", "text"), ("snippet", "text")],
+            name="title_snippet_text",
+            weights={"title": 3, "snippet": 1},
+            default_language="english",
+        )
+        await collection.create_index(
+            [("publishedAt", -1)], name="publishedAt_ttl", expireAfterSeconds=retention_days * 86400
+        )
+
+    async def upsert_articles(self, articles: List[Dict[str, Any]]) -> int:
+        """Insert new articles; known ones only gain topics. Returns the number inserted"""
+        if not articles:
+            return 0
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {"_id": article["_id"]},
+                {
+                    "$setOnInsert": {
+                        **{key: value for key, value in article.items() if key not in ("_id", "topics")},
+                        "fetchedAt": now,
+                    },
+                    "$addToSet": {"topics": {"$each": article.get("topics", [])}},
+                },
+                upsert=True,
+            )
+            for article in articles
+        ]
+        result = await (await self.collection).bulk_write(operations, ordered=False)
+        return result.upserted_count
+
+    async def get_shingles(self, since: datetime) -> List[Dict[str, Any]]:
+        """{_id, shingles} of articles published since `since`, for near-duplicate checks"""
+        cursor = (await self.collection).find({"publishedAt": {"$gte": since}}, {"shingles": 1})
+        return await cursor.to_list(length=None)
+
+    async def search(self, query: str, limit: int, half_life_days: float, min_text_score: float = 0.0) -> List[Dict[str, Any]]:
+        """Articles matching `query`, by text score halved every `half_life_days` of age"""
+        now = datetime.utcnow()
+        pipeline = [
+            {"$match": {"$text": {"$search": query}}},
+            {"$addFields": {"textScore": {"$meta": "textScore"}}},
+            {"$match": {"textScore": {"$gte": min_text_score}}},
+            {"$addFields": {"score": {"$multiply": [
+                "$textScore",
+                {"$pow": [0.5, {"$divide": [
+                    {"$max": [0, {"$subtract": [now, "$publishedAt"]}]},
+                    half_life_days * 86400000,
+                ]}]},
+            ]}}},
+            {"$sort": {"score": -1}},
+            {"$limit": limit},
+            {"$project": {"shingles": 0}},
+        ]
+        return await (await self.collection).aggregate(pipeline).to_list(length=limit)
+
+    async def claim_ingestion(self, stale_before: datetime) -> bool:
+        """True for the one caller that gets to run the ingestion when the last one started before stale_before"""
+        db = self._db if self._db is not None else await get_database()
+        now = datetime.utcnow()
+        result = await db.news_ingestion_runs.update_one(
+            {"_id": "ingestion", "startedAt": {"$lt": stale_before}}, {"$set": {"startedAt": now}}
+        )
+        if result.modified_count:
+            return True
+        try:
+            await db.news_ingestion_runs.insert_one({"_id": "ingestion", "startedAt": now})
+            return True
+        except DuplicateKeyError:
+            return False
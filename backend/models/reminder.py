@@ -2,7 +2,9 @@ from typing import Optional, List, Dict, Any
 from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument
 from database.mongo_client import get_database
+from database.ids import to_object_id, user_id_to_object_id, owner_filter, without_identity
 
 class Reminder(BaseModel):
     id: Optional[str] = Field(default=None, alias="_id")
@@ -57,17 +59,31 @@ class ReminderRepository:
             self._collection = db.reminders
         return self._collection
 
+    async def ensure_indexes(self):
+        await (await self.collection).create_index([("userId", 1), ("createdAt", -1)])
+
     async def create(self, reminder: dict) -> str:
-        doc = reminder
+        doc = user_id_to_object_id(reminder)
         result = await (await self.collection).insert_one(doc)
         return str(result.inserted_id)
 
+    async def insert(self, reminder: dict) -> Reminder:
+        """Insert and return the stored reminder without reading it back"""
+        doc = user_id_to_object_id(reminder)
+        await (await self.collection).insert_one(doc)
+        return Reminder.from_mongo(doc)
+
     async def get_by_id(self, reminder_id: str) -> Optional[Reminder]:
         doc = await (await self.collection).find_one({"_id": ObjectId(reminder_id)})
         return Reminder.from_mongo(doc) if doc else None
 
+    async def get_owned(self, reminder_id: str, user_id: str) -> Optional[Reminder]:
+        query = owner_filter(reminder_id, user_id)
+        doc = await (await self.collection).find_one(query) if query else None
+        return Reminder.from_mongo(doc) if doc else None
+
     async def get_by_user_id(self, user_id: str, limit: int = 50) -> List[Reminder]:
-        cursor = (await self.collection).find({"userId": user_id}).sort("createdAt", -1).limit(limit)
+        cursor = (await self.collection).find({"userId": to_object_id(user_id)}).sort("createdAt", -1).limit(limit)
         docs = await cursor.to_list(length=limit)
         return [Reminder.from_mongo(doc) for doc in docs]
 
@@ -80,4 +96,27 @@ class ReminderRepository:
 
     async def delete(self, reminder_id: str) -> bool:
         result = await (await self.collection).delete_one({"_id": ObjectId(reminder_id)})
-        return result.deleted_count > 0 
\ No newline at end of file
+        return result.deleted_count > 0 
+
+    async def update_owned(self, reminder_id: str, user_id: str, updates: Dict[str, Any]) -> Optional[Reminder]:
+        """Apply `updates` if the reminder belongs to the user; returns the updated reminder or None"""
+        query = owner_filter(reminder_id, user_id)
+        if query is None:
+            return None
+        updates = without_identity(updates)
+        if not updates:
+            # An empty $set is rejected by MongoDB
+            return await self.get_owned(reminder_id, user_id)
+        doc = await (await self.collection).find_one_and_update(
+            query,
+            {"$set": updates},
+            return_document=ReturnDocument.AFTER
+        )
+        return Reminder.from_mongo(doc) if doc else None
+
+    async def delete_owned(self, reminder_id: str, user_id: str) -> bool:
+        query = owner_filter(reminder_id, user_id)
+        if query is None:
+            return False
+        result = await (await self.collection).delete_one(query)
+        return result.deleted_count > 0
@@ -0,0 +1,142 @@
+import asyncio
+import re
+from typing import Optional, List, Dict, Any, Tuple
+from pydantic import BaseModel
+from datetime import datetime
+from bson import ObjectId
+from database.mongo_client import get_database
+from database.ids import to_object_id
+
+SNIPPET_CHARS = 160
+SOURCES = ("messages", "journal")
+
+
+class SearchHit(BaseModel):
+    id: str
+    source: str
+    snippet: str
+    # [start, end) offsets of matched words within snippet
+    highlights: List[Tuple[int, int]] = []
+    score: float
+    createdAt: datetime
+    chatId: Optional[str] = None
+
+
+def query_terms(query: str) -> List[str]:
+    """Words of a $text query worth highlighting (negated terms excluded)"""
+    negated = {word.lower() for word in re.findall(r"-(\w+)", query)}
+    return [word.lower() for word in re.findall(r"\w+", query) if word.lower() not in negated and len(word) > 1]
+
+
+def _term_prefix(term: str) -> str:
+    # The text index stems words; a shortened prefix catches the common inflections
+    return term if len(term) <= 4 else term[:max(4, len(term) - 3)]
+
+
+def highlight(text: str, terms: List[str], width: int = SNIPPET_CHARS) -> Tuple[str, List[Tuple[int, int]]]:
+    """Snippet of `text` around the first match and the spans of every matched word in it"""
+    prefixes = [_term_prefix(term) for term in terms]
+    matches = [
+        match.span() for match in re.finditer(r"\w+", text)
+        if any(match.group().lower().startswith(prefix) for prefix in prefixes)
+    ]
+    start = 0
+    if matches and len(text) > width:
+        start = max(0, min(matches[0][0] - width // 4, len(text) - width))
+    end = min(len(text), start + width)
+    snippet = text[start:end]
+    spans = [(s - start, e - start) for s, e in matches if s >= start and e <= end]
+    if start > 0:
+        snippet = "…" + snippet
+        spans = [(s + 1, e + 1) for s, e in spans]
+    if end < len(text):
+        snippet += "…"
+    return snippet, spans
+
+
+class SearchRepository:
+    """Full-text search over a user's chat messages and journal (mood analysis) inputs.
+
+    Backed by compound text indexes with userId as the equality prefix, so a
+    query only touches that user's index entries. Results are ordered by
+    (score, _id) descending across both collections and paged with a keyset
+    cursor on that pair.
+    """
+
+    # source -> (collection, text field, date field)
+    SOURCE_FIELDS = {
+        "messages": ("messages", "content", "timestamp"),
+        "journal": ("mood_analyses", "input", "createdAt"),
+    }
+
+    def __init__(self, db=None):
+        self._db = db
+
+    async def _get_db(self):
+        return self._db if self._db is not None else await get_database()
+
+    async def ensure_indexes(self):
+        db = await self._get_db()
+        for collection, field, _ in self.SOURCE_FIELDS.values():
+            await db[collection].create_index(
+                [("userId", 1), (field, "text")], name=f"userId_{field}_text", default_language="english"
+            )
+
+    async def _search_source(
+        self, db, source: str, user_id: str, query: str, limit: int, after: Optional[Tuple[float, ObjectId]]
+    ) -> List[Dict[str, Any]]:
+        collection, field, date_field = self.SOURCE_FIELDS[source]
+        pipeline: List[Dict[str, Any]] = [
+            {"$match": {"userId": to_object_id(user_id), "$text": {"$search": query}}},
+            {"$project": {field: 1, date_field: 1, "chatId": 1, "score": {"$meta": "textScore"}}},
+        ]
+        if after:
+            score, last_id = after
+            pipeline.append({"$match": {"$or": [
+                {"score": {"$lt": score}},
+                {"score": score, "_id": {"$lt": last_id}},
+            ]}})
+        pipeline += [{"$sort": {"score": -1, "_id": -1}}, {"$limit": limit}]
+        docs = await db[collection].aggregate(pipeline).to_list(length=limit)
+        return [{
+            "_id": doc["_id"],
+            "source": source,
+            "text": doc.get(field) or "",
+            "score": doc["score"],
+            "createdAt": doc.get(date_field),
+            "chatId": doc.get("chatId"),
+        } for doc in docs]
+
+    async def search(
+        self,
+        user_id: str,
+        query: str,
+        sources: List[str] = SOURCES,
+        limit: int = 20,
+        after: Optional[Tuple[float, str]] = None,
+    ) -> Tuple[List[SearchHit], Optional[Tuple[float, str]]]:
+        """One page of hits and the cursor for the next page (None on the last page)"""
+        db = await self._get_db()
+        keyset = (after[0], ObjectId(after[1])) if after else None
+        # Each source returns its own top `limit` past the cursor; merged, the first `limit` are the page
+        results = await asyncio.gather(*(
+            self._search_source(db, source, user_id, query, limit + 1, keyset) for source in sources
+        ))
+        rows: List[Dict[str, Any]] = [row for result in results for row in result]
+        rows.sort(key=lambda row: (row["score"], row["_id"]), reverse=True)
+        page = rows[:limit]
+        terms = query_terms(query)
+        hits = []
+        for row in page:
+            snippet, spans = highlight(row["text"], terms)
+            hits.append(SearchHit(
+                id=str(row["_id"]),
+                source=row["source"],
+                snippet=snippet,
+                highlights=spans,
+                score=row["score"],
+                createdAt=row["createdAt"],
+                chatId=row["chatId"],
+            ))
+        next_cursor = (page[-1]["score"], str(page[-1]["_id"])) if len(rows) > limit else None
+        return hits, next_cursor
@@ -2,7 +2,9 @@ from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel, Field
 from bson import ObjectId
+from pymongo import ReturnDocument
 from database.mongo_client import get_database
+from models.daily_rollup import SleepDailyRollupRepository
 
 
 class SleepAssessment(BaseModel):
@@ -111,22 +113,49 @@ class SleepAnalysis(BaseModel):
             data_copy["userId"] = str(data_copy["userId"])
         return cls(**data_copy)
 
-    def to_simple_format(self) -> Dict[str, Any]:
-        return {
-            "id": self.id,
-            "userId": self.userId,
-            "issue": self.sleepAssessment.issue,
-            "severity": self.sleepAssessment.severity,
-            "summary": self.sleepAssessment.summary,
-            "recommendations": self.recommendations.immediate[:3],
-            "createdAt": self.createdAt.isoformat()
-        }
+
+# Fields needed to render a history/list row; keeps the embedded playlists out of the read
+SUMMARY_PROJECTION = {
+    "userId": 1,
+    "sleepAssessment.issue": 1,
+    "sleepAssessment.severity": 1,
+    "sleepAssessment.summary": 1,
+    "disorderCheck.riskLevel": 1,
+    "createdAt": 1,
+}
+
+
+class SleepAnalysisSummary(BaseModel):
+    id: str
+    userId: str
+    issue: str
+    severity: str = "low"
+    summary: str = ""
+    riskLevel: str = "low"
+    createdAt: datetime
+
+    @classmethod
+    def from_mongo(cls, data: Dict[str, Any]) -> "SleepAnalysisSummary":
+        """Create instance from a document read with SUMMARY_PROJECTION"""
+        if data is None:
+            return None
+        assessment = data.get("sleepAssessment", {})
+        return cls(
+            id=str(data["_id"]),
+            userId=str(data["userId"]),
+            issue=assessment.get("issue", "unknown"),
+            severity=assessment.get("severity", "low"),
+            summary=assessment.get("summary", ""),
+            riskLevel=data.get("disorderCheck", {}).get("riskLevel", "low"),
+            createdAt=data["createdAt"],
+        )
 
 
 class SleepAnalysisRepository:
     def __init__(self, db=None):
         self._db = db
         self._collection = None
+        self.rollups = SleepDailyRollupRepository(db)
 
     @property
     async def collection(self):
@@ -141,28 +170,64 @@ class SleepAnalysisRepository:
     async def create(self, sleep_analysis: SleepAnalysis) -> str:
         doc = sleep_analysis.to_mongo()
         result = await (await self.collection).insert_one(doc)
+        try:
+            await self.rollups.record(doc)
+        except Exception as e:
+            # The rollup can be rebuilt from the raw analyses with scripts.backfill_rollups
+            print(f"Failed to update daily rollup for {result.inserted_id}: {e}")
         return str(result.inserted_id)
 
     async def get_by_id(self, analysis_id: str) -> Optional[SleepAnalysis]:
         doc = await (await self.collection).find_one({"_id": ObjectId(analysis_id)})
         return SleepAnalysis.from_mongo(doc) if doc else None
 
+    async def get_by_id_for_user(self, analysis_id: str, user_id: str) -> Optional[SleepAnalysis]:
+        doc = await (await self.collection).find_one({"_id": ObjectId(analysis_id), "userId": ObjectId(user_id)})
+        return SleepAnalysis.from_mongo(doc) if doc else None
+
+    async def find_by_user_id(self, user_id: str, projection: Optional[Dict[str, Any]] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """Raw documents for a user, newest first, restricted to `projection` when given"""
+        cursor = (await self.collection).find({"userId": ObjectId(user_id)}, projection).sort("createdAt", -1).limit(limit)
+        return await cursor.to_list(length=limit)
+
     async def get_by_user_id(self, user_id: str, limit: int = 10) -> List[SleepAnalysis]:
-        cursor = (await self.collection).find({"userId": ObjectId(user_id)}).sort("createdAt", -1).limit(limit)
-        docs = await cursor.to_list(length=limit)
+        docs = await self.find_by_user_id(user_id, limit=limit)
         return [SleepAnalysis.from_mongo(doc) for doc in docs]
 
+    async def get_summaries_by_user_id(self, user_id: str, limit: int = 10) -> List[SleepAnalysisSummary]:
+        docs = await self.find_by_user_id(user_id, projection=SUMMARY_PROJECTION, limit=limit)
+        return [SleepAnalysisSummary.from_mongo(doc) for doc in docs]
+
     async def update(self, analysis_id: str, updates: Dict[str, Any]) -> bool:
         updates["updatedAt"] = datetime.utcnow()
-        result = await (await self.collection).update_one(
+        collection = await self.collection
+        before = await collection.find_one_and_update(
             {"_id": ObjectId(analysis_id)},
-            {"$set": updates}
+            {"$set": updates},
+            return_document=ReturnDocument.BEFORE
         )
-        return result.modified_count > 0
+        if before is None:
+            return False
+        try:
+            # Move the analysis out of its old bucket (and day) and into the new one
+            after = await collection.find_one({"_id": before["_id"]})
+            await self.rollups.record(before, sign=-1)
+            if after is not None:
+                await self.rollups.record(after)
+        except Exception as e:
+            print(f"Failed to update daily rollup for {analysis_id}: {e}")
+        return True
 
     async def delete(self, analysis_id: str) -> bool:
-        result = await (await self.collection).delete_one({"_id": ObjectId(analysis_id)})
-        return result.deleted_count > 0
+        doc = await (await self.collection).find_one_and_delete({"_id": ObjectId(analysis_id)})
+        if doc is None:
+            return False
+        try:
+            await self.rollups.record(doc, sign=-1)
+        except Exception as e:
+            # The rollup can be rebuilt from the raw analyses with scripts.backfill_rollups
+            print(f"Failed to update daily rollup for {analysis_id}: {e}")
+        return True
 
     async def get_recent_analyses(self, limit: int = 20) -> List[SleepAnalysis]:
         cursor = (await self.collection).find().sort("createdAt", -1).limit(limit)
@@ -175,27 +240,7 @@ class SleepAnalysisRepository:
         return [SleepAnalysis.from_mongo(doc) for doc in docs]
 
     async def get_user_sleep_trends(self, user_id: str, days: int = 30) -> List[Dict[str, Any]]:
-        pipeline = [
-            {"$match": {"userId": ObjectId(user_id)}},
-            {"$match": {"createdAt": {"$gte": datetime.utcnow() - timedelta(days=days)}}},
-            {"$group": {
-                "_id": "$sleepAssessment.issue",
-                "count": {"$sum": 1},
-                "avgConfidence": {"$avg": "$sleepAssessment.confidence"},
-                "avgSeverity": {"$avg": {
-                    "$switch": {
-                        "branches": [
-                            {"case": {"$eq": ["$sleepAssessment.severity", "low"]}, "then": 1},
-                            {"case": {"$eq": ["$sleepAssessment.severity", "medium"]}, "then": 2},
-                            {"case": {"$eq": ["$sleepAssessment.severity", "high"]}, "then": 3}
-                        ],
-                        "default": 0
-                    }
-                }}
-            }},
-            {"$sort": {"count": -1}}
-        ]
-        return await (await self.collection).aggregate(pipeline).to_list(None)
+        return await self.rollups.get_trends(user_id, days)
 
     async def get_analyses_by_date_range(self, user_id: str, start_date: datetime, end_date: datetime) -> List[SleepAnalysis]:
         cursor = (await self.collection).find({
@@ -2,7 +2,65 @@ from typing import Optional, List, Dict, Any
 from pydantic import BaseModel, Field
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument
 from database.mongo_client import get_database
+from database.ids import to_object_id, user_id_to_object_id, owner_filter, without_identity
+from utils.sleep_analytics import (
+    sleep_stats_cache,
+    parse_clock_minutes,
+    parse_duration_minutes,
+    parse_record_date,
+    MINUTES_PER_DAY,
+)
+
+STATS_PROJECTION = {
+    "_id": 0, "date": 1, "bedtime": 1, "wakeTime": 1, "duration": 1, "quality": 1, "factors": 1,
+    "durationMinutes": 1, "bedtimeMinutes": 1, "wakeMinutes": 1,
+}
+QUALITY_LABELS = {"poor": 1, "fair": 2, "good": 3, "great": 4, "excellent": 5}
+
+
+def parse_quality(value: Any) -> Optional[int]:
+    """1-5 from an int, a numeric string ("2") or a label ("Good")"""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = str(value).strip()
+    if text.lstrip("-").isdigit():
+        return int(text)
+    return QUALITY_LABELS.get(text.lower())
+
+
+def normalize_sleep_fields(record: Dict[str, Any], existing: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Add the typed fields derived from whatever raw fields `record` carries.
+
+    `date` becomes a datetime at midnight UTC, `quality` an int, and
+    durationMinutes / bedtimeMinutes / wakeMinutes are set from the display
+    strings, which are kept as entered. Works on partial updates too: pass the
+    stored record as `existing` so a new bedtime or wake time alone still
+    recomputes durationMinutes.
+    """
+    existing = existing or {}
+    normalized = dict(record)
+    if "date" in record:
+        normalized["date"] = parse_record_date(record["date"]) or record["date"]
+    if "quality" in record:
+        quality = parse_quality(record["quality"])
+        normalized["quality"] = quality if quality is not None else record["quality"]
+    if "bedtime" in record:
+        normalized["bedtimeMinutes"] = parse_clock_minutes(record["bedtime"])
+    if "wakeTime" in record:
+        normalized["wakeMinutes"] = parse_clock_minutes(record["wakeTime"])
+    if "duration" in record or "bedtime" in record or "wakeTime" in record:
+        duration = parse_duration_minutes(record["duration"]) if "duration" in record else None
+        bedtime = normalized.get("bedtimeMinutes", existing.get("bedtimeMinutes"))
+        wake = normalized.get("wakeMinutes", existing.get("wakeMinutes"))
+        if duration is None and bedtime is not None and wake is not None:
+            duration = (wake - bedtime) % MINUTES_PER_DAY
+        if duration is not None or "duration" in record:
+            normalized["durationMinutes"] = duration
+    return normalized
 
 class SleepRecord(BaseModel):
     id: Optional[str] = Field(default=None, alias="_id")
@@ -15,6 +73,9 @@ class SleepRecord(BaseModel):
     factors: List[str] = []
     mood: str = ""
     notes: str = ""
+    durationMinutes: Optional[int] = None
+    bedtimeMinutes: Optional[int] = None
+    wakeMinutes: Optional[int] = None
     createdAt: datetime = Field(default_factory=datetime.utcnow)
     updatedAt: datetime = Field(default_factory=datetime.utcnow)
 
@@ -42,6 +103,8 @@ class SleepRecord(BaseModel):
             del data_copy["_id"]
         if data_copy.get("userId"):
             data_copy["userId"] = str(data_copy["userId"])
+        if isinstance(data_copy.get("date"), datetime):
+            data_copy["date"] = data_copy["date"].strftime("%Y-%m-%d")
         return cls(**data_copy)
 
 class SleepRecordRepository:
@@ -59,28 +122,112 @@ class SleepRecordRepository:
             self._collection = db.sleep_records
         return self._collection
 
+    async def ensure_indexes(self):
+        await (await self.collection).create_index([("userId", 1), ("date", -1)])
+
     async def create(self, record: dict) -> str:
-        doc = record
+        return (await self.insert(record)).id
+
+    async def insert(self, record: dict) -> SleepRecord:
+        """Validate, insert and return the stored record without reading it back.
+
+        Raises pydantic's ValidationError before writing anything when a required field is missing or invalid.
+        """
+        doc = user_id_to_object_id(normalize_sleep_fields(record))
+        doc.setdefault("createdAt", datetime.utcnow())
+        doc.setdefault("updatedAt", doc["createdAt"])
+        validated = SleepRecord.from_mongo(doc)
         result = await (await self.collection).insert_one(doc)
-        return str(result.inserted_id)
+        sleep_stats_cache.invalidate(doc.get("userId"))
+        return validated.model_copy(update={"id": str(result.inserted_id)})
 
     async def get_by_id(self, record_id: str) -> Optional[SleepRecord]:
         doc = await (await self.collection).find_one({"_id": ObjectId(record_id)})
         return SleepRecord.from_mongo(doc) if doc else None
 
+    async def get_owned(self, record_id: str, user_id: str) -> Optional[SleepRecord]:
+        query = owner_filter(record_id, user_id)
+        doc = await (await self.collection).find_one(query) if query else None
+        return SleepRecord.from_mongo(doc) if doc else None
+
     async def get_by_user_id(self, user_id: str, limit: int = 30) -> List[SleepRecord]:
-        cursor = (await self.collection).find({"userId": user_id}).sort("date", -1).limit(limit)
+        cursor = (await self.collection).find({"userId": to_object_id(user_id)}).sort("date", -1).limit(limit)
         docs = await cursor.to_list(length=limit)
         return [SleepRecord.from_mongo(doc) for doc in docs]
 
+    async def get_by_date_range(self, user_id: str, start: datetime, end: datetime) -> List[SleepRecord]:
+        """Records with start <= date < end, oldest first"""
+        cursor = (await self.collection).find(
+            {"userId": to_object_id(user_id), "date": {"$gte": start, "$lt": end}}
+        ).sort("date", 1)
+        return [SleepRecord.from_mongo(doc) async for doc in cursor]
+
+    async def get_averages(self, user_id: str, start: datetime, end: datetime) -> Dict[str, Any]:
+        pipeline = [
+            {"$match": {"userId": to_object_id(user_id), "date": {"$gte": start, "$lt": end}}},
+            {"$group": {
+                "_id": None,
+                "nights": {"$sum": 1},
+                "avgDurationMinutes": {"$avg": "$durationMinutes"},
+                "avgQuality": {"$avg": "$quality"},
+            }},
+            {"$project": {"_id": 0}},
+        ]
+        rows = await (await self.collection).aggregate(pipeline).to_list(length=1)
+        return rows[0] if rows else {"nights": 0, "avgDurationMinutes": None, "avgQuality": None}
+
+    async def get_stats_rows(self, user_id: str) -> List[Dict[str, Any]]:
+        """Every record of the user, only the fields the analytics read, as raw documents"""
+        cursor = (await self.collection).find({"userId": to_object_id(user_id)}, STATS_PROJECTION)
+        return await cursor.to_list(length=None)
+
     async def update(self, record_id: str, updates: Dict[str, Any]) -> bool:
+        updates = normalize_sleep_fields(updates)
         updates["updatedAt"] = datetime.utcnow()
-        result = await (await self.collection).update_one(
+        doc = await (await self.collection).find_one_and_update(
             {"_id": ObjectId(record_id)},
-            {"$set": updates}
+            {"$set": updates},
+            projection={"userId": 1}
         )
-        return result.modified_count > 0
+        if doc:
+            sleep_stats_cache.invalidate(doc.get("userId"))
+        return doc is not None
+
+    async def update_owned(self, record_id: str, user_id: str, updates: Dict[str, Any]) -> Optional[SleepRecord]:
+        """Apply `updates` if the record belongs to the user; returns the updated record or None"""
+        query = owner_filter(record_id, user_id)
+        if query is None:
+            return None
+        updates = without_identity(updates)
+        existing = None
+        if ("bedtime" in updates or "wakeTime" in updates) and "duration" not in updates:
+            existing = await (await self.collection).find_one(query, {"bedtimeMinutes": 1, "wakeMinutes": 1})
+        updates = normalize_sleep_fields(updates, existing)
+        updates["updatedAt"] = datetime.utcnow()
+        doc = await (await self.collection).find_one_and_update(
+            query,
+            {"$set": updates},
+            return_document=ReturnDocument.AFTER
+        )
+        if doc:
+            sleep_stats_cache.invalidate(user_id)
+        return SleepRecord.from_mongo(doc) if doc else None
 
     async def delete(self, record_id: str) -> bool:
-        result = await (await self.collection).delete_one({"_id": ObjectId(record_id)})
-        return result.deleted_count > 0 
\ No newline at end of file
+        doc = await (await self.collection).find_one_and_delete(
+            {"_id": ObjectId(record_id)},
+            projection={"userId": 1}
+        )
+        if doc:
+            sleep_stats_cache.invalidate(doc.get("userId"))
+        return doc is not None
+ 
+
+    async def delete_owned(self, record_id: str, user_id: str) -> bool:
+        query = owner_filter(record_id, user_id)
+        if query is None:
+            return False
+        result = await (await self.collection).delete_one(query)
+        if result.deleted_count:
+            sleep_stats_cache.invalidate(user_id)
+        return result.deleted_count > 0
@@ -4,6 +4,7 @@ from datetime import datetime
 import uuid
 from bson import ObjectId
 from database.mongo_client import get_database
+from models.hydration import construct_model
 
 class UserBase(BaseModel):
     email: EmailStr
@@ -108,6 +109,15 @@ class UserInDB(UserBase):
             del data_copy["_id"]  # Remove the ObjectId field
         return cls(**data_copy)
 
+    @classmethod
+    def from_mongo_trusted(cls, data: Dict[str, Any]) -> "UserInDB":
+        """Hydrate a document written by this service without re-validating it"""
+        if data is None:
+            return None
+        data_copy = data.copy()
+        data_copy["id"] = str(data_copy.pop("_id"))
+        return construct_model(cls, data_copy)
+
 class User(UserBase):
     id: str
     firstName: str
@@ -144,6 +154,15 @@ class User(UserBase):
             del data_copy["_id"]  # Remove the ObjectId field
         return cls(**data_copy)
 
+    @classmethod
+    def from_mongo_trusted(cls, data: Dict[str, Any]) -> "User":
+        """Hydrate a document written by this service without re-validating it"""
+        if data is None:
+            return None
+        data_copy = data.copy()
+        data_copy["id"] = str(data_copy.pop("_id"))
+        return construct_model(cls, data_copy)
+
 class UserRepository:
     def __init__(self, db=None):
         self._db = db
@@ -166,15 +185,15 @@ class UserRepository:
 
     async def get_by_id(self, user_id: str) -> Optional[UserInDB]:
         doc = await (await self.collection).find_one({"_id": ObjectId(user_id)})
-        return UserInDB.from_mongo(doc) if doc else None
+        return UserInDB.from_mongo_trusted(doc) if doc else None
 
     async def get_by_email(self, email: str) -> Optional[UserInDB]:
         doc = await (await self.collection).find_one({"email": email})
-        return UserInDB.from_mongo(doc) if doc else None
+        return UserInDB.from_mongo_trusted(doc) if doc else None
 
     async def get_user_for_response(self, user_id: str) -> Optional[User]:
         doc = await (await self.collection).find_one({"_id": ObjectId(user_id)})
-        return User.from_mongo(doc) if doc else None
+        return User.from_mongo_trusted(doc) if doc else None
 
     async def update(self, user_id: str, updates: Dict[str, Any]) -> bool:
         updates["updatedAt"] = datetime.utcnow()
@@ -203,7 +222,7 @@ class UserRepository:
     async def get_all_users(self, limit: int = 50, skip: int = 0) -> List[User]:
         cursor = (await self.collection).find().skip(skip).limit(limit).sort("createdAt", -1)
         docs = await cursor.to_list(length=limit)
-        return [User.from_mongo(doc) for doc in docs]
+        return [User.from_mongo_trusted(doc) for doc in docs]
 
     async def search_users(self, search_term: str, limit: int = 20) -> List[User]:
         cursor = (await self.collection).find({
@@ -214,19 +233,19 @@ class UserRepository:
             ]
         }).limit(limit).sort("createdAt", -1)
         docs = await cursor.to_list(length=limit)
-        return [User.from_mongo(doc) for doc in docs]
+        return [User.from_mongo_trusted(doc) for doc in docs]
 
     async def get_users_by_date_range(self, start_date: datetime, end_date: datetime) -> List[User]:
         cursor = (await self.collection).find({
             "createdAt": {"$gte": start_date, "$lte": end_date}
         }).sort("createdAt", -1)
         docs = await cursor.to_list(None)
-        return [User.from_mongo(doc) for doc in docs]
+        return [User.from_mongo_trusted(doc) for doc in docs]
 
     async def get_recent_users(self, limit: int = 20) -> List[User]:
         cursor = (await self.collection).find().sort("createdAt", -1).limit(limit)
         docs = await cursor.to_list(length=limit)
-        return [User.from_mongo(doc) for doc in docs]
+        return [User.from_mongo_trusted(doc) for doc in docs]
 
     async def count_users(self) -> int:
         return await (await self.collection).count_documents({})
@@ -240,7 +259,7 @@ class UserRepository:
         
         cursor = (await self.collection).find(query).sort("createdAt", -1)
         docs = await cursor.to_list(None)
-        return [User.from_mongo(doc) for doc in docs]
+        return [User.from_mongo_trusted(doc) for doc in docs]
 
     async def check_email_exists(self, email: str) -> bool:
         doc = await (await self.collection).find_one({"email": email})
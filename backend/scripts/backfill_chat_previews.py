@@ -0,0 +1,67 @@
+"""Set lastMessage, lastMessageAt and messageCount on chats created before they
+were maintained on every message write.
+
+Idempotent: recomputes the fields from `messages`, so it can be re-run. Run it
+while chat traffic is quiet; a message written between the aggregation and the
+update of its chat is left out of that chat's count.
+Run from the backend directory:
+    python -m scripts.backfill_chat_previews [--batch-size N]
+"""
+from dotenv import load_dotenv
+load_dotenv()
+
+import argparse
+import asyncio
+import time
+from bson import ObjectId
+from pymongo import UpdateOne
+from database.mongo_client import init_database, close_database, get_database
+from database.indexes import ensure_indexes
+from models.chat import LAST_MESSAGE_PREVIEW_CHARS
+
+
+async def main(batch_size: int):
+    await init_database()
+    try:
+        db = await get_database()
+        started = time.perf_counter()
+        pipeline = [
+            {"$sort": {"chatId": 1, "timestamp": 1}},
+            {"$group": {
+                "_id": "$chatId",
+                "messageCount": {"$sum": 1},
+                "lastMessage": {"$last": "$content"},
+                "lastMessageAt": {"$last": "$timestamp"},
+            }},
+        ]
+        updated = 0
+        batch = []
+        async for group in db.messages.aggregate(pipeline, allowDiskUse=True):
+            if not ObjectId.is_valid(group["_id"]):
+                continue
+            batch.append(UpdateOne({"_id": ObjectId(group["_id"])}, {"$set": {
+                "messageCount": group["messageCount"],
+                "lastMessage": (group["lastMessage"] or "")[:LAST_MESSAGE_PREVIEW_CHARS],
+                "lastMessageAt": group["lastMessageAt"],
+            }}))
+            if len(batch) >= batch_size:
+                updated += (await db.chats.bulk_write(batch, ordered=False)).modified_count
+                batch = []
+        if batch:
+            updated += (await db.chats.bulk_write(batch, ordered=False)).modified_count
+        # Chats without messages sort by creation time
+        empty = await db.chats.update_many(
+            {"lastMessageAt": {"$exists": False}},
+            [{"$set": {"lastMessageAt": "$createdAt", "messageCount": 0}}],
+        )
+        await ensure_indexes()
+        print(f"chats: {updated} updated from messages, {empty.modified_count} without messages, in {time.perf_counter() - started:.1f}s")
+    finally:
+        await close_database()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill chat list previews")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size))
@@ -0,0 +1,41 @@
+"""Build mood_daily_rollups / sleep_daily_rollups from the existing analyses.
+
+Run from the backend directory:
+    python -m scripts.backfill_rollups [--user-id USER_ID] [--only mood|sleep]
+"""
+from dotenv import load_dotenv
+load_dotenv()
+
+import argparse
+import asyncio
+import time
+from database.mongo_client import init_database, close_database, get_database
+from database.indexes import ensure_indexes
+from models.daily_rollup import MoodDailyRollupRepository, SleepDailyRollupRepository
+
+
+async def main(user_id: str = None, only: str = None):
+    await init_database()
+    try:
+        await ensure_indexes()
+        db = await get_database()
+        repositories = {
+            "mood": MoodDailyRollupRepository(db),
+            "sleep": SleepDailyRollupRepository(db),
+        }
+        for name, repository in repositories.items():
+            if only and name != only:
+                continue
+            started = time.perf_counter()
+            written = await repository.rebuild(user_id)
+            print(f"{repository.collection_name}: wrote {written} day documents in {time.perf_counter() - started:.1f}s")
+    finally:
+        await close_database()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill daily mood/sleep rollups")
+    parser.add_argument("--user-id", help="Only rebuild rollups for this user")
+    parser.add_argument("--only", choices=["mood", "sleep"], help="Only rebuild one rollup collection")
+    args = parser.parse_args()
+    asyncio.run(main(args.user_id, args.only))
@@ -0,0 +1,37 @@
+"""Sync the RAG corpus (PDFs under RAG_SOURCE_DIR) into the persistent Chroma
+collection used by the meditation rag_tool.
+
+Incremental: unchanged files are skipped and only new chunk content is
+embedded, so it is safe and cheap to re-run after adding, editing or removing
+a PDF. Restart the API afterwards so the retriever logs the new chunk count.
+Run from the backend directory:
+    python -m scripts.ingest_rag [--source-dir DIR] [--batch-size N] [--workers N]
+"""
+from dotenv import load_dotenv
+load_dotenv()
+
+import argparse
+import time
+from core.ingestion import RAGIngestor
+
+
+def main(source_dir: str, batch_size: int, workers: int):
+    started = time.perf_counter()
+    ingestor = RAGIngestor(source_dir=source_dir, batch_size=batch_size, workers=workers)
+    stats = ingestor.run()
+    print(
+        f"{stats['files']} files ({stats['unchanged_files']} unchanged, {stats['removed_files']} removed): "
+        f"{stats['embedded']} chunks embedded, {stats['kept']} kept, {stats['deleted']} deleted "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+    if hasattr(ingestor.embeddings, "stats"):
+        print(f"embedding cache: {ingestor.embeddings.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest the RAG corpus into Chroma")
+    parser.add_argument("--source-dir", default=None)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    main(args.source_dir, args.batch_size, args.workers)
@@ -0,0 +1,50 @@
+"""Backfill the typed sleep_records fields (date as a datetime, quality as an int,
+durationMinutes / bedtimeMinutes / wakeMinutes) for documents written before
+SleepRecordRepository normalized them on write.
+
+Resumable: progress is checkpointed in the `migrations` collection.
+Run from the backend directory:
+    python -m scripts.migrate_sleep_records [--batch-size N] [--reset]
+"""
+from dotenv import load_dotenv
+load_dotenv()
+
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, Optional
+from database.mongo_client import init_database, close_database, get_database
+from database.migrations import BatchedMigration
+from models.sleep_record import SleepRecordRepository, normalize_sleep_fields
+
+MIGRATION_NAME = "sleep_records_normalize_v1"
+RAW_FIELDS = ("date", "quality", "bedtime", "wakeTime", "duration")
+
+
+def transform(doc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    normalized = normalize_sleep_fields({field: doc[field] for field in RAW_FIELDS if field in doc})
+    changes = {field: value for field, value in normalized.items() if doc.get(field) != value or field not in doc}
+    return changes or None
+
+
+async def main(batch_size: int, reset: bool = False):
+    await init_database()
+    try:
+        db = await get_database()
+        await SleepRecordRepository(db).ensure_indexes()
+        migration = BatchedMigration(db, MIGRATION_NAME, "sleep_records", transform, batch_size=batch_size)
+        if reset:
+            await migration.reset()
+        started = time.perf_counter()
+        totals = await migration.run()
+        print(f"sleep_records: {totals['updated']} of {totals['scanned']} documents updated in {time.perf_counter() - started:.1f}s")
+    finally:
+        await close_database()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Normalize sleep_records fields")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--reset", action="store_true", help="Forget the checkpoint and start from the beginning")
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size, args.reset))
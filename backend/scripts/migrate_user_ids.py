@@ -0,0 +1,62 @@
+"""Convert userId fields stored as hex strings to ObjectIds, the type every
+repository now writes and queries with.
+
+Resumable per collection: progress is checkpointed in the `migrations` collection.
+Strings that aren't valid ObjectIds are reported and left untouched.
+Run from the backend directory:
+    python -m scripts.migrate_user_ids [--collection NAME] [--batch-size N] [--reset]
+"""
+from dotenv import load_dotenv
+load_dotenv()
+
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, Optional
+from bson import ObjectId
+from database.mongo_client import init_database, close_database, get_database
+from database.migrations import BatchedMigration
+from database.indexes import ensure_indexes
+
+MIGRATION_NAME = "user_ids_object_id_v1"
+COLLECTIONS = ["sleep_records", "reminders", "chats", "messages", "mood_analyses", "sleep_analyses"]
+
+
+def transform(doc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    user_id = doc.get("userId")
+    if not ObjectId.is_valid(user_id):
+        print(f"Skipping {doc['_id']}: userId {user_id!r} is not an ObjectId")
+        return None
+    return {"userId": ObjectId(user_id)}
+
+
+async def main(collections, batch_size: int, reset: bool = False):
+    await init_database()
+    try:
+        db = await get_database()
+        for collection_name in collections:
+            migration = BatchedMigration(
+                db,
+                f"{MIGRATION_NAME}:{collection_name}",
+                collection_name,
+                transform,
+                query={"userId": {"$type": "string"}},
+                batch_size=batch_size,
+            )
+            if reset:
+                await migration.reset()
+            started = time.perf_counter()
+            totals = await migration.run()
+            print(f"{collection_name}: {totals['updated']} of {totals['scanned']} documents converted in {time.perf_counter() - started:.1f}s")
+        await ensure_indexes()
+    finally:
+        await close_database()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Store every userId as an ObjectId")
+    parser.add_argument("--collection", choices=COLLECTIONS, help="Only migrate this collection")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--reset", action="store_true", help="Forget the checkpoints and start from the beginning")
+    args = parser.parse_args()
+    asyncio.run(main([args.collection] if args.collection else COLLECTIONS, args.batch_size, args.reset))
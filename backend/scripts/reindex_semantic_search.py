@@ -0,0 +1,70 @@
+"""Re-embed every chat message and journal entry into the semantic search
+collection (user_search).
+
+Needed after the collection's embedding backend changes (EMBEDDING_BACKENDS
+or EMBEDDING_BACKEND): the index is then recreated empty on first use, and new
+writes alone would leave older entries unsearchable. Idempotent, entries are
+upserted by id. Texts already in the embedding cache are not re-embedded.
+Run from the backend directory:
+    python -m scripts.reindex_semantic_search [--batch-size N]
+"""
+from dotenv import load_dotenv
+load_dotenv()
+
+import argparse
+import asyncio
+import time
+from database.mongo_client import init_database, close_database, get_database
+from core.semantic_search import semantic_index, COLLECTION_NAME
+from core.embeddings import backend_for
+
+SOURCES = {
+    # source: (collection, text field, time field)
+    "messages": ("messages", "content", "timestamp"),
+    "journal": ("mood_analyses", "input", "createdAt"),
+}
+
+
+async def reindex(db, source: str, batch_size: int) -> int:
+    collection, text_field, time_field = SOURCES[source]
+    projection = {"userId": 1, "chatId": 1, text_field: 1, time_field: 1}
+    indexed = 0
+    batch = []
+    async for doc in db[collection].find({text_field: {"$nin": [None, ""]}}, projection):
+        batch.append({
+            "source": source, "id": str(doc["_id"]), "userId": doc["userId"], "text": doc[text_field],
+            "createdAt": doc[time_field], "chatId": doc.get("chatId"),
+        })
+        if len(batch) >= batch_size:
+            await semantic_index.add(batch)
+            indexed += len(batch)
+            batch = []
+    if batch:
+        await semantic_index.add(batch)
+        indexed += len(batch)
+    return indexed
+
+
+async def main(batch_size: int):
+    if not semantic_index.enabled:
+        print("SEARCH_SEMANTIC_ENABLED is off, nothing to index")
+        return
+    await init_database()
+    try:
+        db = await get_database()
+        print(f"Indexing into {COLLECTION_NAME} with the {backend_for(COLLECTION_NAME)} backend")
+        for source in SOURCES:
+            started = time.perf_counter()
+            indexed = await reindex(db, source, batch_size)
+            print(f"{source}: {indexed} indexed in {time.perf_counter() - started:.1f}s")
+        if hasattr(semantic_index.embeddings, "stats"):
+            print(f"embedding cache: {semantic_index.embeddings.stats()}")
+    finally:
+        await close_database()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the semantic search index from MongoDB")
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size))
@@ -2,20 +2,12 @@ from langchain_core.tools import tool
 import requests
 import time
 from config.setting import settings
+from core.news_store import news_store, GNEWS_LANGUAGE, GNEWS_COUNTRY
 
-@tool(return_direct=True)
-def search_g_news_by_keyword(query: str, language: str = "en", country: str = "us", num_articles: int = 3) -> dict:
+def fetch_g_news(query: str, language: str = "en", country: str = "us", num_articles: int = 3) -> dict:
     """
-    Search G News for articles matching a query.
-
-    Args:
-        query (str): The query to search for.
-        language (str): Language code (default: 'en').
-        country (str): Country code (default: 'us').
-        num_articles (int): Number of articles to return (default: 3).
-
-    Returns:
-        dict: A JSON object containing the query and a list of top n news articles.
+    Search G News and return {"query", "total", "articles"}.
+    Plain function shared by the agent tool and the content catalog refresh.
     """
     url = "https://gnews.io/api/v4/search"
     
@@ -54,8 +46,35 @@ def search_g_news_by_keyword(query: str, language: str = "en", country: str = "u
     except (KeyError, TypeError) as e:
         return {"error": f"Unexpected response format: {str(e)}"}
 
+@tool(return_direct=True)
+def search_g_news_by_keyword(query: str, language: str = "en", country: str = "us", num_articles: int = 3) -> dict:
+    """
+    Search G News for articles matching a query.
+
+    Args:
+        query (str): The query to search for.
+        language (str): Language code (default: 'en').
+        country (str): Country code (default: 'us').
+        num_articles (int): Number of articles to return (default: 3).
+
+    Returns:
+        dict: A JSON object containing the query and a list of top n news articles.
+    """
+    # The store only holds articles ingested in GNEWS_LANGUAGE for GNEWS_COUNTRY
+    if (language, country) != (GNEWS_LANGUAGE, GNEWS_COUNTRY):
+        return fetch_g_news(query, language, country, num_articles)
+    stored = news_store.search(query, num_articles)
+    if stored:
+        return stored
+    result = fetch_g_news(query, language, country, num_articles)
+    news_store.add_results(query, result)
+    return result
+
+
 def process_query_words(query_words):
     words = [w.replace("-", "").replace("_", "") for w in query_words]
+    if len(words) < 3:
+        return f"({' OR '.join(words)})" if len(words) > 1 else "".join(words)
     groups = []
     i = 0
     while i < 4:
@@ -2,18 +2,16 @@ from langchain_core.tools import tool
 import requests
 import time
 from config.setting import settings
+from core.news_store import news_store, GOOGLE_NEWS_REGION
 
-@tool(return_direct=True)
-def search_news_by_keyword(keyword: str, region: str = "en-US", num_articles: int = 3) -> dict:
-    """
-    Search Google News for articles matching a keyword using the google-news13 API.
-
-    Args:
-        keyword (str): The keyword to search for.
-        region (str): Language-region code (default: 'en-US').
+def readable_time(timestamp) -> str:
+    """google-news13's millisecond timestamp as local '%Y-%m-%d %H:%M:%S'"""
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(int(timestamp) / 1000))
 
-    Returns:
-        dict: A JSON object containing the keyword and a list of top 3 news articles.
+def fetch_google_news(keyword: str, region: str = "en-US", num_articles: int = 3) -> dict:
+    """
+    Search Google News (google-news13 API) and return {"query", "total", "articles"}.
+    Plain function shared by the agent tools and the news ingestion job.
     """
     url = "https://google-news13.p.rapidapi.com/search"
     querystring = {"keyword": keyword, "lr": region}
@@ -31,7 +29,6 @@ def search_news_by_keyword(keyword: str, region: str = "en-US", num_articles: in
         articles = []
         for item in items[:num_articles]:
             timestamp = item.get("timestamp")
-            readable_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(int(timestamp) / 1000)) if timestamp else None
 
             articles.append({
                 "title": item.get("title", "No title"),
@@ -40,7 +37,7 @@ def search_news_by_keyword(keyword: str, region: str = "en-US", num_articles: in
                 "thumbnail": item.get("images", {}).get("thumbnail", ""),
                 "publisher": item.get("publisher", "Unknown"),
                 "timestamp": timestamp,
-                "published_time": readable_time
+                "published_time": readable_time(timestamp) if timestamp else None
             })
 
         return {
@@ -53,10 +50,25 @@ def search_news_by_keyword(keyword: str, region: str = "en-US", num_articles: in
         return {"error": f"Request failed: {str(e)}"}
     except (KeyError, TypeError) as e:
         return {"error": f"Unexpected response format: {str(e)}"}
-    
 
-@tool()
-def search_news_by_keyword_chat(keyword: str, region: str = "en-US", num_articles: int = 3) -> dict:
+
+def search_news(keyword: str, region: str, num_articles: int) -> dict:
+    """Articles from the local news store, falling back to a live search that is then stored.
+
+    The store only holds GOOGLE_NEWS_REGION articles, so other regions always search live.
+    """
+    if region != GOOGLE_NEWS_REGION:
+        return fetch_google_news(keyword, region, num_articles)
+    stored = news_store.search(keyword, num_articles, readable_time)
+    if stored:
+        return stored
+    result = fetch_google_news(keyword, region, num_articles)
+    news_store.add_results(keyword, result)
+    return result
+
+
+@tool(return_direct=True)
+def search_news_by_keyword(keyword: str, region: str = "en-US", num_articles: int = 3) -> dict:
     """
     Search Google News for articles matching a keyword using the google-news13 API.
 
@@ -67,41 +79,19 @@ def search_news_by_keyword_chat(keyword: str, region: str = "en-US", num_article
     Returns:
         dict: A JSON object containing the keyword and a list of top 3 news articles.
     """
-    url = "https://google-news13.p.rapidapi.com/search"
-    querystring = {"keyword": keyword, "lr": region}
-    headers = {
-        "x-rapidapi-key": settings.RAPID_API_KEY,  
-        "x-rapidapi-host": "google-news13.p.rapidapi.com"
-    }
+    return search_news(keyword, region, num_articles)
 
-    try:
-        response = requests.get(url, headers=headers, params=querystring)
-        response.raise_for_status()
-        data = response.json()
-        items = data.get("items", [])
 
-        articles = []
-        for item in items[:num_articles]:
-            timestamp = item.get("timestamp")
-            readable_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(int(timestamp) / 1000)) if timestamp else None
-
-            articles.append({
-                "title": item.get("title", "No title"),
-                "snippet": item.get("snippet", "No summary"),
-                "news_url": item.get("newsUrl", "No link"),
-                "thumbnail": item.get("images", {}).get("thumbnail", ""),
-                "publisher": item.get("publisher", "Unknown"),
-                "timestamp": timestamp,
-                "published_time": readable_time
-            })
+@tool()
+def search_news_by_keyword_chat(keyword: str, region: str = "en-US", num_articles: int = 3) -> dict:
+    """
+    Search Google News for articles matching a keyword using the google-news13 API.
 
-        return {
-            "query": keyword,
-            "total": len(articles),
-            "articles": articles
-        }
+    Args:
+        keyword (str): The keyword to search for.
+        region (str): Language-region code (default: 'en-US').
 
-    except requests.exceptions.RequestException as e:
-        return {"error": f"Request failed: {str(e)}"}
-    except (KeyError, TypeError) as e:
-        return {"error": f"Unexpected response format: {str(e)}"}
\ No newline at end of file
+    Returns:
+        dict: A JSON object containing the keyword and a list of top 3 news articles.
+    """
+    return search_news(keyword, region, num_articles)
@@ -19,6 +19,53 @@ def get_spotify_token(client_id: str, client_secret: str) -> str:
     return response.json()['access_token']
 
 
+def spotify_search_playlists(query: str, limit: int) -> list:
+    """Raw playlist items of a Spotify search (None entries removed)"""
+    token = get_spotify_token(settings.SPOTIFY_CLIENT_ID, settings.SPOTIFY_CLIENT_SECRET)
+    response = requests.get(
+        'https://api.spotify.com/v1/search',
+        headers={'Authorization': f'Bearer {token}'},
+        params={'q': query, 'type': 'playlist', 'limit': limit},
+    )
+    response.raise_for_status()
+    return [pl for pl in response.json().get('playlists', {}).get('items', []) if pl is not None]
+
+
+def format_playlist(pl: dict) -> dict:
+    return {
+        "name": pl.get('name'),
+        "description": pl.get('description'),
+        "external_url": pl.get('external_urls', {}).get('spotify'),
+        "image": (pl.get('images') or [{}])[0].get('url'),
+        "owner": {
+            "name": pl.get('owner', {}).get('display_name'),
+            "url": pl.get('owner', {}).get('external_urls', {}).get('spotify')
+        },
+        "tracks": {
+            "url": pl.get('tracks', {}).get('href'),
+            "total": pl.get('tracks', {}).get('total')
+        }
+    }
+
+
+def fetch_spotify_playlists(query: str, num_playlists: int = 1) -> dict:
+    """
+    Search Spotify playlists and return {"query", "total", "playlists"}.
+    Plain function shared by the agent tool and the content catalog refresh.
+    """
+    try:
+        playlists = spotify_search_playlists(query, num_playlists)
+        if not playlists:
+            return {"message": "No playlists found for your query."}
+        return {
+            "query": query,
+            "total": len(playlists),
+            "playlists": [format_playlist(pl) for pl in playlists]
+        }
+    except Exception as e:
+        return {"error": str(e)}
+
+
 @tool(return_direct=True)
 def search_spotify_playlists(query: str, num_playlists: int = 1) -> dict:
     """
@@ -31,57 +78,7 @@ def search_spotify_playlists(query: str, num_playlists: int = 1) -> dict:
     Returns:
         dict: A dictionary containing playlist details.
     """
-    client_id = settings.SPOTIFY_CLIENT_ID
-    client_secret = settings.SPOTIFY_CLIENT_SECRET
-
-    try:
-        token = get_spotify_token(client_id, client_secret)
-        headers = {
-            'Authorization': f'Bearer {token}'
-        }
-        params = {
-            'q': query,
-            'type': 'playlist',
-            'limit': num_playlists
-        }
-        url = 'https://api.spotify.com/v1/search'
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-
-        playlists = response.json().get('playlists', {}).get('items', [])
-
-        if not playlists:
-            return {"message": "No playlists found for your query."}
-
-        result = {
-            "query": query,
-            "total": len(playlists),
-            "playlists": []
-        }
-
-        for pl in playlists:
-            if pl is None:
-                continue
-
-            result["playlists"].append({
-                "name": pl.get('name'),
-                "description": pl.get('description'),
-                "external_url": pl.get('external_urls', {}).get('spotify'),
-                "image": pl.get('images', [{}])[0].get('url'),
-                "owner": {
-                    "name": pl.get('owner', {}).get('display_name'),
-                    "url": pl.get('owner', {}).get('external_urls', {}).get('spotify')
-                },
-                "tracks": {
-                    "url": pl.get('tracks', {}).get('href'),
-                    "total": pl.get('tracks', {}).get('total')
-                }
-            })
-
-        return result
-
-    except Exception as e:
-        return {"error": str(e)}
+    return fetch_spotify_playlists(query, num_playlists)
 
 
 @tool()
@@ -99,24 +96,8 @@ def search_spotify_playlists_csv(query: str, num_playlists: int = 1) -> dict:
         example:
         "name", "description", "url", "image", "owner_name", "tracks_url", "tracks_total"
     """
-    client_id = settings.SPOTIFY_CLIENT_ID
-    client_secret = settings.SPOTIFY_CLIENT_SECRET
-
     try:
-        token = get_spotify_token(client_id, client_secret)
-        headers = {
-            'Authorization': f'Bearer {token}'
-        }
-        params = {
-            'q': query,
-            'type': 'playlist',
-            'limit': num_playlists
-        }
-        url = 'https://api.spotify.com/v1/search'
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-
-        playlists = response.json().get('playlists', {}).get('items', [])
+        playlists = spotify_search_playlists(query, num_playlists)
 
         if not playlists:
             return "message\nNo playlists found for your query."
@@ -127,8 +108,6 @@ def search_spotify_playlists_csv(query: str, num_playlists: int = 1) -> dict:
             "name", "description", "url", "image", "owner_name", "tracks_url", "tracks_total"
         ])
         for pl in playlists:
-            if pl is None:
-                continue
             writer.writerow([
                 pl.get('name', ''),
                 re.sub(r'[^A-Za-z0-9 ]+', '', pl.get('description', '')),
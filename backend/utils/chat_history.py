@@ -0,0 +1,92 @@
+import threading
+from collections import OrderedDict, deque
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+from config.setting import settings
+
+# Per message framing tokens in the chat completion format
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+class ChatHistoryCache:
+    """Ring buffer of the latest messages per chat, least recently used chats evicted.
+
+    A chat is only present once its buffer is known to be complete (loaded
+    from `messages` or started empty with a new chat), so `append` ignores
+    chats that aren't cached instead of creating a buffer with a gap.
+    """
+
+    def __init__(self, max_messages: int, max_chats: int = 2000):
+        self.max_messages = max_messages
+        self.max_chats = max_chats
+        self._lock = threading.Lock()
+        self._chats: "OrderedDict[str, deque]" = OrderedDict()
+
+    def get(self, chat_id: str) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            buffer = self._chats.get(chat_id)
+            if buffer is None:
+                return None
+            self._chats.move_to_end(chat_id)
+            return list(buffer)
+
+    def load(self, chat_id: str, messages: List[Dict[str, Any]]):
+        with self._lock:
+            self._chats[chat_id] = deque(messages, maxlen=self.max_messages)
+            self._chats.move_to_end(chat_id)
+            while len(self._chats) > self.max_chats:
+                self._chats.popitem(last=False)
+
+    def append(self, chat_id: str, message: Dict[str, Any]):
+        with self._lock:
+            buffer = self._chats.get(chat_id)
+            if buffer is not None:
+                buffer.append(message)
+
+    def invalidate(self, chat_id: str):
+        with self._lock:
+            self._chats.pop(chat_id, None)
+
+
+# A turn is one user message and the reply
+chat_history_cache = ChatHistoryCache(settings.CHAT_HISTORY_MAX_TURNS * 2)
+
+
+def history_entry(message) -> Dict[str, Any]:
+    """The part of a MessageModel the prompt needs"""
+    return {"sender": message.sender, "content": message.content, "timestamp": message.timestamp}
+
+
+@lru_cache(maxsize=4)
+def _encoding(model: str):
+    try:
+        import tiktoken
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        # tiktoken fetches its BPE files on first use; fall back to an estimate when that fails
+        print(f"tiktoken unavailable, estimating token counts: {e}")
+        return None
+
+
+def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+    encoding = _encoding(model)
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def trim_to_token_budget(messages: List[Dict[str, Any]], budget: int, model: str = "gpt-4o-mini") -> List[Dict[str, Any]]:
+    """Newest messages, oldest first, whose contents fit within `budget` tokens"""
+    kept = []
+    used = 0
+    for message in reversed(messages):
+        tokens = count_tokens(message.get("content") or "", model) + MESSAGE_OVERHEAD_TOKENS
+        if used + tokens > budget:
+            break
+        kept.append(message)
+        used += tokens
+    kept.reverse()
+    return kept
@@ -0,0 +1,344 @@
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+import numpy as np
+
+MINUTES_PER_DAY = 1440
+EPOCH_MINUTES = 5
+EPOCHS_PER_DAY = MINUTES_PER_DAY // EPOCH_MINUTES
+DEFAULT_TARGET_MINUTES = 8 * 60
+DEBT_WINDOW_NIGHTS = 14
+DRIFT_WINDOW_NIGHTS = 28
+# Nights followed by a free day (Friday and Saturday nights)
+FREE_NIGHT_WEEKDAYS = (4, 5)
+
+EPOCH_ORDINAL = datetime(1970, 1, 1).toordinal()
+NAT_DAYS = np.datetime64("NaT", "D").astype("int64")
+
+_DURATION_RE = re.compile(r"^\s*(?:(\d+(?:\.\d+)?)\s*h)?\s*(?:(\d+)\s*m)?\s*$", re.IGNORECASE)
+_CLOCK_RE = re.compile(r"^\s*(\d{1,2}):(\d{2})")
+
+
+def parse_duration_minutes(value: Any) -> Optional[int]:
+    """'9h 0m' / '7h' / '45m' / 480 -> minutes"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = _DURATION_RE.match(str(value))
+    if not match or not any(match.groups()):
+        return None
+    hours, minutes = match.groups()
+    return int(round(float(hours or 0) * 60)) + int(minutes or 0)
+
+
+def parse_clock_minutes(value: Any) -> Optional[int]:
+    """'22:40' -> minutes after midnight"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value) % MINUTES_PER_DAY
+    match = _CLOCK_RE.match(str(value))
+    if not match:
+        return None
+    hours, minutes = int(match.group(1)), int(match.group(2))
+    if hours > 23 or minutes > 59:
+        return None
+    return hours * 60 + minutes
+
+
+def parse_record_date(value: Any) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value)[:10])
+    except (TypeError, ValueError):
+        return None
+
+
+def _date_column(records: List[Dict[str, Any]]) -> np.ndarray:
+    """Record dates as datetime64[D], NaT where unparseable"""
+    values = [record.get("date") for record in records]
+    # NumPy converts datetime objects one by one and slowly; their day ordinals are cheap
+    days = np.array(
+        [value.toordinal() - EPOCH_ORDINAL if isinstance(value, datetime) else NAT_DAYS for value in values],
+        dtype="int64",
+    )
+    for i, value in enumerate(values):
+        if not isinstance(value, datetime):
+            date = parse_record_date(value)
+            if date is not None:
+                days[i] = date.toordinal() - EPOCH_ORDINAL
+    return days.view("datetime64[D]")
+
+
+def _numeric_column(records: List[Dict[str, Any]], field: str, fallback: Optional[str], parse) -> np.ndarray:
+    """`field` as floats (NaN when missing), parsing `fallback` only for records without a numeric value"""
+    values = [record.get(field) for record in records]
+    try:
+        column = np.array(values, dtype=float)
+    except (TypeError, ValueError):
+        column = np.array([_to_float(value) for value in values], dtype=float)
+    if fallback is not None:
+        for i in np.flatnonzero(np.isnan(column)).tolist():
+            parsed = parse(records[i].get(fallback))
+            if parsed is not None:
+                column[i] = parsed
+    return column
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _nanmean(values: np.ndarray) -> float:
+    """np.nanmean without the empty slice warning: NaN when nothing is known"""
+    return float(np.nanmean(values)) if np.count_nonzero(~np.isnan(values)) else np.nan
+
+
+def _nanstd(values: np.ndarray) -> float:
+    return float(np.nanstd(values)) if np.count_nonzero(~np.isnan(values)) else np.nan
+
+
+def _format_clock(minutes: Optional[float]) -> Optional[str]:
+    if minutes is None or np.isnan(minutes):
+        return None
+    minutes = int(round(minutes)) % MINUTES_PER_DAY
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def _round(value, digits: int = 1) -> Optional[float]:
+    if value is None or np.isnan(value):
+        return None
+    return round(float(value), digits)
+
+
+class SleepSeries:
+    """A user's nights as parallel NumPy arrays, sorted by date.
+
+    Bedtimes are stored relative to the midnight that starts the record's date,
+    so 22:40 on the 28th is -80 and 00:30 is 30; wake times are relative to the
+    same midnight and always after the bedtime.
+    """
+
+    def __init__(self, records: Iterable[Dict[str, Any]]):
+        records = list(records)
+        dates = _date_column(records)
+        # Normalized numeric fields when the record has them, the display strings otherwise
+        bed = _numeric_column(records, "bedtimeMinutes", "bedtime", parse_clock_minutes) % MINUTES_PER_DAY
+        wake = _numeric_column(records, "wakeMinutes", "wakeTime", parse_clock_minutes) % MINUTES_PER_DAY
+        duration = _numeric_column(records, "durationMinutes", "duration", parse_duration_minutes)
+        quality = _numeric_column(records, "quality", None, None)
+
+        order = np.argsort(dates, kind="stable")
+        order = order[~np.isnat(dates[order])]
+        self.dates = dates[order]
+        bed, wake, duration, self.quality = bed[order], wake[order], duration[order], quality[order]
+        factor_lists = [records[i].get("factors") or () for i in order.tolist()]
+        names = [name if isinstance(name, str) else None for factors in factor_lists for name in factors]
+        self.factor_names: List[str] = sorted(set(names) - {None})
+        factor_index = {name: i for i, name in enumerate(self.factor_names)}
+        self.factors = np.zeros((len(order), len(self.factor_names)), dtype=bool)
+        rows = np.repeat(np.arange(len(factor_lists)), [len(factors) for factors in factor_lists])
+        columns = np.array([factor_index.get(name, -1) for name in names], dtype=np.int64)
+        self.factors[rows[columns >= 0], columns[columns >= 0]] = True
+
+        # Evening bedtimes belong to the previous calendar day
+        self.bed = np.where(bed >= 12 * 60, bed - MINUTES_PER_DAY, bed)
+        self.wake = np.where(wake <= self.bed, wake + MINUTES_PER_DAY, wake)
+        from_times = self.wake - self.bed
+        self.duration = np.where(np.isnan(duration), from_times, duration)
+        # Prefer the recorded duration when only one clock time is known
+        self.bed = np.where(np.isnan(self.bed), self.wake - self.duration, self.bed)
+        self.wake = np.where(np.isnan(self.wake), self.bed + self.duration, self.wake)
+        self.midpoint = self.bed + self.duration / 2
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def consistency(self) -> Dict[str, Any]:
+        midpoint_std = _nanstd(self.midpoint)
+        result = {
+            "bedtimeStdMinutes": _round(_nanstd(self.bed)),
+            "wakeTimeStdMinutes": _round(_nanstd(self.wake)),
+            "midpointStdMinutes": _round(midpoint_std),
+            "durationStdMinutes": _round(_nanstd(self.duration)),
+        }
+        # 100 when the midpoint never moves, 0 at two hours of spread
+        result["score"] = _round(np.clip(100 - midpoint_std * 100 / 120, 0, 100)) if not np.isnan(midpoint_std) else None
+        return result
+
+    def sleep_debt(self, target_minutes: int = DEFAULT_TARGET_MINUTES, window: int = DEBT_WINDOW_NIGHTS) -> Dict[str, Any]:
+        recent = self.duration[-window:]
+        recent = recent[~np.isnan(recent)]
+        shortfall = np.clip(target_minutes - recent, 0, None)
+        return {
+            "targetMinutes": target_minutes,
+            "windowNights": int(recent.size),
+            "totalMinutes": _round(shortfall.sum(), 0) if recent.size else None,
+            "averageMinutesPerNight": _round(shortfall.mean()) if recent.size else None,
+        }
+
+    def midpoint_drift(self, window: int = DRIFT_WINDOW_NIGHTS) -> Dict[str, Any]:
+        """Least squares slope of the sleep midpoint in minutes per day"""
+        days = (self.dates[-window:] - self.dates[-window:][:1]).astype(float) if len(self) else np.array([])
+        midpoint = self.midpoint[-window:]
+        valid = ~np.isnan(midpoint)
+        days, midpoint = days[valid], midpoint[valid]
+        slope = None
+        if days.size >= 3 and np.ptp(days) > 0:
+            centered = days - days.mean()
+            slope = float((centered * (midpoint - midpoint.mean())).sum() / (centered ** 2).sum())
+        return {"minutesPerDay": _round(slope, 2), "windowNights": int(days.size)}
+
+    def social_jetlag(self) -> Optional[float]:
+        """Absolute difference between the mean midpoint of free-day and work-day nights"""
+        if not len(self):
+            return None
+        # datetime64[D] epoch 1970-01-01 was a Thursday (weekday 3)
+        weekday = (self.dates.astype("int64") + 3) % 7
+        free = np.isin(weekday, FREE_NIGHT_WEEKDAYS) & ~np.isnan(self.midpoint)
+        work = ~np.isin(weekday, FREE_NIGHT_WEEKDAYS) & ~np.isnan(self.midpoint)
+        if not free.any() or not work.any():
+            return None
+        return _round(abs(self.midpoint[free].mean() - self.midpoint[work].mean()))
+
+    def regularity_index(self) -> Optional[float]:
+        """Sleep Regularity Index on 5 minute epochs.
+
+        The probability that the sleep/wake state is the same 24 hours apart,
+        rescaled to -100..100, over days whose surrounding nights were all logged.
+        """
+        valid_nights = ~np.isnan(self.bed) & ~np.isnan(self.wake)
+        if valid_nights.sum() < 2:
+            return None
+        day = (self.dates - self.dates[0]).astype("int64")
+        span = int(day[-1]) + 3
+        # Difference array over the timeline; index 0 is the midnight starting the day before the first night
+        start = ((day[valid_nights] + 1) * MINUTES_PER_DAY + self.bed[valid_nights]) // EPOCH_MINUTES
+        end = ((day[valid_nights] + 1) * MINUTES_PER_DAY + self.wake[valid_nights]) // EPOCH_MINUTES
+        start = np.clip(start.astype("int64"), 0, span * EPOCHS_PER_DAY)
+        end = np.clip(end.astype("int64"), 0, span * EPOCHS_PER_DAY)
+        start, end = np.sort(start), np.sort(end)
+
+        logged = np.zeros(span + 1, dtype=bool)
+        logged[day[valid_nights] + 1] = True
+        # Calendar day d is covered by the nights starting on d-1 and d; comparing with d+1 also needs night d+1
+        comparable_days = logged[:-2] & logged[1:-1] & np.append(logged[2:-1], False)
+        comparable_days = comparable_days[: span - 1]
+        if not comparable_days.any():
+            return None
+        # Epoch t is compared with t + EPOCHS_PER_DAY. Every state change of either side, and every comparable
+        # day boundary, starts a new segment; within a segment nothing changes, so only segments are evaluated
+        limit = (span - 1) * EPOCHS_PER_DAY
+        day_starts = np.flatnonzero(comparable_days) * EPOCHS_PER_DAY
+        # Sorted, not deduplicated: a repeated bound only adds an empty segment
+        bounds = np.sort(np.clip(np.concatenate([
+            [0, limit], start, end, start - EPOCHS_PER_DAY, end - EPOCHS_PER_DAY, day_starts, day_starts + EPOCHS_PER_DAY,
+        ]), 0, limit))
+        points, lengths = bounds[:-1], np.diff(bounds)
+
+        def asleep(t):
+            # Nights started by epoch t minus nights ended by it
+            return np.searchsorted(start, t, side="right") - np.searchsorted(end, t, side="right") > 0
+
+        same = asleep(points) == asleep(points + EPOCHS_PER_DAY)
+        weights = lengths * comparable_days[np.minimum(points, limit - 1) // EPOCHS_PER_DAY]
+        return _round(200 * (weights * same).sum() / weights.sum() - 100)
+
+    def factor_correlations(self) -> Dict[str, Any]:
+        """Pearson (point-biserial) correlation between each factor and sleep quality"""
+        valid = ~np.isnan(self.quality)
+        if valid.sum() < 3 or not self.factor_names:
+            return {}
+        quality = self.quality[valid]
+        present = self.factors[valid].astype(float)
+        q_centered = quality - quality.mean()
+        f_centered = present - present.mean(axis=0)
+        denominator = np.sqrt((f_centered ** 2).sum(axis=0) * (q_centered ** 2).sum())
+        with np.errstate(invalid="ignore", divide="ignore"):
+            correlation = (f_centered * q_centered[:, None]).sum(axis=0) / denominator
+            nights_with = present.sum(axis=0)
+            mean_with = (present * quality[:, None]).sum(axis=0) / nights_with
+            mean_without = ((1 - present) * quality[:, None]).sum(axis=0) / (quality.size - nights_with)
+        return {
+            name: {
+                "correlation": _round(correlation[i], 3),
+                "nights": int(nights_with[i]),
+                "avgQualityWith": _round(mean_with[i], 2),
+                "avgQualityWithout": _round(mean_without[i], 2),
+            }
+            for i, name in enumerate(self.factor_names)
+        }
+
+    def summary(self, target_minutes: int = DEFAULT_TARGET_MINUTES) -> Dict[str, Any]:
+        if not len(self):
+            return {"nights": 0}
+        return {
+            "nights": len(self),
+            "from": str(self.dates[0]),
+            "to": str(self.dates[-1]),
+            "averages": {
+                "durationMinutes": _round(_nanmean(self.duration)),
+                "bedtime": _format_clock(_nanmean(self.bed)),
+                "wakeTime": _format_clock(_nanmean(self.wake)),
+                "quality": _round(_nanmean(self.quality), 2),
+            },
+            "consistency": self.consistency(),
+            "sleepDebt": self.sleep_debt(target_minutes),
+            "midpointDrift": self.midpoint_drift(),
+            "socialJetlagMinutes": self.social_jetlag(),
+            "regularityIndex": self.regularity_index(),
+            "factorCorrelations": self.factor_correlations(),
+        }
+
+
+def compute_sleep_stats(records: Iterable[Dict[str, Any]], target_minutes: int = DEFAULT_TARGET_MINUTES) -> Dict[str, Any]:
+    return SleepSeries(records).summary(target_minutes)
+
+
+class SleepStatsCache:
+    """Per user stats kept until that user's sleep records change.
+
+    Every invalidation bumps the user's generation; stats computed from rows
+    read before a write (generation taken before the query) are not cached.
+    """
+
+    def __init__(self, max_users: int = 1000):
+        self.max_users = max_users
+        self._lock = threading.Lock()
+        self._stats: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            stats = self._stats.get(user_id)
+            if stats is not None:
+                self._stats.move_to_end(user_id)
+            return stats
+
+    def generation(self, user_id: str) -> int:
+        with self._lock:
+            return self._generations.get(str(user_id), 0)
+
+    def set(self, user_id: str, stats: Dict[str, Any], generation: Optional[int] = None):
+        with self._lock:
+            if generation is not None and self._generations.get(str(user_id), 0) != generation:
+                return
+            self._stats[user_id] = stats
+            self._stats.move_to_end(user_id)
+            while len(self._stats) > self.max_users:
+                self._stats.popitem(last=False)
+
+    def invalidate(self, user_id: str):
+        with self._lock:
+            self._stats.pop(str(user_id), None)
+            self._generations[str(user_id)] = self._generations.get(str(user_id), 0) + 1
+
+
+sleep_stats_cache = SleepStatsCache()
@@ -253,7 +253,7 @@ export default function MeditationPage() {
 
       // Load audio meditations
       const audioResponse = await apiClient.get<AudioMeditation[]>("/meditation/audio")
-      setAudioMeditations(audioResponse)
+      setAudioMeditations(audioResponse.map((audio) => ({ ...audio, audioUrl: apiClient.resolveUrl(audio.audioUrl) })))
     } catch (error) {
       console.error("Failed to load meditation content:", error)
       // Load mock data as fallback
@@ -664,7 +664,7 @@ export default function MeditationPage() {
                         id: audio.id,
                         title: audio.title,
                         description: audio.description,
-                        audioUrl: audio.audioUrl,
+                        audioUrl: apiClient.resolveUrl(audio.audioUrl),
                         duration: audio.duration,
                         category: audio.category,
                         instructor: "AI Generated",
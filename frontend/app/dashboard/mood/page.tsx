@@ -53,11 +53,34 @@ export default function MoodPage() {
     }
   }
 
-  const handleViewJournalEntry = (entry: any) => {
-    setViewingJournalEntry(entry)
-    setCurrentMood(entry.analysis?.primaryMood || entry.mood)
-    setMoodScore(entry.analysis?.confidence || entry.score)
-    setApiResponse(entry)
+  const handleViewJournalEntry = async (entry: any) => {
+    // The history list only carries summaries; load the full analysis for the detail view
+    let fullEntry = entry
+    if (!entry.analysis) {
+      try {
+        fullEntry = await apiClient.get(`/mood/${entry._id || entry.id}`)
+      } catch (error) {
+        console.error("Failed to fetch journal entry:", error)
+        return
+      }
+    }
+    setViewingJournalEntry(fullEntry)
+    setCurrentMood(fullEntry.analysis?.primaryMood || fullEntry.mood)
+    setMoodScore(fullEntry.analysis?.confidence || fullEntry.score)
+    setApiResponse(fullEntry)
+  }
+
+  const handleExpandEntry = async (entry: any, open: boolean) => {
+    const entryId = entry._id || entry.id
+    setExpandedEntry(open ? entryId : null)
+    // Summaries leave out the journal text; load the full entry the first time it is expanded
+    if (!open || entry.input) return
+    try {
+      const fullEntry = await apiClient.get<any>(`/mood/${entryId}`)
+      setJournalEntries((prev) => prev.map((item) => ((item._id || item.id) === entryId ? { ...item, ...fullEntry } : item)))
+    } catch (error) {
+      console.error("Failed to fetch journal entry:", error)
+    }
   }
 
   const handleBackToJournal = () => {
@@ -448,7 +471,7 @@ export default function MoodPage() {
                     <Collapsible
                       key={entry._id || entry.id}
                       open={expandedEntry === (entry._id || entry.id)}
-                      onOpenChange={(open) => setExpandedEntry(open ? entry._id || entry.id : null)}
+                      onOpenChange={(open) => handleExpandEntry(entry, open)}
                     >
                       <CollapsibleTrigger asChild>
                         <div className="w-full p-3 border rounded-lg hover:bg-slate-50 dark:hover:bg-slate-800/50 cursor-pointer transition-colors">
@@ -462,9 +485,9 @@ export default function MoodPage() {
                                 <div className="flex items-center gap-1">
                                   <div
                                     className={`w-1.5 h-1.5 rounded-full ${
-                                        entry.analysis.moodCategory === "positive"
+                                        (entry.analysis?.moodCategory || entry.moodCategory) === "positive"
                                         ? "bg-green-500"
-                                        : entry.analysis.moodCategory === "negative"
+                                        : (entry.analysis?.moodCategory || entry.moodCategory) === "negative"
                                           ? "bg-red-500"
                                           : "bg-yellow-500"
                                     }`}
@@ -473,11 +496,11 @@ export default function MoodPage() {
                                     {entry.analysis?.primaryMood || entry.mood}
                                   </span>
                                   <span className="text-xs text-slate-500">
-                                    ({entry.analysis?.confidence || entry.score}/100)
+                                    ({entry.analysis?.confidence || entry.confidence || entry.score}/100)
                                   </span>
                                 </div>
                               </div>
-                              <p className="text-xs text-slate-600 dark:text-slate-300 truncate pr-2">{entry.input}</p>
+                              <p className="text-xs text-slate-600 dark:text-slate-300 truncate pr-2">{entry.input || entry.summary}</p>
                             </div>
                             <div className="flex items-center gap-2 flex-shrink-0">
                               <Button
@@ -502,20 +525,23 @@ export default function MoodPage() {
                       </CollapsibleTrigger>
                       <CollapsibleContent className="mt-2">
                         <div className="border-l-2 border-teal-500 pl-3 space-y-3 ml-1">
+                          {entry.input && (
                           <div>
                             <h4 className="font-medium mb-1 text-sm">Full Entry</h4>
                             <p className="text-xs text-slate-600 dark:text-slate-300 leading-relaxed">
-                              {entry.input || entry.insights?.summary}
+                              {entry.input}
                             </p>
                           </div>
+                          )}
 
                           <div>
                             <h4 className="font-medium mb-1 text-sm">AI Analysis</h4>
                             <p className="text-xs text-slate-600 dark:text-slate-300 leading-relaxed">
-                              {entry.insights?.summary || entry.analysis}
+                              {entry.insights?.summary || entry.summary}
                             </p>
                           </div>
 
+                          {entry.recommendations && (
                           <div>
                             <h4 className="font-medium mb-1 text-sm">Quick Preview</h4>
                             <div className="grid grid-cols-1 md:grid-cols-2 gap-2">
@@ -535,6 +561,7 @@ export default function MoodPage() {
                               </div>
                             </div>
                           </div>
+                          )}
                         </div>
                       </CollapsibleContent>
                     </Collapsible>
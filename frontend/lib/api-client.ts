@@ -111,6 +111,14 @@ class ApiClient {
     }
   }
 
+  // Backend-relative URLs (e.g. audioUrl "/api/audio/...") resolved against the API origin
+  resolveUrl(url: string): string {
+    if (!url || !url.startsWith("/api/")) {
+      return url
+    }
+    return new URL(url, this.baseURL).toString()
+  }
+
   // Convenience methods
   async get<T>(endpoint: string): Promise<T> {
     return this.request<T>(endpoint, { method: "GET" })